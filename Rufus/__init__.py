@@ -1,7 +1,29 @@
 import os
 import sys
+import importlib
 current_dir = os.path.dirname(os.path.realpath(__file__))
-from .client import RufusClient
-from .crawler import crawl_website
-from .scraper import scrape_content
-from .synthesizer import synthesize_document
+
+# Public names and the modules that define them. They are imported on first
+# access (PEP 562), so `import Rufus` does not load the crawler, extractors or
+# the OpenAI client until they are used.
+_EXPORTS = {
+    "RufusClient": ".client",
+    "crawl_website": ".crawler",
+    "scrape_content": ".scraper",
+    "synthesize_document": ".synthesizer",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,389 @@
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from logger import logger
+from utils import optional_import
+
+# Compression codecs and the file suffix of their objects
+CODEC_SUFFIXES = {"zstd": ".zst", "gzip": ".gz", "none": ""}
+
+# Records between automatic retention passes
+PRUNE_EVERY = 100
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    digest TEXT PRIMARY KEY,
+    codec TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    stored_size INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS records (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT,
+    request_key TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    digest TEXT NOT NULL REFERENCES objects (digest),
+    urls TEXT NOT NULL,
+    instructions TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS records_request ON records (request_key, kind, created_at);
+CREATE INDEX IF NOT EXISTS records_job ON records (job_id, kind);
+CREATE INDEX IF NOT EXISTS records_created ON records (created_at);
+CREATE INDEX IF NOT EXISTS records_digest ON records (digest);
+"""
+
+
+def request_key(urls, instructions):
+    """
+    Key identifying a scrape request by its URL set and instructions.
+
+    Args:
+        urls: URLs the artifact was built from, in any order
+        instructions: Instructions of the request
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    canonical = json.dumps({"urls": sorted(set(urls)), "instructions": instructions or ""},
+                           sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ArtifactStore:
+    """
+    Content-addressed, compressed store for output artifacts.
+
+    Each artifact is stored once under the SHA-256 of its content,
+    compressed with zstd when the zstandard package is installed and gzip
+    otherwise, so repeated content costs no extra disk and concurrent runs
+    never collide on file names. A SQLite index maps job IDs and requests
+    (URL set and instructions) to artifacts, so past results are found with
+    an index lookup instead of a directory scan. Records older than the
+    retention period, or the oldest ones beyond a size limit, are pruned
+    along with the objects no record uses any more.
+    """
+    def __init__(self, root, compression="auto", level=None, retention_days=None, max_bytes=None):
+        """
+        Open (and create if needed) the store.
+
+        Args:
+            root: Directory of the store
+            compression: "zstd", "gzip", "none", or "auto" for zstd if installed, else gzip
+            level: Compression level (defaults to 10 for zstd and 6 for gzip)
+            retention_days: Days records are kept, or None to keep them until max_bytes is reached
+            max_bytes: Maximum compressed size of the stored objects, or None for no limit
+        """
+        if compression == "auto":
+            compression = "zstd" if optional_import("zstandard") is not None else "gzip"
+        elif compression == "zstd" and optional_import("zstandard") is None:
+            logger.warning("zstandard not available. Artifacts will be compressed with gzip.")
+            compression = "gzip"
+        if compression not in CODEC_SUFFIXES:
+            raise ValueError(f"Unknown artifact compression: {compression}")
+
+        self.root = root
+        self.codec = compression
+        self.level = level
+        self.retention_days = retention_days
+        self.max_bytes = max_bytes
+        self._objects_dir = os.path.join(root, "objects")
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._records_since_prune = 0
+
+        os.makedirs(self._objects_dir, exist_ok=True)
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+
+    def _conn(self):
+        # One connection per thread; SQLite serializes writers across threads and processes
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(os.path.join(self.root, "index.sqlite"), timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _write_transaction(self):
+        # BEGIN IMMEDIATE takes the write lock up front, so an object cannot be pruned
+        # between the check that it is stored and the record that uses it
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    @staticmethod
+    def digest(data):
+        """Return the content address (hex SHA-256) of text or bytes."""
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        return hashlib.sha256(data).hexdigest()
+
+    def object_path(self, digest, codec=None):
+        """Return the file path of an object."""
+        suffix = CODEC_SUFFIXES[codec or self.codec]
+        return os.path.join(self._objects_dir, digest[:2], f"{digest}{suffix}")
+
+    def stored_path(self, digest):
+        """Return the file path of an object: where it is stored, or where put() will store it."""
+        row = self._conn().execute("SELECT codec FROM objects WHERE digest = ?", (digest,)).fetchone()
+        return self.object_path(digest, row["codec"] if row is not None else None)
+
+    def put(self, data, digest=None):
+        """
+        Store an artifact, unless identical content is already stored.
+
+        Args:
+            data: Text or bytes
+            digest: Content address if the caller already computed it
+
+        Returns:
+            Content address of the artifact
+        """
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        digest = digest or self.digest(data)
+        compressed = self._compress_unless_stored(data, digest)
+        if compressed is None:
+            return digest
+        with self._write_transaction() as conn:
+            self._put(conn, data, digest, compressed)
+        return digest
+
+    def _compress_unless_stored(self, data, digest):
+        # Compressing is the slow part, so it is done before the write lock is taken
+        if self._conn().execute("SELECT 1 FROM objects WHERE digest = ?", (digest,)).fetchone() is not None:
+            return None
+        return self._compress(data)
+
+    def _put(self, conn, data, digest, compressed=None):
+        # Runs inside a write transaction, so the object file and its row appear together
+        if conn.execute("SELECT 1 FROM objects WHERE digest = ?", (digest,)).fetchone() is not None:
+            return
+        if compressed is None:
+            compressed = self._compress(data)
+
+        path = self.object_path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file first so readers never see partial objects
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(compressed)
+        os.replace(tmp_path, path)
+
+        conn.execute(
+            "INSERT INTO objects (digest, codec, size, stored_size, created_at) VALUES (?, ?, ?, ?, ?)",
+            (digest, self.codec, len(data), len(compressed), time.time())
+        )
+        logger.debug(f"Stored artifact {digest} ({len(data)} bytes, {len(compressed)} compressed)")
+
+    def get(self, digest):
+        """
+        Read an artifact.
+
+        Args:
+            digest: Content address returned by put()
+
+        Returns:
+            The artifact's bytes, or None if it is not stored
+        """
+        row = self._conn().execute("SELECT codec FROM objects WHERE digest = ?", (digest,)).fetchone()
+        if row is None:
+            return None
+        try:
+            with open(self.object_path(digest, row["codec"]), "rb") as f:
+                return self._decompress(f.read(), row["codec"])
+        except FileNotFoundError:
+            return None
+
+    def record(self, kind, data, urls, instructions="", job_id=None, digest=None):
+        """
+        Store an artifact and index it under its job and request.
+
+        Args:
+            kind: Artifact kind, e.g. "content" or "document"
+            data: Text or bytes
+            urls: URLs the artifact was built from
+            instructions: Instructions of the request
+            job_id: Optional ID of the job that produced it
+            digest: Content address if the caller already computed it
+
+        Returns:
+            Content address of the artifact
+        """
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        digest = digest or self.digest(data)
+        compressed = self._compress_unless_stored(data, digest)
+        # The object and the record that uses it are written together, so a concurrent prune
+        # never sees the object unused or leaves the record pointing at a removed object
+        with self._write_transaction() as conn:
+            self._put(conn, data, digest, compressed)
+            conn.execute(
+                "INSERT INTO records (job_id, request_key, kind, digest, urls, instructions, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, request_key(urls, instructions), kind, digest, json.dumps(sorted(set(urls))),
+                 instructions or "", time.time())
+            )
+
+        with self._lock:
+            self._records_since_prune += 1
+            due = self._records_since_prune >= PRUNE_EVERY
+            if due:
+                self._records_since_prune = 0
+        if due:
+            self.prune()
+        return digest
+
+    def lookup(self, urls=None, instructions="", job_id=None, kind="document"):
+        """
+        Find the latest artifact of a job, or of a request (URL set and instructions).
+
+        Args:
+            urls: URLs of the request (ignored when job_id is given)
+            instructions: Instructions of the request
+            job_id: ID of the job
+            kind: Artifact kind
+
+        Returns:
+            Record dictionary (digest, job_id, urls, instructions, created_at), or None
+        """
+        if job_id is not None:
+            query, params = "job_id = ?", (job_id,)
+        else:
+            query, params = "request_key = ?", (request_key(urls or [], instructions),)
+        row = self._conn().execute(
+            f"SELECT * FROM records WHERE {query} AND kind = ? ORDER BY created_at DESC, id DESC LIMIT 1",
+            params + (kind,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {"digest": row["digest"], "job_id": row["job_id"], "urls": json.loads(row["urls"]),
+                "instructions": row["instructions"], "created_at": row["created_at"]}
+
+    def load(self, urls=None, instructions="", job_id=None, kind="document"):
+        """
+        Read the latest artifact of a job or request, as lookup() finds it.
+
+        Returns:
+            The decoded document for kind "document", text for other kinds, or None
+        """
+        found = self.lookup(urls, instructions, job_id=job_id, kind=kind)
+        if found is None:
+            return None
+        data = self.get(found["digest"])
+        if data is None:
+            return None
+        text = data.decode("utf-8")
+        return json.loads(text) if kind == "document" else text
+
+    def prune(self, retention_days=None, max_bytes=None):
+        """
+        Apply the retention policy.
+
+        Records older than the retention period are removed, then the oldest
+        records until the objects fit max_bytes, and finally every object no
+        record uses any more.
+
+        Args:
+            retention_days: Overrides the store's retention period
+            max_bytes: Overrides the store's size limit
+
+        Returns:
+            Dictionary with the numbers of records and objects removed and the bytes freed
+        """
+        retention_days = retention_days if retention_days is not None else self.retention_days
+        max_bytes = max_bytes if max_bytes is not None else self.max_bytes
+        conn = self._conn()
+        removed_records = 0
+
+        if retention_days is not None:
+            cutoff = time.time() - retention_days * 24 * 3600
+            removed_records += conn.execute("DELETE FROM records WHERE created_at < ?", (cutoff,)).rowcount
+
+        removed_objects, freed = self._remove_unused()
+
+        if max_bytes is not None:
+            total = self.stats()["stored_bytes"]
+            while total > max_bytes:
+                oldest = conn.execute("SELECT MIN(created_at) AS t FROM records").fetchone()["t"]
+                if oldest is None:
+                    break
+                removed_records += conn.execute("DELETE FROM records WHERE created_at <= ?", (oldest,)).rowcount
+                objects, bytes_freed = self._remove_unused()
+                removed_objects += objects
+                freed += bytes_freed
+                total -= bytes_freed
+
+        if removed_records or removed_objects:
+            logger.info(f"Pruned {removed_records} artifact records and {removed_objects} objects "
+                        f"({freed} bytes)")
+        return {"records": removed_records, "objects": removed_objects, "bytes": freed}
+
+    def _remove_unused(self):
+        # In a write transaction, so no record can start using an object while it is removed
+        with self._write_transaction() as conn:
+            rows = conn.execute(
+                "SELECT digest, codec, stored_size FROM objects "
+                "WHERE NOT EXISTS (SELECT 1 FROM records WHERE records.digest = objects.digest)"
+            ).fetchall()
+            freed = 0
+            for row in rows:
+                conn.execute("DELETE FROM objects WHERE digest = ?", (row["digest"],))
+                try:
+                    os.remove(self.object_path(row["digest"], row["codec"]))
+                except FileNotFoundError:
+                    pass
+                freed += row["stored_size"]
+        return len(rows), freed
+
+    def stats(self):
+        """Return the number of records and objects, and the raw and compressed bytes stored."""
+        conn = self._conn()
+        objects = conn.execute(
+            "SELECT COUNT(*) AS n, COALESCE(SUM(size), 0) AS size, COALESCE(SUM(stored_size), 0) AS stored "
+            "FROM objects"
+        ).fetchone()
+        records = conn.execute("SELECT COUNT(*) AS n FROM records").fetchone()["n"]
+        return {"records": records, "objects": objects["n"], "bytes": objects["size"],
+                "stored_bytes": objects["stored"]}
+
+    def close(self):
+        """Close the calling thread's index connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _compress(self, data):
+        if self.codec == "zstd":
+            zstandard = optional_import("zstandard")
+            return zstandard.ZstdCompressor(level=self.level or 10).compress(data)
+        if self.codec == "gzip":
+            return gzip.compress(data, compresslevel=self.level or 6)
+        return data
+
+    @staticmethod
+    def _decompress(data, codec):
+        if codec == "zstd":
+            zstandard = optional_import("zstandard", "zstandard not available. zstd artifacts cannot be read.")
+            if zstandard is None:
+                raise RuntimeError("Reading zstd artifacts requires the zstandard package")
+            return zstandard.ZstdDecompressor().decompress(data)
+        if codec == "gzip":
+            return gzip.decompress(data)
+        return data
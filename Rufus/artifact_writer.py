@@ -0,0 +1,163 @@
+import atexit
+import gzip
+import json
+import os
+import queue
+import threading
+import weakref
+from logger import logger
+
+# Writers with pending work are flushed at exit without the exit hook keeping them alive
+_live_writers = weakref.WeakSet()
+
+
+class ArtifactWriter:
+    """
+    Background writer for output artifacts (scraped content, synthesized documents).
+
+    Writes are queued and performed by a daemon thread, so callers never wait
+    for disk flushes of large files. Artifacts can be gzip-compressed or not
+    written at all. Pending writes are flushed when the interpreter exits;
+    close() flushes them and stops the thread.
+
+    With an ArtifactStore, artifacts go to the content-addressed store
+    instead of their paths, indexed under the job and request they belong to.
+    """
+    def __init__(self, compress=False, enabled=True, max_pending=64, store=None):
+        """
+        Initialize the writer.
+
+        Args:
+            compress: Whether to gzip artifacts (".gz" is appended to their paths)
+            enabled: Whether to write artifacts at all
+            max_pending: Maximum number of queued writes before callers block
+            store: Optional ArtifactStore that receives the artifacts instead of their paths
+        """
+        self.compress = compress
+        self.enabled = enabled
+        self.store = store
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        _live_writers.add(self)
+
+    def write_text(self, path, text, record=None):
+        """
+        Queue a text artifact.
+
+        Args:
+            path: Destination path (used only without a store)
+            text: Text to write
+            record: Index entry for the store: {"kind", "urls", "instructions", "job_id"}
+
+        Returns:
+            Path the artifact will be written to, or None if artifacts are disabled
+        """
+        if not self.enabled:
+            return None
+
+        if self.store is not None:
+            # The address is known before the write, so callers get the final path right away
+            digest = self.store.digest(text)
+            path = self.store.stored_path(digest)
+            item = (path, text, digest, record)
+        else:
+            if self.compress:
+                path = f"{path}.gz"
+            item = (path, text, None, None)
+        self._ensure_thread()
+        self._queue.put(item)
+        return path
+
+    def write_json(self, path, data, record=None):
+        """
+        Queue a JSON artifact.
+
+        The data is serialized right away, so callers may modify it afterwards.
+
+        Args:
+            path: Destination path (used only without a store)
+            data: JSON-serializable object
+            record: Index entry for the store, as for write_text
+
+        Returns:
+            Path the artifact will be written to, or None if artifacts are disabled
+        """
+        if not self.enabled:
+            return None
+        return self.write_text(path, json.dumps(data, indent=2), record=record)
+
+    def flush(self):
+        """Block until every queued artifact has been written."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self):
+        """Write every queued artifact and stop the background thread. A later write starts it again."""
+        with self._thread_lock:
+            thread, self._thread = self._thread, None
+        if thread is not None and thread.is_alive():
+            self._queue.put(None)
+            thread.join()
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="rufus-artifact-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    self._queue.task_done()
+                    return
+                self._handle(item)
+        finally:
+            # The store keeps one index connection per thread
+            if self.store is not None:
+                self.store.close()
+
+    def _handle(self, item):
+        path, text, digest, record = item
+        try:
+            if digest is None:
+                self._write(path, text)
+            elif record is not None:
+                self.store.record(record["kind"], text, record.get("urls", []), record.get("instructions", ""),
+                                  job_id=record.get("job_id"), digest=digest)
+            else:
+                self.store.put(text, digest=digest)
+        except Exception as e:
+            logger.warning(f"Failed to write artifact {path}: {str(e)}")
+        finally:
+            self._queue.task_done()
+
+    def _write(self, path, text):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Write to a temporary file first so readers never see partial artifacts
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        if path.endswith(".gz"):
+            with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=6) as f:
+                f.write(text)
+        else:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(text)
+        os.replace(tmp_path, path)
+        logger.debug(f"Artifact written to {path}")
+
+
+@atexit.register
+def _flush_all():
+    for writer in list(_live_writers):
+        writer.flush()
+
+
+# Writer shared by callers that do not configure their own
+default_writer = ArtifactWriter()
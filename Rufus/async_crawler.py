@@ -0,0 +1,179 @@
+import asyncio
+import random
+from urllib.parse import urlparse
+import requests
+from logger import logger
+from rate_limiter import AsyncRateLimiter
+from crawler import DEFAULT_USER_AGENT, render_page, robots_allows, extract_links
+from utils import optional_import
+
+
+def create_async_client(max_connections=20, user_agent=None):
+    """
+    Create the pooled async HTTP client shared by async crawls.
+
+    Args:
+        max_connections: Maximum open connections
+        user_agent: Custom user agent string
+
+    Returns:
+        httpx.AsyncClient, or None if httpx is not installed
+    """
+    httpx = optional_import("httpx", "httpx not available. Async crawling will run requests in worker threads.")
+    if httpx is None:
+        return None
+    return httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        headers={"User-Agent": user_agent or DEFAULT_USER_AGENT},
+        follow_redirects=True
+    )
+
+
+class AsyncWebCrawler:
+    """
+    asyncio version of WebCrawler.
+
+    Pages are fetched with a pooled httpx.AsyncClient and the per-domain rate
+    limit is awaited, so many crawls share one event loop and can be
+    cancelled at any await. Link extraction runs in a worker thread. With a
+    BrowserPool, pages are rendered by a pooled browser in a worker thread.
+    """
+    def __init__(self, requests_per_minute=20, respect_robots=True, user_agent=None, same_domain_only=True,
+                 rate_limiter=None, http_client=None, browser_pool=None, max_retries=5, base_delay=3):
+        """
+        Initialize the crawler.
+
+        Args:
+            requests_per_minute: Maximum requests per minute to a domain
+            respect_robots: Whether to respect robots.txt
+            user_agent: Custom user agent string
+            same_domain_only: Whether to only crawl pages on the same domain
+            rate_limiter: Existing AsyncRateLimiter to share with other crawlers
+            http_client: Existing httpx.AsyncClient to share connection pools with other crawlers
+            browser_pool: Optional BrowserPool for rendering JavaScript
+            max_retries: Maximum attempts per page
+            base_delay: Base delay between retries in seconds
+        """
+        self.rate_limiter = rate_limiter or AsyncRateLimiter(requests_per_minute=requests_per_minute)
+        self.respect_robots = respect_robots
+        self.user_agent = user_agent or DEFAULT_USER_AGENT
+        self.same_domain_only = same_domain_only
+        self.browser_pool = browser_pool
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.robots_rules = {}
+        self._owns_client = http_client is None
+        self.http_client = http_client if http_client is not None else create_async_client(user_agent=user_agent)
+
+    async def crawl(self, start_url, max_depth=1, max_pages=100):
+        """
+        Crawl a website starting from the given URL.
+
+        Args:
+            start_url: The URL to start crawling from
+            max_depth: Maximum crawl depth
+            max_pages: Maximum number of pages to crawl
+
+        Returns:
+            Dictionary mapping URLs to their HTML content
+        """
+        visited = set()
+        to_visit = [(start_url, 0)]
+        pages = {}
+        start_domain = urlparse(start_url).netloc
+
+        logger.info(f"Starting async crawl from {start_url} with max depth {max_depth} and max pages {max_pages}")
+
+        while to_visit and len(pages) < max_pages:
+            url, depth = to_visit.pop(0)
+
+            if url in visited or depth > max_depth:
+                continue
+            visited.add(url)
+
+            if self.same_domain_only and urlparse(url).netloc != start_domain:
+                logger.debug(f"Skipping {url} - different domain from start URL")
+                continue
+
+            logger.info(f"Crawling: {url} (depth: {depth})")
+            html = await self._get_page_content(url)
+            if not html:
+                continue
+            pages[url] = html
+
+            if depth >= max_depth:
+                continue
+
+            try:
+                links = await asyncio.to_thread(extract_links, html, url)
+                to_visit.extend((link, depth + 1) for link in links if link not in visited)
+                random.shuffle(to_visit)
+            except Exception as e:
+                logger.warning(f"Error extracting links from {url}: {str(e)}")
+
+        logger.info(f"Async crawl complete. Retrieved {len(pages)} pages")
+        return pages
+
+    async def _get_page_content(self, url):
+        await self.rate_limiter.wait_if_needed(urlparse(url).netloc)
+
+        if not await self._check_robots_txt(url):
+            logger.info(f"Skipping {url} - disallowed by robots.txt")
+            return None
+
+        try:
+            if self.browser_pool is not None:
+                html = await asyncio.to_thread(self._render, url)
+                if html is not None:
+                    return html
+
+            for attempt in range(self.max_retries):
+                response = await self._get(url, timeout=15)
+                if response.status_code < 400:
+                    return response.text
+                if attempt == self.max_retries - 1 or (response.status_code != 429 and response.status_code < 500):
+                    logger.warning(f"Failed to retrieve {url}: HTTP {response.status_code}")
+                    return None
+                delay = self.base_delay * (2 ** attempt) + random.uniform(0, 1)
+                logger.warning(f"HTTP {response.status_code} for {url}. Retrying in {delay:.2f} seconds...")
+                await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Failed to retrieve {url}: {str(e)}")
+        return None
+
+    def _render(self, url):
+        with self.browser_pool.driver() as driver:
+            return render_page(driver, url)
+
+    async def _check_robots_txt(self, url):
+        if not self.respect_robots:
+            return True
+
+        domain = urlparse(url).netloc
+        if domain not in self.robots_rules:
+            # Keep the robots.txt text per domain so every URL is checked against its own path
+            robots_text = ""
+            try:
+                response = await self._get(f"{urlparse(url).scheme}://{domain}/robots.txt", timeout=10)
+                if response.status_code == 200:
+                    robots_text = response.text
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Error checking robots.txt for {domain}: {str(e)}")
+            self.robots_rules[domain] = robots_text
+        return robots_allows(self.robots_rules[domain], url, self.user_agent)
+
+    async def _get(self, url, timeout):
+        headers = {"User-Agent": self.user_agent}
+        if self.http_client is not None:
+            return await self.http_client.get(url, headers=headers, timeout=timeout)
+        return await asyncio.to_thread(requests.get, url, headers=headers, timeout=timeout)
+
+    async def aclose(self):
+        """Close the HTTP client if this crawler created it."""
+        if self._owns_client and self.http_client is not None:
+            await self.http_client.aclose()
+            self.http_client = None
@@ -0,0 +1,179 @@
+import hashlib
+import re
+from logger import logger
+from text_normalizer import normalize_text
+from utils import estimate_tokens
+
+# Whitespace after sentence-ending punctuation separates sentences
+SENTENCE_GAP_PATTERN = re.compile(r'(?<=[.!?])\s+')
+HEADING_PATTERN = re.compile(r'<h([1-6])\b[^>]*>(.*?)</h\1\s*>', re.IGNORECASE | re.DOTALL)
+TAG_PATTERN = re.compile(r'<[^>]+>')
+
+# Characters per token, matching utils.estimate_tokens
+CHARS_PER_TOKEN = 4
+
+
+def passage_id(text):
+    """
+    Compute the stable ID of a passage.
+
+    The ID only depends on the passage text, so the same passage gets the
+    same ID on every run and on every page it appears on.
+
+    Args:
+        text: Passage text
+
+    Returns:
+        16-character hex digest
+    """
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=8).hexdigest()
+
+
+def extract_headings(html):
+    """
+    Find the text of the h1-h6 headings of a page, in document order.
+
+    Args:
+        html: HTML content of the page
+
+    Returns:
+        List of normalized heading strings
+    """
+    if not html:
+        return []
+
+    headings = []
+    for match in HEADING_PATTERN.finditer(html):
+        heading = normalize_text(TAG_PATTERN.sub(' ', match.group(2)))
+        if heading:
+            headings.append(heading)
+    return headings
+
+
+def _section_bounds(text, headings):
+    # Locate headings in reading order; each one found starts a new section
+    bounds = []
+    cursor = 0
+    for heading in headings or ():
+        position = text.find(heading, cursor)
+        if position < 0:
+            continue
+        bounds.append((position, heading))
+        cursor = position + len(heading)
+
+    if not bounds or bounds[0][0] > 0:
+        bounds.insert(0, (0, None))
+
+    sections = []
+    for i, (start, heading) in enumerate(bounds):
+        end = bounds[i + 1][0] if i + 1 < len(bounds) else len(text)
+        sections.append((start, end, heading))
+    return sections
+
+
+def _sentence_spans(text, start, end):
+    # (start, end) offsets of the sentences in text[start:end], whitespace excluded
+    position = start
+    for gap in SENTENCE_GAP_PATTERN.finditer(text, start, end):
+        if gap.start() > position:
+            yield position, gap.start()
+        position = gap.end()
+    while position < end and text[end - 1].isspace():
+        end -= 1
+    if position < end:
+        yield position, end
+
+
+def _split_long(text, start, end, max_chars):
+    # Break a sentence longer than the budget at word boundaries
+    while end - start > max_chars:
+        cut = text.rfind(' ', start + 1, start + max_chars)
+        if cut <= start:
+            cut = start + max_chars
+        yield start, cut
+        start = cut + 1 if text[cut] == ' ' else cut
+    if start < end:
+        yield start, end
+
+
+def iter_passages(text, url=None, max_tokens=200, headings=None):
+    """
+    Split extracted text into passages, lazily.
+
+    Passages never cross a heading, contain whole sentences where possible,
+    and stay within an approximate token budget. Offsets refer to the text
+    passed in, so text[start:end] is the passage text.
+
+    Args:
+        text: Extracted text of a page
+        url: URL of the page, copied onto each passage
+        max_tokens: Approximate maximum number of tokens per passage
+        headings: Optional heading strings of the page (see extract_headings)
+
+    Yields:
+        Passage dictionaries with id, url, text, start, end, heading and tokens
+    """
+    if not text:
+        return
+
+    max_chars = max(1, max_tokens) * CHARS_PER_TOKEN
+
+    for section_start, section_end, heading in _section_bounds(text, headings):
+        passage_start = None
+        passage_end = None
+
+        for sentence_start, sentence_end in _sentence_spans(text, section_start, section_end):
+            for piece_start, piece_end in _split_long(text, sentence_start, sentence_end, max_chars):
+                if passage_start is not None and piece_end - passage_start > max_chars:
+                    yield _make_passage(text, url, passage_start, passage_end, heading)
+                    passage_start = None
+                if passage_start is None:
+                    passage_start = piece_start
+                passage_end = piece_end
+
+        if passage_start is not None:
+            yield _make_passage(text, url, passage_start, passage_end, heading)
+
+
+def _make_passage(text, url, start, end, heading):
+    passage_text = text[start:end]
+    return {
+        "id": passage_id(passage_text),
+        "url": url,
+        "text": passage_text,
+        "start": start,
+        "end": end,
+        "heading": heading,
+        "tokens": estimate_tokens(passage_text),
+    }
+
+
+def chunk_pages(scraped_data, raw_pages=None, max_tokens=200, dedup=True):
+    """
+    Split every scraped page into passages, lazily.
+
+    Args:
+        scraped_data: Dictionary mapping URLs to extracted text
+        raw_pages: Optional dictionary mapping URLs to HTML, used to find section headings
+        max_tokens: Approximate maximum number of tokens per passage
+        dedup: Whether to drop passages already produced for an earlier page
+               (shared boilerplate such as cookie notices or site descriptions)
+
+    Yields:
+        Passage dictionaries, page by page in reading order
+    """
+    seen = set()
+    duplicates = 0
+
+    for url, text in scraped_data.items():
+        headings = extract_headings(raw_pages.get(url)) if raw_pages else None
+        for passage in iter_passages(text, url=url, max_tokens=max_tokens, headings=headings):
+            if dedup:
+                if passage["id"] in seen:
+                    duplicates += 1
+                    continue
+                seen.add(passage["id"])
+            yield passage
+
+    if duplicates:
+        logger.debug(f"Dropped {duplicates} duplicate passages across {len(scraped_data)} pages")
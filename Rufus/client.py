@@ -1,16 +1,51 @@
 import os
+import asyncio
+import itertools
 import logging
-from .crawler import crawl_website
-from .scraper import scrape_content, ContentAnalyzer
-from .synthesizer import synthesize_document
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from .crawler import crawl_website, WebCrawler, BrowserPool, create_session
+from .async_crawler import AsyncWebCrawler, create_async_client
+from .scraper import scrape_content, extract_matching, ContentAnalyzer
+from .keyword_matcher import compile_instructions
+from .extraction_cache import ExtractionCache
+from .extractor_stats import ExtractorStats
+from .extractors import ExtractorRegistry
+from .site_template import SiteTemplateLearner
+from .extraction_watchdog import ExtractionWatchdog
+from .llm_cache import LLMResponseCache
+from .artifact_store import ArtifactStore
+from .artifact_writer import ArtifactWriter
+from .relevance import select_relevant
+from .prompt_compaction import PromptCompactor
+from .synthesizer import (synthesize_document, asynthesize_document, stream_synthesize_document, synthesize_chunk,
+                          reduce_chunk_documents)
+from .synthesis_planner import ChunkPacker
+from .pipeline import Pipeline, Stage
+from .synthesis_backend import SynthesisBackend
 from .logger import setup_logger, logger
 from .utils import extract_domain
-from .rate_limiter import RateLimiter
+from .rate_limiter import RateLimiter, AsyncRateLimiter
 
 class RufusClient:
     def __init__(self, api_key=None, nim_api_key=None, log_level=logging.INFO, log_file=None,
                  requests_per_minute=20, use_selenium=True, max_depth=2, max_pages=50,
-                 output_dir="outputs", respect_robots=True, same_domain_only=True):
+                 output_dir="outputs", respect_robots=True, same_domain_only=True,
+                 extraction_cache_dir=None, extraction_cache_size=1024,
+                 extractor_stats_path=None, extractor_exploration_rate=0.05,
+                 extractors=None, disabled_extractors=None,
+                 site_templates=True, site_template_min_pages=3,
+                 extraction_timeout=10.0, page_extraction_timeout=30.0,
+                 max_html_chars=2_000_000, isolate_extraction=True,
+                 compact_prompt=True, compaction_threshold=0.8,
+                 relevance_top_k=None, relevance_token_budget=None, relevance_passages=False,
+                 synthesis_token_budget=24000, synthesis_concurrency=4,
+                 nim_base_url=None, nim_requests_per_minute=40, nim_tokens_per_minute=None, nim_max_retries=5,
+                 llm_cache=True, llm_cache_dir=None, llm_cache_ttl=7 * 24 * 3600,
+                 llm_cache_max_bytes=256 * 1024 * 1024, llm_cache_refresh=False,
+                 save_artifacts=True, compress_artifacts=False, artifact_store=True, artifact_dir=None,
+                 artifact_retention_days=30, artifact_max_bytes=None,
+                 pipelined=False, pipeline_extraction_workers=1, pipeline_queue_size=8):
         """
         Initialize the Rufus web scraping client.
         
@@ -26,6 +61,50 @@ class RufusClient:
             output_dir: Directory to store output files
             respect_robots: Whether to respect robots.txt
             same_domain_only: Whether to only crawl pages on the same domain
+            extraction_cache_dir: Optional directory for persisting extraction results across runs
+            extraction_cache_size: Maximum number of extraction results kept in memory
+            extractor_stats_path: Optional JSON file for persisting per-site extractor statistics
+            extractor_exploration_rate: Fraction of pages that run the default extractor order
+            extractors: Extraction methods to use, in cascade order (defaults to all available)
+            disabled_extractors: Extraction methods to leave out, e.g. ['goose']
+            site_templates: Whether to learn each site's layout and extract later pages with a selector lookup
+            site_template_min_pages: Pages of a site section to run through the full cascade before learning its layout
+            extraction_timeout: Seconds a single extraction method may spend on a page before it is abandoned
+            page_extraction_timeout: Seconds the whole extraction cascade may spend on a page
+            max_html_chars: Pages longer than this are truncated before extraction
+            isolate_extraction: Whether to run extractors in a worker process that is killed on timeout
+            compact_prompt: Whether to drop lines and sentences repeated across most pages (banners,
+                            navigation, footers) before synthesis
+            compaction_threshold: Fraction of pages a sentence must appear on to be dropped as boilerplate
+            relevance_top_k: If set, only the top-k pages (or passages) by BM25 score are synthesized
+            relevance_token_budget: If set, the most relevant content up to this many tokens is synthesized
+            relevance_passages: Whether relevance selection ranks passages instead of whole pages
+            synthesis_token_budget: Maximum estimated content tokens per synthesis call; larger content
+                                    is synthesized in concurrent chunks and then merged (None for one call)
+            synthesis_concurrency: Maximum number of concurrent synthesis calls
+            nim_base_url: Base URL of the NIM API (defaults to NVIDIA_NIM_BASE_URL or the public endpoint);
+                          point it at a MockNIMServer to synthesize offline
+            nim_requests_per_minute: Maximum NIM API requests per minute (None for no limit)
+            nim_tokens_per_minute: Maximum NIM API prompt and completion tokens per minute (None for no limit)
+            nim_max_retries: Maximum retries of a rate-limited or failed NIM API call
+            llm_cache: Whether to cache model responses so identical requests skip the API
+            llm_cache_dir: Directory for cached model responses (defaults to <output_dir>/llm_cache)
+            llm_cache_ttl: Seconds a cached model response stays valid
+            llm_cache_max_bytes: Maximum size of the response cache before old entries are evicted
+            llm_cache_refresh: Ignore cached responses but store the fresh ones
+            save_artifacts: Whether to save the scraped content and synthesized documents to output_dir
+            compress_artifacts: Whether to gzip saved artifacts (without an artifact store, which always compresses)
+            artifact_store: Whether artifacts go to a content-addressed, compressed and deduplicated store,
+                            indexed by job ID and request, instead of timestamped files in output_dir
+            artifact_dir: Directory of the artifact store (defaults to <output_dir>/artifacts)
+            artifact_retention_days: Days stored artifacts are kept (None to keep them)
+            artifact_max_bytes: Maximum compressed size of the artifact store before the oldest are pruned
+            pipelined: Whether scrape() runs crawling, extraction and the map phase of synthesis as
+                       concurrent stages instead of one after another (not used with relevance selection,
+                       which needs every page first)
+            pipeline_extraction_workers: Extraction threads in the pipeline (with isolated extraction, each
+                                         gets its own watchdog worker process)
+            pipeline_queue_size: Items buffered between pipeline stages before a stage waits for the next
         """
         # Configure logging if custom settings are provided
         if log_level != logging.INFO or log_file:
@@ -52,16 +131,99 @@ class RufusClient:
         self.output_dir = output_dir
         self.respect_robots = respect_robots
         self.same_domain_only = same_domain_only
+        self.relevance_top_k = relevance_top_k
+        self.relevance_token_budget = relevance_token_budget
+        self.relevance_passages = relevance_passages
+        self.synthesis_token_budget = synthesis_token_budget
+        self.synthesis_concurrency = synthesis_concurrency
+        self.pipelined = pipelined
+        self.pipeline_extraction_workers = pipeline_extraction_workers
+        self.pipeline_queue_size = pipeline_queue_size
+        self.last_pipeline_stats = None
         
         # Create output directory
         os.makedirs(output_dir, exist_ok=True)
         
+        # Initialize extraction backends once for all pages
+        self.extractor_registry = ExtractorRegistry(
+            extractors=extractors,
+            disabled=disabled_extractors
+        )
+        
+        # Cache extraction results so repeated pages skip the extractor cascade
+        self.extraction_cache = ExtractionCache(
+            max_entries=extraction_cache_size,
+            cache_dir=extraction_cache_dir,
+            config=self.extractor_registry.config()
+        )
+        
+        # Learn which extractors work for each site so later pages skip failing ones
+        self.extractor_stats = ExtractorStats(
+            stats_path=extractor_stats_path,
+            exploration_rate=extractor_exploration_rate
+        )
+        
+        # Learn each site's main-content selector so later pages skip the heavy extractors
+        self.site_templates = SiteTemplateLearner(
+            min_pages=site_template_min_pages,
+            enabled=site_templates
+        )
+        
+        # Keep pathological pages from stalling the job
+        self.extraction_watchdog = ExtractionWatchdog(
+            method_timeout=extraction_timeout,
+            page_timeout=page_extraction_timeout,
+            max_html_chars=max_html_chars,
+            isolate=isolate_extraction
+        )
+        
+        # Share one pooled, rate-limited NIM connection across every synthesis call
+        self.synthesis_backend = SynthesisBackend(
+            api_key=self.nim_api_key,
+            base_url=nim_base_url,
+            max_concurrency=synthesis_concurrency,
+            requests_per_minute=nim_requests_per_minute,
+            tokens_per_minute=nim_tokens_per_minute,
+            max_retries=nim_max_retries
+        )
+        
+        # Drop boilerplate repeated across pages so the prompt only pays for real content
+        self.prompt_compactor = PromptCompactor(
+            threshold=compaction_threshold,
+            enabled=compact_prompt
+        )
+        
+        # Cache model responses so re-running an identical job costs no tokens
+        self.llm_cache = LLMResponseCache(
+            cache_dir=llm_cache_dir or os.path.join(output_dir, "llm_cache"),
+            ttl=llm_cache_ttl,
+            max_bytes=llm_cache_max_bytes,
+            refresh=llm_cache_refresh
+        ) if llm_cache else None
+        
+        # Store artifacts once per content, compressed, and prune the ones past the retention policy
+        self.artifact_store = None
+        if save_artifacts and artifact_store:
+            self.artifact_store = ArtifactStore(
+                artifact_dir or os.path.join(output_dir, "artifacts"),
+                retention_days=artifact_retention_days,
+                max_bytes=artifact_max_bytes
+            )
+            self.artifact_store.prune()
+        
+        # Save artifacts in the background so synthesis never waits for disk writes
+        self.artifact_writer = ArtifactWriter(
+            compress=compress_artifacts,
+            enabled=save_artifacts,
+            store=self.artifact_store
+        )
+        
         # Initialize content analyzer
         self.content_analyzer = ContentAnalyzer()
             
         logger.info("RufusClient initialized successfully")
 
-    def scrape(self, url, instructions="", max_depth=None, max_pages=None):
+    def scrape(self, url, instructions="", max_depth=None, max_pages=None, crawler=None, job_id=None):
         """
         Scrape content from a URL and synthesize it based on instructions.
         
@@ -70,9 +232,469 @@ class RufusClient:
             instructions: Instructions for content filtering and synthesis
             max_depth: Maximum crawling depth (overrides the client setting)
             max_pages: Maximum number of pages to crawl (overrides the client setting)
+            crawler: Optional WebCrawler to crawl with, e.g. one from shared_crawlers()
+            job_id: Optional ID the artifacts are saved under, for find_result()
+            
+        Returns:
+            Structured document synthesized from the scraped content
+        """
+        if self.pipelined and self.relevance_top_k is None and self.relevance_token_budget is None:
+            return self._scrape_pipelined(url, instructions, max_depth, max_pages, crawler=crawler, job_id=job_id)
+        
+        scraped_data, response = self._gather_content(url, instructions, max_depth, max_pages, crawler=crawler)
+        if scraped_data is None:
+            return response
+        
+        # Step 3: Synthesize the scraped data into a structured document using Nvidia NIM API
+        logger.info("Step 3: Synthesizing document")
+        document = synthesize_document(
+            scraped_data, 
+            instructions, 
+            nim_api_key=self.nim_api_key,
+            output_dir=self.output_dir,
+            max_prompt_tokens=self.synthesis_token_budget,
+            max_concurrency=self.synthesis_concurrency,
+            cache=self.llm_cache,
+            writer=self.artifact_writer,
+            backend=self.synthesis_backend,
+            job_id=job_id,
+            source_urls=[url]
+        )
+        logger.info("Document synthesis complete")
+        
+        return document
+
+    def _scrape_pipelined(self, url, instructions, max_depth=None, max_pages=None, crawler=None, job_id=None):
+        """
+        Scrape with crawling, extraction and map-phase synthesis running as concurrent stages.
+        
+        Pages are extracted while the crawl goes on, packed into chunks of
+        synthesis_token_budget tokens, and each chunk is synthesized as soon as
+        it is full; the partial documents are reduced at the end. Boilerplate
+        is compacted per chunk. Per-stage utilization is logged and kept in
+        last_pipeline_stats.
+        
+        Returns:
+            Structured document synthesized from the scraped content
+        """
+        logger.info(f"Starting pipelined scrape operation for URL: {url}")
+        
+        max_depth = max_depth if max_depth is not None else self.max_depth
+        max_pages = max_pages if max_pages is not None else self.max_pages
+        
+        matcher = compile_instructions(instructions, ContentAnalyzer.common_stop_words)
+        packer = ChunkPacker(self.synthesis_token_budget)
+        chunk_numbers = itertools.count()
+        first_page = {}
+        
+        def extract(page):
+            page_url, html = page
+            if not first_page:
+                first_page[page_url] = html
+            match = extract_matching(page_url, html, matcher, cache=self.extraction_cache, stats=self.extractor_stats,
+                                     registry=self.extractor_registry, templates=self.site_templates,
+                                     watchdog=self.extraction_watchdog)
+            return [(page_url, match[0])] if match is not None else []
+        
+        def number(chunks):
+            return [(next(chunk_numbers), chunk) for chunk in chunks]
+        
+        def synthesize(numbered_chunk):
+            index, chunk = numbered_chunk
+            compacted, _ = self.prompt_compactor.compact(dict(chunk))
+            chunk = list(compacted.items())
+            partial = synthesize_chunk(chunk, instructions, self.nim_api_key, cache=self.llm_cache,
+                                       backend=self.synthesis_backend)
+            return [(index, chunk, partial)]
+        
+        owns_crawler = crawler is None
+        if owns_crawler:
+            crawler = WebCrawler(
+                requests_per_minute=self.requests_per_minute,
+                use_selenium=self.use_selenium,
+                respect_robots=self.respect_robots,
+                same_domain_only=self.same_domain_only
+            )
+        pipeline = Pipeline(
+            crawler.iter_crawl(url, max_depth=max_depth, max_pages=max_pages),
+            [
+                Stage("extract", extract, workers=self.pipeline_extraction_workers),
+                Stage("pack", lambda page: number(packer.add(*page)), flush=lambda: number(packer.flush())),
+                Stage("synthesize", synthesize, workers=self.synthesis_concurrency),
+            ],
+            queue_size=self.pipeline_queue_size,
+            source_name="fetch"
+        )
+        try:
+            results = sorted(pipeline.run(), key=lambda result: result[0])
+        finally:
+            if owns_crawler:
+                crawler.close()
+            self.last_pipeline_stats = pipeline.stats()
+            self.extractor_stats.save()
+        
+        if not first_page:
+            logger.warning("No pages retrieved during crawling")
+            return {"response": "NO WEB CONTENT"}
+        
+        if not results:
+            # Nothing matched the instructions; synthesize the first page, as scrape() does
+            scraped_data = scrape_content(first_page, instructions, cache=self.extraction_cache,
+                                          stats=self.extractor_stats, registry=self.extractor_registry,
+                                          templates=self.site_templates, watchdog=self.extraction_watchdog)
+            return synthesize_document(scraped_data, instructions, nim_api_key=self.nim_api_key,
+                                       output_dir=self.output_dir, cache=self.llm_cache, writer=self.artifact_writer,
+                                       backend=self.synthesis_backend, job_id=job_id, source_urls=[url])
+        
+        logger.info(f"Reducing {len(results)} partial documents")
+        document = reduce_chunk_documents(
+            [partial for _, _, partial in results],
+            [chunk for _, chunk, _ in results],
+            instructions,
+            nim_api_key=self.nim_api_key,
+            output_dir=self.output_dir,
+            max_prompt_tokens=self.synthesis_token_budget,
+            max_concurrency=self.synthesis_concurrency,
+            cache=self.llm_cache,
+            writer=self.artifact_writer,
+            backend=self.synthesis_backend,
+            job_id=job_id,
+            source_urls=[url]
+        )
+        logger.info("Document synthesis complete")
+        return document
+
+    def scrape_stream(self, url, instructions="", max_depth=None, max_pages=None):
+        """
+        Scrape content from a URL and stream the synthesized document field by field.
+        
+        Args:
+            url: The URL to scrape
+            instructions: Instructions for content filtering and synthesis
+            max_depth: Maximum crawling depth (overrides the client setting)
+            max_pages: Maximum number of pages to crawl (overrides the client setting)
+            
+        Yields:
+            {"event": "field", "key": ..., "value": ...} as each top-level field completes,
+            then {"event": "document", "document": ...} with the final document
+        """
+        scraped_data, response = self._gather_content(url, instructions, max_depth, max_pages)
+        if scraped_data is None:
+            yield {"event": "document", "document": response}
+            return
+        
+        logger.info("Step 3: Streaming document synthesis")
+        yield from stream_synthesize_document(
+            scraped_data,
+            instructions,
+            nim_api_key=self.nim_api_key,
+            output_dir=self.output_dir,
+            max_prompt_tokens=self.synthesis_token_budget,
+            max_concurrency=self.synthesis_concurrency,
+            cache=self.llm_cache,
+            writer=self.artifact_writer,
+            backend=self.synthesis_backend,
+            source_urls=[url]
+        )
+
+    def scrape_many(self, jobs, concurrency=4, max_depth=None, max_pages=None):
+        """
+        Scrape many URLs in parallel, yielding each result as soon as it finishes.
+        
+        Jobs share one HTTP connection pool, the per-domain rate limiter, a pool
+        of at most `concurrency` browsers, the extraction and response caches and
+        the synthesis backend. A job that fails does not affect the others.
+        
+        Args:
+            jobs: Iterable of URLs, (url, instructions) tuples, or dicts with "url" and optional
+                  "instructions", "max_depth" and "max_pages"
+            concurrency: Maximum number of jobs running at once
+            max_depth: Default maximum crawling depth (overrides the client setting)
+            max_pages: Default maximum number of pages to crawl (overrides the client setting)
+            
+        Yields:
+            {"job": index, "url": ..., "document": ...} for each finished job, or
+            {"job": index, "url": ..., "error": ...} for a job that raised, in completion order
+        """
+        jobs = [self._normalize_job(job, max_depth, max_pages) for job in jobs]
+        logger.info(f"Starting batch of {len(jobs)} scrape jobs with concurrency {concurrency}")
+        
+        def run(job):
+            return self.scrape(job["url"], job["instructions"], job["max_depth"], job["max_pages"],
+                               crawler=new_crawler())
+        
+        with self.shared_crawlers(concurrency) as new_crawler:
+            executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="rufus-job")
+            try:
+                futures = {executor.submit(run, job): index for index, job in enumerate(jobs)}
+                for future in as_completed(futures):
+                    index = futures[future]
+                    url = jobs[index]["url"]
+                    try:
+                        yield {"job": index, "url": url, "document": future.result()}
+                    except Exception as e:
+                        logger.error(f"Scrape job {index} for {url} failed: {str(e)}", exc_info=True)
+                        yield {"job": index, "url": url, "error": str(e)}
+            finally:
+                # Stop queued jobs if the caller stops consuming results early
+                executor.shutdown(wait=True, cancel_futures=True)
+                logger.info("Batch of scrape jobs complete")
+
+    @contextmanager
+    def shared_crawlers(self, concurrency=4):
+        """
+        Share crawl resources between many scrapes.
+        
+        Crawlers from the yielded factory share one HTTP connection pool, the
+        per-domain rate limiter and a pool of at most `concurrency` browsers,
+        which are closed when the context exits.
+        
+        Args:
+            concurrency: Maximum number of crawlers used at once
+            
+        Yields:
+            Function returning a new WebCrawler on the shared resources
+        """
+        rate_limiter = RateLimiter(requests_per_minute=self.requests_per_minute)
+        session = create_session(pool_size=max(10, concurrency * 2))
+        browser_pool = BrowserPool(size=concurrency) if self.use_selenium else None
+        
+        def new_crawler():
+            return WebCrawler(
+                requests_per_minute=self.requests_per_minute,
+                use_selenium=self.use_selenium,
+                respect_robots=self.respect_robots,
+                same_domain_only=self.same_domain_only,
+                rate_limiter=rate_limiter,
+                session=session,
+                browser_pool=browser_pool
+            )
+        
+        try:
+            yield new_crawler
+        finally:
+            session.close()
+            if browser_pool is not None:
+                browser_pool.close()
+
+    @staticmethod
+    def _normalize_job(job, max_depth=None, max_pages=None):
+        """Turn a URL, (url, instructions) tuple or dict into a job dict."""
+        if isinstance(job, str):
+            job = {"url": job}
+        elif isinstance(job, (tuple, list)):
+            job = dict(zip(("url", "instructions"), job))
+        else:
+            job = dict(job)
+        job.setdefault("instructions", "")
+        job.setdefault("max_depth", max_depth)
+        job.setdefault("max_pages", max_pages)
+        return job
+
+    async def ascrape(self, url, instructions="", max_depth=None, max_pages=None, timeout=None):
+        """
+        Scrape content from a URL and synthesize it without blocking the event loop.
+        
+        Pages are fetched asynchronously, extraction runs in a worker thread
+        (with isolate_extraction, the extractors themselves run in the
+        watchdog's worker process), and synthesis uses the async OpenAI client.
+        Cancelling the awaiting task stops the job at its next await.
+        
+        Args:
+            url: The URL to scrape
+            instructions: Instructions for content filtering and synthesis
+            max_depth: Maximum crawling depth (overrides the client setting)
+            max_pages: Maximum number of pages to crawl (overrides the client setting)
+            timeout: Optional limit in seconds for the whole job
             
         Returns:
             Structured document synthesized from the scraped content
+            
+        Raises:
+            asyncio.TimeoutError: If the job does not finish within the timeout
+        """
+        job = self._ascrape_with(
+            {"url": url, "instructions": instructions, "max_depth": max_depth, "max_pages": max_pages}
+        )
+        return await asyncio.wait_for(job, timeout) if timeout else await job
+
+    async def ascrape_many(self, jobs, concurrency=4, timeout=None, max_depth=None, max_pages=None):
+        """
+        Scrape many URLs concurrently on the event loop, yielding results as they finish.
+        
+        At most `concurrency` jobs run at once and the next job only starts
+        when a result has been consumed, so a slow consumer holds back the
+        batch instead of buffering results. Jobs share one async connection
+        pool, the per-domain rate limiter, the caches and the synthesis
+        backend. Failing or timed-out jobs yield an error entry.
+        
+        Args:
+            jobs: Iterable or async iterable of URLs, (url, instructions) tuples, or dicts
+                  with "url" and optional "instructions", "max_depth" and "max_pages"
+            concurrency: Maximum number of jobs running at once
+            timeout: Optional limit in seconds for each job
+            max_depth: Default maximum crawling depth (overrides the client setting)
+            max_pages: Default maximum number of pages to crawl (overrides the client setting)
+            
+        Yields:
+            {"job": index, "url": ..., "document": ...} for each finished job, or
+            {"job": index, "url": ..., "error": ...} for a job that failed, in completion order
+        """
+        rate_limiter = AsyncRateLimiter(requests_per_minute=self.requests_per_minute)
+        http_client = create_async_client(max_connections=max(20, concurrency * 2))
+        browser_pool = BrowserPool(size=concurrency) if self.use_selenium else None
+        job_iterator = self._iterate_jobs(jobs)
+        pending = {}
+        
+        async def start_next():
+            try:
+                index, job = await job_iterator.__anext__()
+            except StopAsyncIteration:
+                return False
+            job = self._normalize_job(job, max_depth, max_pages)
+            crawler = AsyncWebCrawler(
+                requests_per_minute=self.requests_per_minute,
+                respect_robots=self.respect_robots,
+                same_domain_only=self.same_domain_only,
+                rate_limiter=rate_limiter,
+                http_client=http_client,
+                browser_pool=browser_pool
+            )
+            run = self._ascrape_with(job, crawler)
+            task = asyncio.ensure_future(asyncio.wait_for(run, timeout) if timeout else run)
+            pending[task] = (index, job["url"])
+            return True
+        
+        try:
+            while len(pending) < concurrency and await start_next():
+                pass
+            
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    index, url = pending.pop(task)
+                    try:
+                        result = {"job": index, "url": url, "document": task.result()}
+                    except asyncio.TimeoutError:
+                        logger.error(f"Scrape job {index} for {url} timed out after {timeout}s")
+                        result = {"job": index, "url": url, "error": f"Timed out after {timeout}s"}
+                    except Exception as e:
+                        logger.error(f"Scrape job {index} for {url} failed: {str(e)}", exc_info=True)
+                        result = {"job": index, "url": url, "error": str(e)}
+                    yield result
+                    await start_next()
+        finally:
+            # Cancel running jobs if the caller stops consuming results or is cancelled
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            if http_client is not None:
+                await http_client.aclose()
+            if browser_pool is not None:
+                await asyncio.to_thread(browser_pool.close)
+
+    @staticmethod
+    async def _iterate_jobs(jobs):
+        """Enumerate a sync or async iterable of jobs."""
+        index = 0
+        if hasattr(jobs, "__aiter__"):
+            async for job in jobs:
+                yield index, job
+                index += 1
+        else:
+            for job in jobs:
+                yield index, job
+                index += 1
+
+    async def _ascrape_with(self, job, crawler=None):
+        """Run one async job, crawling with the given AsyncWebCrawler or a new one."""
+        logger.info(f"Starting async scrape operation for URL: {job['url']}")
+        max_depth = job.get("max_depth") if job.get("max_depth") is not None else self.max_depth
+        max_pages = job.get("max_pages") if job.get("max_pages") is not None else self.max_pages
+        instructions = job.get("instructions", "")
+        
+        owns_crawler = crawler is None
+        browser_pool = None
+        if owns_crawler:
+            # Render JavaScript like scrape() and ascrape_many() do, with a browser for this job
+            browser_pool = BrowserPool(size=1) if self.use_selenium else None
+            crawler = AsyncWebCrawler(
+                requests_per_minute=self.requests_per_minute,
+                respect_robots=self.respect_robots,
+                same_domain_only=self.same_domain_only,
+                browser_pool=browser_pool
+            )
+        try:
+            raw_pages = await crawler.crawl(job["url"], max_depth=max_depth, max_pages=max_pages)
+        finally:
+            if owns_crawler:
+                await crawler.aclose()
+            if browser_pool is not None:
+                await asyncio.to_thread(browser_pool.close)
+        
+        # Extraction is CPU-bound; keep it off the event loop
+        scraped_data, response = await asyncio.to_thread(self._process_pages, raw_pages, instructions)
+        if scraped_data is None:
+            return response
+        
+        return await asynthesize_document(
+            scraped_data,
+            instructions,
+            nim_api_key=self.nim_api_key,
+            output_dir=self.output_dir,
+            max_prompt_tokens=self.synthesis_token_budget,
+            max_concurrency=self.synthesis_concurrency,
+            cache=self.llm_cache,
+            writer=self.artifact_writer,
+            backend=self.synthesis_backend,
+            source_urls=[job["url"]]
+        )
+
+    def find_result(self, url=None, instructions="", job_id=None):
+        """
+        Look up a previously synthesized document in the artifact store.
+        
+        The lookup goes through the store's index, so it takes the same time
+        however many artifacts are stored.
+        
+        Args:
+            url: URL (or list of URLs) the document was scraped from
+            instructions: Instructions it was synthesized for
+            job_id: ID of the job that produced it (takes precedence over url and instructions)
+            
+        Returns:
+            The latest matching document, or None if there is none or no store is used
+        """
+        if self.artifact_store is None:
+            return None
+        # Artifacts still queued in the writer are not in the index yet
+        self.artifact_writer.flush()
+        urls = [url] if isinstance(url, str) else list(url or [])
+        return self.artifact_store.load(urls, instructions, job_id=job_id)
+
+    def close(self):
+        """Close the pooled NIM connections, stop the extraction workers and flush pending artifacts."""
+        self.synthesis_backend.close()
+        self.extraction_watchdog.close()
+        self.artifact_writer.close()
+        if self.artifact_store is not None:
+            self.artifact_store.close()
+
+    async def aclose(self):
+        """Close the pooled NIM connections (sync and async), stop the extraction workers and flush artifacts."""
+        await self.synthesis_backend.aclose()
+        await asyncio.to_thread(self.close)
+
+    def _gather_content(self, url, instructions, max_depth=None, max_pages=None, crawler=None):
+        """
+        Crawl a site and extract the content relevant to the instructions.
+        
+        Args:
+            crawler: Optional WebCrawler to crawl with (scrape_many passes one built on shared
+                     resources); without one, a crawler is created and closed for this call
+        
+        Returns:
+            Tuple of (scraped data, None), or (None, response document) when there is nothing to synthesize
         """
         logger.info(f"Starting scrape operation for URL: {url}")
         
@@ -82,40 +704,65 @@ class RufusClient:
         
         # Step 1: Crawl the website to retrieve raw HTML pages
         logger.info(f"Step 1: Crawling website with depth {max_depth} and max pages {max_pages}")
-        raw_pages = crawl_website(
-            url, 
-            max_depth=max_depth,
-            max_pages=max_pages,
-            requests_per_minute=self.requests_per_minute,
-            use_selenium=self.use_selenium,
-            respect_robots=self.respect_robots,
-            same_domain_only=self.same_domain_only
-        )
+        if crawler is not None:
+            raw_pages = crawler.crawl(url, max_depth=max_depth, max_pages=max_pages)
+        else:
+            raw_pages = crawl_website(
+                url, 
+                max_depth=max_depth,
+                max_pages=max_pages,
+                requests_per_minute=self.requests_per_minute,
+                use_selenium=self.use_selenium,
+                respect_robots=self.respect_robots,
+                same_domain_only=self.same_domain_only
+            )
+        
+        return self._process_pages(raw_pages, instructions)
+
+    def _process_pages(self, raw_pages, instructions):
+        """
+        Extract, compact and select the content of crawled pages.
         
+        Returns:
+            Tuple of (scraped data, None), or (None, response document) when there is nothing to synthesize
+        """
         if not raw_pages:
             logger.warning("No pages retrieved during crawling")
-            return {"response": "NO WEB CONTENT"}
+            return None, {"response": "NO WEB CONTENT"}
             
         logger.info(f"Crawling complete. Retrieved {len(raw_pages)} pages")
         
         # Step 2: Filter and extract relevant content based on the given instructions
         logger.info("Step 2: Extracting relevant content")
-        scraped_data = scrape_content(raw_pages, instructions)
+        scraped_data = scrape_content(
+            raw_pages,
+            instructions,
+            cache=self.extraction_cache,
+            stats=self.extractor_stats,
+            registry=self.extractor_registry,
+            templates=self.site_templates,
+            watchdog=self.extraction_watchdog
+        )
         
         if not scraped_data:
             logger.warning("No relevant content found")
-            return {"response": "NO RELEVANT CONTENT"}
+            return None, {"response": "NO RELEVANT CONTENT"}
             
         logger.info(f"Extraction complete. Processed {len(scraped_data)} pages")
         
-        # Step 3: Synthesize the scraped data into a structured document using Nvidia NIM API
-        logger.info("Step 3: Synthesizing document")
-        document = synthesize_document(
-            scraped_data, 
-            instructions, 
-            nim_api_key=self.nim_api_key,
-            output_dir=self.output_dir
-        )
-        logger.info("Document synthesis complete")
+        # Drop banners, navigation and footers repeated across pages
+        scraped_data, _ = self.prompt_compactor.compact(scraped_data)
         
-        return document
+        # Keep only the most relevant content so the synthesis prompt stays small
+        if self.relevance_top_k is not None or self.relevance_token_budget is not None:
+            scraped_data = select_relevant(
+                scraped_data,
+                instructions,
+                top_k=self.relevance_top_k,
+                token_budget=self.relevance_token_budget,
+                passages=self.relevance_passages,
+                stop_words=ContentAnalyzer.common_stop_words,
+                raw_pages=raw_pages
+            )
+        
+        return scraped_data, None
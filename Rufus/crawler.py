@@ -1,20 +1,323 @@
 import requests
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.common.exceptions import TimeoutException
-from webdriver_manager.chrome import ChromeDriverManager
+import os
 import time
 import random
+import queue
+import threading
+from contextlib import contextmanager
 from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
 from logger import logger
 from utils import normalize_url, is_same_domain, clean_text
 from rate_limiter import RateLimiter
 
+DEFAULT_USER_AGENT = 'Rufus Web Crawler/1.0'
+
+# Where the resolved ChromeDriver path is remembered between runs
+DRIVER_PATH_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "rufus", "chromedriver_path")
+
+_driver_path = None
+_driver_path_from_cache = False
+_driver_path_lock = threading.Lock()
+
+def chromedriver_path(stale=None):
+    """
+    Resolve the ChromeDriver binary once per process.
+    
+    The CHROMEDRIVER_PATH environment variable wins. Otherwise the path found
+    by an earlier run is reused if the binary still exists, so webdriver_manager
+    (which checks for new releases over the network) only runs the first time.
+    
+    Args:
+        stale: Path that failed to start; if it is the one remembered from an earlier
+               run, it is forgotten and webdriver_manager resolves the driver again
+    
+    Returns:
+        Path to the ChromeDriver binary
+    """
+    global _driver_path, _driver_path_from_cache
+    with _driver_path_lock:
+        if stale is not None and stale == _driver_path and _driver_path_from_cache:
+            logger.info(f"Resolving ChromeDriver again instead of the cached {stale}")
+            _driver_path = None
+            try:
+                os.remove(DRIVER_PATH_CACHE)
+            except OSError:
+                pass
+        
+        if _driver_path is not None:
+            return _driver_path
+        
+        path = os.getenv('CHROMEDRIVER_PATH')
+        from_cache = False
+        if not path:
+            try:
+                with open(DRIVER_PATH_CACHE, encoding="utf-8") as f:
+                    path = f.read().strip()
+            except OSError:
+                path = None
+            from_cache = bool(path) and os.path.exists(path)
+            if not from_cache:
+                from webdriver_manager.chrome import ChromeDriverManager
+                path = ChromeDriverManager().install()
+                try:
+                    os.makedirs(os.path.dirname(DRIVER_PATH_CACHE), exist_ok=True)
+                    with open(DRIVER_PATH_CACHE, "w", encoding="utf-8") as f:
+                        f.write(path)
+                except OSError as e:
+                    logger.debug(f"Could not cache the ChromeDriver path: {str(e)}")
+        
+        logger.debug(f"Using ChromeDriver at {path}")
+        _driver_path = path
+        _driver_path_from_cache = from_cache
+        return _driver_path
+
+def start_chrome(options):
+    """
+    Start Chrome with the resolved ChromeDriver.
+    
+    A cached driver can stop working when Chrome is upgraded past it. If it
+    fails to start, the driver is resolved again and started once more.
+    
+    Args:
+        options: selenium ChromeOptions
+        
+    Returns:
+        WebDriver
+    """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    
+    path = chromedriver_path()
+    try:
+        return webdriver.Chrome(service=Service(path), options=options)
+    except Exception as e:
+        fresh_path = chromedriver_path(stale=path)
+        if fresh_path == path:
+            raise
+        logger.warning(f"ChromeDriver at {path} failed to start ({str(e)}); retrying with {fresh_path}")
+        return webdriver.Chrome(service=Service(fresh_path), options=options)
+
+def create_driver(headless=True, user_agent=None):
+    """
+    Start a Chrome WebDriver.
+    
+    Args:
+        headless: Whether to run the browser in headless mode
+        user_agent: Custom user agent string
+        
+    Returns:
+        WebDriver, or None if Selenium could not be started
+    """
+    try:
+        # Selenium is only imported by crawls that render JavaScript
+        from selenium.webdriver.chrome.options import Options
+        
+        options = Options()
+        if headless:
+            options.add_argument('--headless')
+        
+        options.add_argument(f'user-agent={user_agent or DEFAULT_USER_AGENT}')
+        options.add_argument('--disable-gpu')
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+        
+        # Set up Chrome WebDriver
+        driver = start_chrome(options)
+        driver.set_page_load_timeout(30)  # Set timeout to 30 seconds
+        
+        logger.info("Selenium WebDriver initialized successfully")
+        return driver
+    except Exception as e:
+        logger.error(f"Failed to initialize Selenium: {str(e)}")
+        return None
+
+def render_page(driver, url):
+    """
+    Render a page in a browser.
+    
+    Args:
+        driver: WebDriver, or None
+        url: URL of the page
+        
+    Returns:
+        HTML after JavaScript execution, or None so the caller falls back to requests
+    """
+    if driver is None:
+        return None
+    from selenium.common.exceptions import TimeoutException
+    try:
+        logger.debug(f"Fetching {url} with Selenium")
+        driver.get(url)
+        
+        # Wait for dynamic content to load
+        time.sleep(random.uniform(1, 3))
+        
+        # Get the page source after JavaScript execution
+        return driver.page_source
+    except TimeoutException:
+        logger.warning(f"Selenium timeout for {url}, falling back to requests")
+    except Exception as e:
+        logger.warning(f"Selenium error for {url}: {str(e)}, falling back to requests")
+    return None
+
+def robots_allows(robots_text, url, user_agent):
+    """
+    Check a robots.txt for whether our user agent may fetch a URL.
+    
+    Args:
+        robots_text: Content of the site's robots.txt
+        url: URL to check
+        user_agent: Our user agent string
+        
+    Returns:
+        True if the URL is not disallowed
+    """
+    # Very simple robots.txt parsing - just check if our user agent is disallowed
+    lines = robots_text.lower().split('\n')
+    user_agent_applies = False
+    
+    for line in lines:
+        if line.startswith('user-agent:'):
+            agent = line.split(':', 1)[1].strip()
+            if agent == '*' or user_agent.lower() in agent:
+                user_agent_applies = True
+            else:
+                user_agent_applies = False
+        
+        if user_agent_applies and line.startswith('disallow:'):
+            path = line.split(':', 1)[1].strip()
+            if path and urlparse(url).path.startswith(path):
+                return False
+    
+    return True
+
+def extract_links(html, base_url):
+    """
+    Find the crawlable links on a page.
+    
+    Args:
+        html: HTML content of the page
+        base_url: URL of the page, for resolving relative links
+        
+    Returns:
+        List of normalized URLs
+    """
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, "html.parser")
+    links = []
+    for a_tag in soup.find_all('a', href=True):
+        link = normalize_url(a_tag['href'], base=base_url)
+        if link:
+            links.append(link)
+    return links
+
+def create_session(pool_size=10):
+    """
+    Create a requests session whose connection pool is shared by parallel crawls.
+    
+    Args:
+        pool_size: Maximum connections kept open per host
+        
+    Returns:
+        requests.Session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+class BrowserPool:
+    """
+    Pool of Selenium browsers shared by crawlers running in parallel.
+    
+    Browsers are started on first use, up to the pool size, and reused
+    afterwards, so parallel jobs neither start a browser each nor share one
+    browser between threads.
+    """
+    def __init__(self, size=2, headless=True, user_agent=None):
+        """
+        Initialize the pool.
+        
+        Args:
+            size: Maximum number of browsers
+            headless: Whether to run the browsers in headless mode
+            user_agent: Custom user agent string
+        """
+        self.size = size
+        self.headless = headless
+        self.user_agent = user_agent
+        self.available = True
+        self._idle = queue.LifoQueue()
+        self._drivers = []
+        self._lock = threading.Lock()
+    
+    @contextmanager
+    def driver(self):
+        """
+        Borrow a browser for the duration of the block.
+        
+        Yields:
+            WebDriver, or None if no browser can be started
+        """
+        driver = self._acquire()
+        try:
+            yield driver
+        finally:
+            if driver is not None:
+                self._idle.put(driver)
+    
+    def _acquire(self):
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            
+            with self._lock:
+                if not self.available:
+                    return None
+                start_new = len(self._drivers) < self.size
+                if start_new:
+                    # Reserve the slot before the slow browser start
+                    self._drivers.append(None)
+            
+            if start_new:
+                break
+            
+            # Every browser is busy; wait for one to be returned
+            try:
+                return self._idle.get(timeout=1)
+            except queue.Empty:
+                continue
+        
+        driver = create_driver(headless=self.headless, user_agent=self.user_agent)
+        with self._lock:
+            self._drivers.remove(None)
+            if driver is None:
+                # Selenium is unusable here; callers fall back to plain requests
+                self.available = False
+            else:
+                self._drivers.append(driver)
+        return driver
+    
+    def close(self):
+        """Quit every browser in the pool."""
+        with self._lock:
+            drivers = [driver for driver in self._drivers if driver is not None]
+            self._drivers = []
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception as e:
+                logger.warning(f"Error closing Selenium WebDriver: {str(e)}")
+        logger.info(f"Closed {len(drivers)} pooled Selenium WebDrivers")
+
 class WebCrawler:
     def __init__(self, requests_per_minute=20, use_selenium=True, headless=True, 
-                 respect_robots=True, user_agent=None, same_domain_only=True):
+                 respect_robots=True, user_agent=None, same_domain_only=True,
+                 rate_limiter=None, session=None, browser_pool=None):
         """
         Initialize the web crawler.
         
@@ -25,44 +328,31 @@ class WebCrawler:
             respect_robots: Whether to respect robots.txt
             user_agent: Custom user agent string
             same_domain_only: Whether to only crawl pages on the same domain
+            rate_limiter: Existing RateLimiter to share with other crawlers
+            session: Existing requests session to share connection pools with other crawlers
+            browser_pool: Existing BrowserPool to borrow browsers from instead of starting one
         """
-        self.rate_limiter = RateLimiter(requests_per_minute=requests_per_minute)
+        self.rate_limiter = rate_limiter or RateLimiter(requests_per_minute=requests_per_minute)
+        self.session = session
+        self.browser_pool = browser_pool
         self.use_selenium = use_selenium
         self.headless = headless
         self.respect_robots = respect_robots
         self.same_domain_only = same_domain_only
         
         # Set up user agent
-        self.user_agent = user_agent or 'Rufus Web Crawler/1.0'
+        self.user_agent = user_agent or DEFAULT_USER_AGENT
         
-        # Initialize Selenium if needed
+        # The browser is started by the first page fetch, so creating a crawler stays cheap
         self.driver = None
-        if use_selenium:
-            self._init_selenium()
         
         # Store robots.txt rules
         self.robots_rules = {}
     
     def _init_selenium(self):
         """Initialize Selenium WebDriver."""
-        try:
-            options = Options()
-            if self.headless:
-                options.add_argument('--headless')
-            
-            options.add_argument(f'user-agent={self.user_agent}')
-            options.add_argument('--disable-gpu')
-            options.add_argument('--no-sandbox')
-            options.add_argument('--disable-dev-shm-usage')
-            
-            # Set up Chrome WebDriver
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=options)
-            self.driver.set_page_load_timeout(30)  # Set timeout to 30 seconds
-            
-            logger.info("Selenium WebDriver initialized successfully")
-        except Exception as e:
-            logger.error(f"Failed to initialize Selenium: {str(e)}")
+        self.driver = create_driver(headless=self.headless, user_agent=self.user_agent)
+        if self.driver is None:
             self.use_selenium = False
     
     def _check_robots_txt(self, url):
@@ -79,30 +369,12 @@ class WebCrawler:
         # Otherwise, fetch and parse robots.txt
         try:
             robots_url = f"{urlparse(url).scheme}://{domain}/robots.txt"
-            response = requests.get(robots_url, timeout=10)
+            response = self._http_get()(robots_url, timeout=10)
             
             if response.status_code == 200:
-                # Very simple robots.txt parsing - just check if our user agent is disallowed
-                lines = response.text.lower().split('\n')
-                user_agent_applies = False
-                disallowed = False
-                
-                for line in lines:
-                    if line.startswith('user-agent:'):
-                        agent = line.split(':', 1)[1].strip()
-                        if agent == '*' or self.user_agent.lower() in agent:
-                            user_agent_applies = True
-                        else:
-                            user_agent_applies = False
-                    
-                    if user_agent_applies and line.startswith('disallow:'):
-                        path = line.split(':', 1)[1].strip()
-                        if path and urlparse(url).path.startswith(path):
-                            disallowed = True
-                            break
-                
-                self.robots_rules[domain] = not disallowed
-                return not disallowed
+                allowed = robots_allows(response.text, url, self.user_agent)
+                self.robots_rules[domain] = allowed
+                return allowed
             
             # If robots.txt doesn't exist or can't be parsed, assume crawling is allowed
             self.robots_rules[domain] = True
@@ -129,21 +401,17 @@ class WebCrawler:
             return None
         
         try:
-            if self.use_selenium and self.driver:
-                try:
-                    logger.debug(f"Fetching {url} with Selenium")
-                    self.driver.get(url)
-                    
-                    # Wait for dynamic content to load
-                    time.sleep(random.uniform(1, 3))
-                    
-                    # Get the page source after JavaScript execution
-                    html = self.driver.page_source
+            if self.use_selenium and self.browser_pool is not None:
+                with self.browser_pool.driver() as driver:
+                    html = render_page(driver, url)
+                if html is not None:
+                    return html
+            elif self.use_selenium:
+                if self.driver is None:
+                    self._init_selenium()
+                html = render_page(self.driver, url)
+                if html is not None:
                     return html
-                except TimeoutException:
-                    logger.warning(f"Selenium timeout for {url}, falling back to requests")
-                except Exception as e:
-                    logger.warning(f"Selenium error for {url}: {str(e)}, falling back to requests")
             
             # Fall back to requests if Selenium fails or is disabled
             logger.debug(f"Fetching {url} with requests")
@@ -151,7 +419,7 @@ class WebCrawler:
             
             # Use rate limiter's backoff mechanism for the request
             response = self.rate_limiter.make_request_with_backoff(
-                requests.get, 
+                self._http_get(), 
                 url, 
                 timeout=15, 
                 headers=headers
@@ -163,6 +431,10 @@ class WebCrawler:
             logger.warning(f"Failed to retrieve {url}: {str(e)}")
             return None
     
+    def _http_get(self):
+        """Return the GET function to use: the shared session's, or requests.get."""
+        return self.session.get if self.session is not None else requests.get
+    
     def crawl(self, start_url, max_depth=1, max_pages=100):
         """
         Crawl a website starting from the given URL.
@@ -175,14 +447,30 @@ class WebCrawler:
         Returns:
             Dictionary mapping URLs to their HTML content
         """
+        return dict(self.iter_crawl(start_url, max_depth=max_depth, max_pages=max_pages))
+    
+    def iter_crawl(self, start_url, max_depth=1, max_pages=100):
+        """
+        Crawl a website, yielding each page as soon as it is fetched.
+        
+        Lets later steps start on the first pages while the crawl goes on.
+        
+        Args:
+            start_url: The URL to start crawling from
+            max_depth: Maximum crawl depth
+            max_pages: Maximum number of pages to crawl
+            
+        Yields:
+            (url, html) for each page retrieved
+        """
         visited = set()
         to_visit = [(start_url, 0)]  # (url, depth)
-        pages = {}
+        retrieved = 0
         start_domain = urlparse(start_url).netloc
         
         logger.info(f"Starting crawl from {start_url} with max depth {max_depth} and max pages {max_pages}")
         
-        while to_visit and len(pages) < max_pages:
+        while to_visit and retrieved < max_pages:
             url, depth = to_visit.pop(0)
             
             if url in visited or depth > max_depth:
@@ -201,8 +489,9 @@ class WebCrawler:
             if not html:
                 continue
             
-            pages[url] = html
+            retrieved += 1
             logger.debug(f"Successfully retrieved content from {url} ({len(html)} bytes)")
+            yield url, html
             
             # If we've reached the maximum depth, don't extract more links
             if depth >= max_depth:
@@ -210,13 +499,7 @@ class WebCrawler:
             
             # Extract links for the next level
             try:
-                soup = BeautifulSoup(html, "html.parser")
-                links = []
-                
-                for a_tag in soup.find_all('a', href=True):
-                    link = normalize_url(a_tag['href'], base=url)
-                    if link and link not in visited:
-                        links.append((link, depth + 1))
+                links = [(link, depth + 1) for link in extract_links(html, url) if link not in visited]
                 
                 logger.debug(f"Found {len(links)} links on {url}")
                 
@@ -229,11 +512,10 @@ class WebCrawler:
             except Exception as e:
                 logger.warning(f"Error extracting links from {url}: {str(e)}")
         
-        logger.info(f"Crawl complete. Retrieved {len(pages)} pages")
-        return pages
+        logger.info(f"Crawl complete. Retrieved {retrieved} pages")
     
     def close(self):
-        """Close the Selenium WebDriver if it's open."""
+        """Close the Selenium WebDriver if it's open (pooled browsers stay with their pool)."""
         if self.driver:
             try:
                 self.driver.quit()
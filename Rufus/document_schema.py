@@ -0,0 +1,102 @@
+from typing import Any, Dict, List, Optional, Union
+from pydantic import BaseModel, ConfigDict, TypeAdapter, ValidationError
+from logger import logger
+
+
+class ContentSection(BaseModel):
+    """One section of a synthesized document."""
+    model_config = ConfigDict(extra="allow")
+
+    heading: str
+    content: str
+
+
+class SynthesizedDocument(BaseModel):
+    """Output schema the synthesis prompt asks the model for."""
+    model_config = ConfigDict(extra="allow")
+
+    title: str
+    summary: str
+    key_points: List[str]
+    content_sections: List[ContentSection]
+    metadata: Dict[str, Any] = {}
+    policies: Optional[List[Union[str, Dict[str, Any]]]] = None
+    faq: Optional[List[Dict[str, Any]]] = None
+
+
+# Fields the model must return; the others have defaults
+REQUIRED_FIELDS = tuple(name for name, field in SynthesizedDocument.model_fields.items() if field.is_required())
+
+# Validators are built once and reused for every document
+DOCUMENT_ADAPTER = TypeAdapter(SynthesizedDocument)
+FIELD_ADAPTERS = {
+    name: TypeAdapter(field.annotation)
+    for name, field in SynthesizedDocument.model_fields.items()
+}
+
+
+def is_special_response(document):
+    """Whether the document is a status reply ("NO WEB CONTENT", errors) rather than a synthesized document."""
+    return not isinstance(document, dict) or "response" in document or "error" in document \
+        or "parse_error" in document
+
+
+def validate_document(document):
+    """
+    Validate a parsed document against the output schema.
+
+    Args:
+        document: Parsed model output
+
+    Returns:
+        Tuple of (document with the valid fields normalized and invalid ones removed,
+        names of the fields that are missing or invalid)
+    """
+    if is_special_response(document):
+        return document, []
+
+    try:
+        return DOCUMENT_ADAPTER.validate_python(document).model_dump(exclude_unset=True), []
+    except ValidationError:
+        pass
+
+    # Validate field by field to find exactly which fields need fixing
+    valid = {}
+    invalid = []
+    for name, value in document.items():
+        adapter = FIELD_ADAPTERS.get(name)
+        if adapter is None:
+            valid[name] = value
+            continue
+        try:
+            valid[name] = _dump(adapter.validate_python(value))
+        except ValidationError as e:
+            logger.debug(f"Invalid document field {name}: {e.error_count()} errors")
+            invalid.append(name)
+
+    invalid.extend(name for name in REQUIRED_FIELDS if name not in document)
+    return valid, invalid
+
+
+def _dump(value):
+    if isinstance(value, BaseModel):
+        return value.model_dump(exclude_unset=True)
+    if isinstance(value, list):
+        return [_dump(item) for item in value]
+    return value
+
+
+def describe_fields(names):
+    """Describe the expected type of each field for a re-ask prompt."""
+    lines = []
+    for name in names:
+        field = SynthesizedDocument.model_fields.get(name)
+        if field is None:
+            continue
+        if name == "content_sections":
+            description = 'array of objects with "heading" and "content" strings'
+        else:
+            annotation = field.annotation
+            description = annotation.__name__ if isinstance(annotation, type) else str(annotation).replace("typing.", "")
+        lines.append(f"- {name}: {description}")
+    return "\n".join(lines)
@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from logger import logger
+
+
+class ExtractionCache:
+    """
+    Cache of extraction results keyed by a hash of the HTML and the extractor configuration.
+
+    Results live in an in-memory LRU tier and, when a cache directory is given,
+    in an on-disk tier so that re-scraping a mostly static site can skip
+    extraction across runs.
+    """
+    def __init__(self, max_entries=1024, cache_dir=None, config=None):
+        """
+        Initialize the extraction cache.
+
+        Args:
+            max_entries: Maximum number of results kept in memory
+            cache_dir: Optional directory for the on-disk tier
+            config: Extractor configuration folded into every key, so that
+                    changing extractors or thresholds invalidates old results
+        """
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.set_config(config or {})
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def set_config(self, config):
+        """Set the extractor configuration that is part of every cache key."""
+        serialized = json.dumps(config, sort_keys=True, default=str)
+        self._config_digest = hashlib.blake2b(serialized.encode("utf-8"), digest_size=16).digest()
+
+    def make_key(self, html):
+        """
+        Compute the cache key for a page.
+
+        Args:
+            html: HTML content of the page
+
+        Returns:
+            Hex digest of the extractor configuration and the HTML
+        """
+        h = hashlib.blake2b(self._config_digest, digest_size=16)
+        h.update(html.encode("utf-8", "surrogatepass"))
+        return h.hexdigest()
+
+    def get(self, html):
+        """
+        Look up the extraction result for a page.
+
+        Args:
+            html: HTML content of the page
+
+        Returns:
+            Dictionary with "text" and "method" keys, or None on a miss
+        """
+        key = self.make_key(html)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        entry = self._read_disk(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, entry)
+        return entry
+
+    def put(self, html, text, method):
+        """
+        Store the extraction result for a page.
+
+        Args:
+            html: HTML content of the page
+            text: Cleaned text produced by the extractor
+            method: Name of the extractor that produced the text
+        """
+        key = self.make_key(html)
+        entry = {"text": text, "method": method}
+
+        with self._lock:
+            self._remember(key, entry)
+
+        self._write_disk(key, entry)
+
+    def clear(self):
+        """Drop all in-memory entries. The on-disk tier is left untouched."""
+        with self._lock:
+            self._entries.clear()
+
+    def _remember(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _read_disk(self, key):
+        if not self.cache_dir:
+            return None
+
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return {"text": data["text"], "method": data["method"]}
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.debug(f"Ignoring unreadable extraction cache entry {path}: {str(e)}")
+            return None
+
+    def _write_disk(self, key, entry):
+        if not self.cache_dir:
+            return
+
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temporary file first so readers never see partial entries
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(dict(entry, created=time.time()), f)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.debug(f"Failed to write extraction cache entry {path}: {str(e)}")
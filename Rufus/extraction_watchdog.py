@@ -0,0 +1,277 @@
+import multiprocessing
+import threading
+import time
+from logger import logger
+
+
+# Outcomes of ExtractionWatchdog.run. Plain strings compare equal however this module was imported.
+OK = "ok"
+TIMEOUT = "timeout"
+ERROR = "error"
+
+# Seconds a new worker process may take to start and import the extractors
+WORKER_STARTUP_TIMEOUT = 60.0
+
+
+def truncate_html(html, max_chars):
+    """
+    Cut oversized HTML down to a size the extractors can handle.
+
+    The cut is made right after the last complete tag before the limit, so the
+    extractors never see half a tag. Parsers close the elements left open.
+
+    Args:
+        html: HTML content of the page
+        max_chars: Maximum number of characters to keep, or None for no limit
+
+    Returns:
+        The HTML, truncated if it was longer than max_chars
+    """
+    if not max_chars or len(html) <= max_chars:
+        return html
+
+    cut = html.rfind('>', 0, max_chars)
+    return html[:cut + 1] if cut > 0 else html[:max_chars]
+
+
+def _worker_main(conn):
+    # Runs in the worker process. Registries arrive with the first request that uses them and are reused.
+    from extractors import ExtractorRegistry  # noqa: F401 - imported before reporting ready
+    registries = {}
+    conn.send((True, None))
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, OSError):
+            break
+        if request is None:
+            break
+
+        token, registry, name, html = request
+        try:
+            if registry is not None:
+                registries[token] = registry
+            conn.send((True, registries[token].extract(name, html)))
+        except Exception as e:
+            conn.send((False, f"{type(e).__name__}: {str(e)}"))
+
+
+class _Worker:
+    """One extraction worker process, and the registries it has been sent."""
+    def __init__(self, context):
+        parent_conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn,), name="rufus-extraction",
+                                       daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+        self.registries = set()
+
+        # Wait until the worker has imported the extractors, so startup is never charged to a page
+        try:
+            ready = self.conn.poll(WORKER_STARTUP_TIMEOUT) and self.conn.recv()[0]
+        except (EOFError, OSError):
+            ready = False
+        if not ready:
+            self.stop(kill=True)
+            raise RuntimeError("Extraction worker process failed to start")
+        logger.debug(f"Started extraction worker process {self.process.pid}")
+
+    def is_alive(self):
+        return self.process is not None and self.process.is_alive()
+
+    def stop(self, kill=False):
+        if self.process is None:
+            return
+        try:
+            if kill:
+                self.process.kill()
+            else:
+                self.conn.send(None)
+            self.process.join(timeout=5)
+        except Exception as e:
+            logger.debug(f"Error stopping extraction worker: {str(e)}")
+        finally:
+            self.conn.close()
+            self.process = None
+
+
+class PageBudget:
+    """
+    Extraction time left for one page.
+
+    Only time spent running extractors is charged, so waiting for a free
+    worker under contention never eats into a page's budget.
+    """
+    def __init__(self, seconds=None):
+        self.remaining = seconds
+
+    def exhausted(self):
+        """Check whether the page has no extraction time left."""
+        return self.remaining is not None and self.remaining <= 0
+
+    def charge(self, seconds):
+        """Deduct time spent extracting."""
+        if self.remaining is not None:
+            self.remaining -= seconds
+
+
+class ExtractionWatchdog:
+    """
+    Time budgets for the extraction cascade.
+
+    Each extraction method runs in a long-lived worker process with a
+    per-method timeout, and the cascade as a whole gets a per-page budget.
+    Workers form a pool that grows to one per concurrent caller (or up to
+    max_workers), so threads extracting at the same time never queue behind
+    each other. A method that overruns is abandoned by killing its worker,
+    which is replaced on the next call, so a pathological page cannot stall
+    a job. Workers are started with the spawn method, which is safe in the
+    multithreaded client. Oversized pages are truncated before any
+    extractor sees them.
+    """
+    def __init__(self, method_timeout=10.0, page_timeout=30.0, max_html_chars=2_000_000,
+                 isolate=True, mp_context=None, max_workers=None):
+        """
+        Initialize the watchdog.
+
+        Args:
+            method_timeout: Seconds a single extraction method may run, or None for no limit
+            page_timeout: Seconds the whole cascade may spend on one page, or None for no limit
+            max_html_chars: Pages longer than this are truncated before extraction, or None to keep them whole
+            isolate: Whether to run extractors in worker processes that can be killed on timeout.
+                     Without isolation only the per-page budget is enforced, between methods.
+            mp_context: Optional multiprocessing context for the worker processes (spawn by default)
+            max_workers: Maximum number of worker processes, or None for one per concurrent caller
+        """
+        self.method_timeout = method_timeout
+        self.page_timeout = page_timeout
+        self.max_html_chars = max_html_chars
+        self.isolate = isolate
+        self.max_workers = max_workers
+        self.timeouts = 0
+        self._context = mp_context or multiprocessing.get_context("spawn")
+        self._available = threading.Condition()
+        self._idle = []
+        self._started = 0
+
+    def prepare(self, html, url=""):
+        """
+        Truncate a page that is too large to extract safely.
+
+        Args:
+            html: HTML content of the page
+            url: URL of the page, for logging
+
+        Returns:
+            HTML content ready for extraction
+        """
+        truncated = truncate_html(html, self.max_html_chars)
+        if len(truncated) < len(html):
+            logger.warning(f"Truncated oversized page {url} from {len(html)} to {len(truncated)} characters")
+        return truncated
+
+    def budget(self):
+        """Return the extraction budget for a new page."""
+        return PageBudget(self.page_timeout or None)
+
+    def run(self, registry, name, html, budget=None):
+        """
+        Run one extraction method under the time budget.
+
+        Args:
+            registry: ExtractorRegistry to extract with; the worker runs this registry, settings included
+            name: Extractor name
+            html: HTML content of the page
+            budget: Optional PageBudget of the page, charged with the time the method runs
+
+        Returns:
+            Tuple of (status, value): (OK, raw extracted text or None), (TIMEOUT, message)
+            if the method ran past its budget or the page budget is spent, or (ERROR, message)
+            if the extractor raised or the worker process died
+        """
+        if budget is not None and budget.exhausted():
+            return TIMEOUT, "Page extraction budget exhausted"
+
+        if not self.isolate:
+            start = time.monotonic()
+            try:
+                return OK, registry.extract(name, html)
+            except Exception as e:
+                return ERROR, f"{type(e).__name__}: {str(e)}"
+            finally:
+                if budget is not None:
+                    budget.charge(time.monotonic() - start)
+
+        try:
+            worker = self._acquire()
+        except Exception as e:
+            return ERROR, str(e)
+
+        # The clock starts once a worker is ready, so waiting for one is never charged
+        timeout = self.method_timeout
+        if budget is not None and budget.remaining is not None:
+            timeout = budget.remaining if timeout is None else min(timeout, budget.remaining)
+
+        start = time.monotonic()
+        healthy = True
+        try:
+            token = registry.token
+            worker.conn.send((token, registry if token not in worker.registries else None, name, html))
+            worker.registries.add(token)
+            if not worker.conn.poll(timeout):
+                healthy = False
+                with self._available:
+                    self.timeouts += 1
+                return TIMEOUT, f"{name} did not finish within {timeout:.1f}s"
+            ok, result = worker.conn.recv()
+        except (EOFError, OSError) as e:
+            healthy = False
+            return ERROR, f"Extraction worker died: {str(e)}"
+        finally:
+            if budget is not None:
+                budget.charge(time.monotonic() - start)
+            self._release(worker, healthy)
+
+        return (OK, result) if ok else (ERROR, result)
+
+    def _acquire(self):
+        with self._available:
+            while True:
+                while self._idle:
+                    worker = self._idle.pop()
+                    if worker.is_alive():
+                        return worker
+                    worker.stop(kill=True)
+                    self._started -= 1
+                if self.max_workers is None or self._started < self.max_workers:
+                    self._started += 1
+                    break
+                self._available.wait()
+
+        # Start outside the lock so other callers can take idle workers meanwhile
+        try:
+            return _Worker(self._context)
+        except Exception:
+            with self._available:
+                self._started -= 1
+                self._available.notify()
+            raise
+
+    def _release(self, worker, healthy=True):
+        if not healthy:
+            worker.stop(kill=True)
+        with self._available:
+            if healthy:
+                self._idle.append(worker)
+            else:
+                self._started -= 1
+            self._available.notify()
+
+    def close(self):
+        """Stop the idle worker processes."""
+        with self._available:
+            idle, self._idle = self._idle, []
+            self._started -= len(idle)
+        for worker in idle:
+            worker.stop()
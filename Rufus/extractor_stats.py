@@ -0,0 +1,226 @@
+import json
+import os
+import random
+import re
+import threading
+from collections import defaultdict
+from urllib.parse import urlparse
+from logger import logger
+
+# Digit runs in path segments (ids, dates, page numbers) do not change a page's layout
+DIGITS_PATTERN = re.compile(r'\d+')
+
+
+def url_pattern(url):
+    """
+    Reduce a URL to a coarse pattern that groups pages sharing a layout.
+
+    Only the first path segment is kept, with digit runs replaced, so that
+    "/blog/2024/05/some-post" and "/blog/2023/11/other-post" both map to "/blog/*".
+
+    Args:
+        url: URL of the page
+
+    Returns:
+        URL pattern string
+    """
+    segments = [segment for segment in urlparse(url).path.split('/') if segment]
+    if not segments:
+        return '/'
+
+    first = DIGITS_PATTERN.sub('{n}', segments[0].lower())
+    return f"/{first}/*" if len(segments) > 1 else f"/{first}"
+
+
+class ExtractorStats:
+    """
+    Per-domain and per-URL-pattern statistics about the extraction cascade.
+
+    Records which method succeeds and how long each attempt takes, and uses
+    that history to reorder the cascade for later pages from the same site.
+    """
+    def __init__(self, stats_path=None, exploration_rate=0.05, min_samples=5):
+        """
+        Initialize the extractor statistics.
+
+        Args:
+            stats_path: Optional JSON file used to persist statistics across runs
+            exploration_rate: Fraction of pages that run the default cascade order
+                              so that statistics keep up with site changes
+            min_samples: Attempts required before a method may be skipped
+        """
+        self.stats_path = stats_path
+        self.exploration_rate = exploration_rate
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+        # {scope: {method: {"attempts", "successes", "total_time"}}}
+        self._stats = defaultdict(dict)
+
+        if stats_path:
+            self.load()
+
+    def _scopes(self, url):
+        domain = urlparse(url).netloc.lower()
+        return f"{domain}{url_pattern(url)}", f"{domain}/**"
+
+    def record(self, url, method, success, elapsed):
+        """
+        Record the outcome of one extraction attempt.
+
+        Args:
+            url: URL of the page
+            method: Name of the extraction method
+            success: Whether the method produced enough text
+            elapsed: Time the attempt took in seconds
+        """
+        with self._lock:
+            for scope in self._scopes(url):
+                entry = self._stats[scope].setdefault(
+                    method, {"attempts": 0, "successes": 0, "total_time": 0.0}
+                )
+                entry["attempts"] += 1
+                entry["successes"] += int(bool(success))
+                entry["total_time"] += elapsed
+
+    def record_timeout(self, url, method, elapsed):
+        """
+        Record an extraction attempt that was abandoned after running past its time budget.
+
+        Timeouts count as failed attempts, so a method that keeps timing out on
+        a site is eventually skipped there.
+
+        Args:
+            url: URL of the page
+            method: Name of the extraction method
+            elapsed: Time spent before the attempt was abandoned, in seconds
+        """
+        with self._lock:
+            for scope in self._scopes(url):
+                entry = self._stats[scope].setdefault(
+                    method, {"attempts": 0, "successes": 0, "total_time": 0.0}
+                )
+                entry["attempts"] += 1
+                entry["timeouts"] = entry.get("timeouts", 0) + 1
+                entry["total_time"] += elapsed
+
+    def _scope_stats(self, url):
+        """Return the most specific statistics with enough samples for this URL."""
+        pattern_scope, domain_scope = self._scopes(url)
+        pattern_stats = self._stats.get(pattern_scope, {})
+        if sum(entry["attempts"] for entry in pattern_stats.values()) >= self.min_samples:
+            return pattern_stats
+        return self._stats.get(domain_scope, {})
+
+    def order_methods(self, url, methods):
+        """
+        Order extraction methods for a page based on the site's history.
+
+        Once methods have enough attempts, the one with the best success rate
+        starts the cascade; until then the default precise-first order is kept.
+        The remaining methods keep their default order, and methods that have
+        never succeeded after enough attempts are moved to a separate skip list.
+
+        Args:
+            url: URL of the page
+            methods: Method names in default cascade order
+
+        Returns:
+            Tuple of (methods to try in order, methods skipped for this page)
+        """
+        if self.exploration_rate and random.random() < self.exploration_rate:
+            return list(methods), []
+
+        with self._lock:
+            stats = {method: dict(entry) for method, entry in self._scope_stats(url).items()}
+
+        if not stats:
+            return list(methods), []
+
+        skipped = [
+            method for method in methods
+            if method in stats
+            and stats[method]["attempts"] >= self.min_samples
+            and stats[method]["successes"] == 0
+        ]
+        ordered = [method for method in methods if method not in skipped]
+
+        # Raw win counts would favor the lenient fallbacks, which only run (and win) after the
+        # precise methods failed, so methods are ranked by success rate once they have enough attempts
+        winners = [
+            method for method in ordered
+            if stats.get(method, {}).get("successes") and stats[method]["attempts"] >= self.min_samples
+        ]
+        if winners:
+            # Best success rate first; the faster method breaks ties
+            best = max(
+                winners,
+                key=lambda m: (stats[m]["successes"] / stats[m]["attempts"],
+                               -stats[m]["total_time"] / stats[m]["attempts"])
+            )
+            ordered.remove(best)
+            ordered.insert(0, best)
+
+        return ordered, skipped
+
+    def summary(self, url=None):
+        """
+        Summarize recorded statistics.
+
+        Args:
+            url: Optional URL restricting the summary to its domain
+
+        Returns:
+            Dictionary mapping scopes to per-method success rates and mean times
+        """
+        domain = urlparse(url).netloc.lower() if url else None
+        result = {}
+        with self._lock:
+            for scope, methods in self._stats.items():
+                if domain and not scope.startswith(f"{domain}/"):
+                    continue
+                result[scope] = {
+                    method: {
+                        "attempts": entry["attempts"],
+                        "success_rate": round(entry["successes"] / max(1, entry["attempts"]), 3),
+                        "mean_time": round(entry["total_time"] / max(1, entry["attempts"]), 4),
+                        "timeouts": entry.get("timeouts", 0),
+                    }
+                    for method, entry in methods.items()
+                }
+        return result
+
+    def load(self):
+        """Load statistics from the stats file, if it exists."""
+        if not self.stats_path or not os.path.exists(self.stats_path):
+            return
+
+        try:
+            with open(self.stats_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            with self._lock:
+                for scope, methods in data.items():
+                    self._stats[scope].update(methods)
+            logger.debug(f"Loaded extractor statistics for {len(data)} scopes from {self.stats_path}")
+        except Exception as e:
+            logger.warning(f"Failed to load extractor statistics from {self.stats_path}: {str(e)}")
+
+    def save(self):
+        """Persist statistics to the stats file."""
+        if not self.stats_path:
+            return
+
+        try:
+            with self._lock:
+                data = {
+                    scope: {method: dict(entry) for method, entry in methods.items()}
+                    for scope, methods in self._stats.items()
+                }
+            stats_dir = os.path.dirname(self.stats_path)
+            if stats_dir:
+                os.makedirs(stats_dir, exist_ok=True)
+            tmp_path = f"{self.stats_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.stats_path)
+        except Exception as e:
+            logger.warning(f"Failed to save extractor statistics to {self.stats_path}: {str(e)}")
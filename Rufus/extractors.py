@@ -0,0 +1,239 @@
+import re
+import threading
+import uuid
+from functools import lru_cache
+from importlib import metadata
+from logger import logger
+from text_normalizer import normalize_text, default_normalizer
+from utils import is_installed, optional_import
+
+# The extraction libraries take most of a second to import, so each one is
+# imported by the first page that uses it rather than at startup
+BACKEND_MODULES = {'trafilatura': 'trafilatura', 'readability': 'readability', 'goose': 'goose3'}
+BACKEND_NAMES = {'trafilatura': 'Trafilatura', 'readability': 'Readability-lxml', 'goose': 'Goose3'}
+
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+# Default cascade order, from the most precise extractor to the most forgiving one
+DEFAULT_EXTRACTORS = ['trafilatura', 'readability', 'goose', 'beautifulsoup', 'raw']
+
+# Minimum text length for each method to count as a success. Thresholds get lower
+# further down the cascade so minimal sites still yield something.
+MIN_TEXT_LENGTHS = {
+    'trafilatura': 50,
+    'readability': 50,
+    'goose': 50,
+    'beautifulsoup': 30,
+    'raw': 20,
+}
+
+TRAFILATURA_SETTINGS = {'include_comments': False, 'include_tables': True,
+                        'output_format': "txt"}
+GOOSE_SETTINGS = {'browser_user_agent': 'Mozilla/5.0'}
+
+UNWANTED_TAGS = ['script', 'style', 'nav', 'footer', 'header', 'aside']
+CONTENT_SELECTOR = 'article, main, #content, .content, #main, .main, .post, .article, .page-content, .entry-content, .post-content'
+
+TAG_PATTERN = re.compile(r'<[^>]+>')
+
+# Extractors whose output is already normalized and must not be cleaned again
+PRECLEANED_EXTRACTORS = {'raw'}
+
+
+@lru_cache(maxsize=None)
+def _backend_installed(name):
+    if is_installed(BACKEND_MODULES[name]):
+        return True
+    logger.warning(f"{BACKEND_NAMES[name]} not available. Some extraction methods will be disabled.")
+    return False
+
+
+def _backend_version(name):
+    # Read from the package metadata so reporting the version does not import the library
+    if not _backend_installed(name):
+        return None
+    try:
+        return metadata.version(BACKEND_MODULES[name])
+    except metadata.PackageNotFoundError:
+        return None
+
+
+class ExtractorRegistry:
+    """
+    Registry of content extraction backends.
+
+    Each backend is initialized once per process on first use. Backends that
+    are not thread-safe (Goose) get one instance per thread, so the per-page
+    hot path never constructs extractors or parses their configuration.
+    """
+    def __init__(self, extractors=None, disabled=None):
+        """
+        Initialize the registry.
+
+        Args:
+            extractors: Extractor names in cascade order (defaults to DEFAULT_EXTRACTORS)
+            disabled: Extractor names to leave out, e.g. ['goose']
+        """
+        requested = list(extractors) if extractors else list(DEFAULT_EXTRACTORS)
+        disabled = set(disabled or [])
+
+        unknown = [name for name in requested if name not in MIN_TEXT_LENGTHS]
+        if unknown:
+            raise ValueError(f"Unknown extractors: {unknown}")
+
+        self.extractors = [
+            name for name in requested
+            if name not in disabled and self.is_backend_available(name)
+        ]
+        # Identifies this registry to the extraction worker processes it is sent to
+        self.token = uuid.uuid4().hex
+        self._init_runtime_state()
+
+        logger.debug(f"Extractor registry initialized with: {self.extractors}")
+
+    def _init_runtime_state(self):
+        self._init_lock = threading.Lock()
+        self._thread_local = threading.local()
+        self._content_selector = None
+
+    def __getstate__(self):
+        # Locks and per-thread backends stay behind; a worker process builds its own
+        state = self.__dict__.copy()
+        for name in ('_init_lock', '_thread_local', '_content_selector'):
+            state.pop(name, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_runtime_state()
+
+    @staticmethod
+    def is_backend_available(name):
+        """Check whether the library behind an extractor is installed, without importing it."""
+        return name not in BACKEND_MODULES or _backend_installed(name)
+
+    def config(self):
+        """
+        Describe the settings that influence extraction output.
+
+        Returns:
+            Dictionary suitable for keying extraction caches
+        """
+        return {
+            'extractors': self.extractors,
+            'trafilatura': _backend_version('trafilatura'),
+            'trafilatura_options': TRAFILATURA_SETTINGS,
+            'goose': GOOSE_SETTINGS if 'goose' in self.extractors else None,
+            'min_lengths': {name: MIN_TEXT_LENGTHS[name] for name in self.extractors},
+            'normalizer': default_normalizer.config(),
+        }
+
+    def min_length(self, name):
+        """Return the minimum text length for an extractor to count as a success."""
+        return MIN_TEXT_LENGTHS[name]
+
+    def is_precleaned(self, name):
+        """Check whether an extractor already returns normalized text."""
+        return name in PRECLEANED_EXTRACTORS
+
+    def extract(self, name, html):
+        """
+        Run a single extractor on a page.
+
+        Args:
+            name: Extractor name
+            html: HTML content of the page
+
+        Returns:
+            Raw extracted text (not yet cleaned), or None
+        """
+        return getattr(self, f"_extract_{name}")(html)
+
+    def close(self):
+        """Release backend resources held by the calling thread."""
+        goose = getattr(self._thread_local, 'goose', None)
+        if goose is not None:
+            try:
+                goose.close()
+            except Exception as e:
+                logger.debug(f"Error closing Goose extractor: {str(e)}")
+            self._thread_local.goose = None
+
+    def _get_goose(self):
+        # Goose keeps per-extraction state on the instance, so each thread gets its own
+        goose = getattr(self._thread_local, 'goose', None)
+        if goose is None:
+            from goose3 import Goose
+            goose = Goose(dict(GOOSE_SETTINGS))
+            self._thread_local.goose = goose
+        return goose
+
+    def _get_content_selector(self):
+        if self._content_selector is None:
+            soupsieve = optional_import('soupsieve')
+            if soupsieve is None:
+                return None
+            with self._init_lock:
+                if self._content_selector is None:
+                    self._content_selector = soupsieve.compile(CONTENT_SELECTOR)
+        return self._content_selector
+
+    def _extract_trafilatura(self, html):
+        """Method 1: Trafilatura (good for news articles and blog posts)."""
+        import trafilatura
+        return trafilatura.extract(html, **TRAFILATURA_SETTINGS)
+
+    def _extract_readability(self, html):
+        """Method 2: Readability (Mozilla's algorithm)."""
+        from readability import Document
+        readable_html = Document(html).summary()
+
+        # Convert the HTML summary to plain text
+        if lxml is not None:
+            root = lxml.html.fromstring(readable_html)
+            return ' '.join(part.strip() for part in root.itertext() if part.strip())
+
+        from bs4 import BeautifulSoup
+        readable_soup = BeautifulSoup(readable_html, "html.parser")
+        return readable_soup.get_text(separator=' ', strip=True)
+
+    def _extract_goose(self, html):
+        """Method 3: Goose (good for news articles)."""
+        article = self._get_goose().extract(raw_html=html)
+        return article.cleaned_text
+
+    def _extract_beautifulsoup(self, html):
+        """Method 4: BeautifulSoup fallback with more relaxed criteria."""
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(html, "html.parser")
+
+        # Remove unwanted elements
+        for element in soup(UNWANTED_TAGS):
+            element.decompose()
+
+        # First try to find the main content
+        selector = self._get_content_selector()
+        content_elements = selector.select(soup) if selector is not None else soup.select(CONTENT_SELECTOR)
+        if content_elements:
+            main_content = max(content_elements, key=lambda x: len(x.get_text()))
+            return main_content.get_text(separator=' ', strip=True)
+
+        # If no content containers found, use the body with paragraphs
+        paragraphs = soup.find_all('p')
+        if paragraphs:
+            return ' '.join([p.get_text(strip=True) for p in paragraphs])
+
+        # Last resort: just get all text from body
+        return soup.body.get_text(separator=' ', strip=True) if soup.body else ""
+
+    def _extract_raw(self, html):
+        """Method 5: Raw HTML extractor - simplest possible approach."""
+        # Strip HTML tags using regex, then normalize whitespace and entities in one pass
+        return normalize_text(TAG_PATTERN.sub(' ', html))
+
+
+# Registry shared by callers that do not configure their own
+default_registry = ExtractorRegistry()
@@ -0,0 +1,242 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from logger import logger
+
+# Job states, in lifecycle order
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+STATUSES = (QUEUED, RUNNING, DONE, FAILED)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    instructions TEXT NOT NULL DEFAULT '',
+    options TEXT NOT NULL DEFAULT '{}',
+    status TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    worker TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at);
+"""
+
+
+class JobQueue:
+    """
+    Persistent queue of scrape jobs in a SQLite database.
+
+    Jobs survive restarts: a job is queued, claimed by exactly one worker
+    (claims are atomic across threads and processes), then finished with a
+    result or an error. The database runs in WAL mode so status polls never
+    wait for workers writing results. Each process opens its own JobQueue on
+    the same file.
+    """
+    def __init__(self, path, timeout=30.0):
+        """
+        Open (and create if needed) the queue.
+
+        Args:
+            path: Path of the SQLite database file
+            timeout: Seconds to wait for another connection's write lock
+        """
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self.closed = False
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=timeout, isolation_level=None, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+
+    def submit(self, url, instructions="", options=None):
+        """
+        Add a job to the queue.
+
+        Args:
+            url: URL to scrape
+            instructions: Instructions for content filtering and synthesis
+            options: Optional per-job settings, such as max_depth and max_pages
+
+        Returns:
+            ID of the new job
+        """
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, url, instructions, options, status, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, url, instructions or "", json.dumps(options or {}), QUEUED, time.time())
+            )
+        logger.debug(f"Queued job {job_id} for {url}")
+        return job_id
+
+    def claim(self, worker):
+        """
+        Take the oldest queued job and mark it running.
+
+        Args:
+            worker: Name of the claiming worker, recorded on the job
+
+        Returns:
+            Job dictionary, or None if the queue is empty
+        """
+        with self._lock:
+            # BEGIN IMMEDIATE takes the write lock up front, so two workers never claim the same job
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT id FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, worker = ?, started_at = ?, attempts = attempts + 1 WHERE id = ?",
+                    (RUNNING, worker, time.time(), row["id"])
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return self.get(row["id"])
+
+    def complete(self, job_id, result):
+        """Mark a job done and store its result document."""
+        self._finish(job_id, DONE, result=result)
+
+    def fail(self, job_id, error, result=None):
+        """Mark a job failed with an error message, and the result if there is one."""
+        self._finish(job_id, FAILED, result=result, error=error)
+
+    def _finish(self, job_id, status, result=None, error=None):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                (status, json.dumps(result) if result is not None else None, error, time.time(), job_id)
+            )
+
+    def get(self, job_id, include_result=True):
+        """
+        Look up a job.
+
+        Args:
+            job_id: ID returned by submit()
+            include_result: Whether to decode and include the result document
+
+        Returns:
+            Job dictionary, or None if there is no such job
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_job(row, include_result) if row is not None else None
+
+    def list(self, status=None, limit=100):
+        """
+        List the most recent jobs, without their results.
+
+        Args:
+            status: Only list jobs in this state
+            limit: Maximum number of jobs
+
+        Returns:
+            List of job dictionaries, newest first
+        """
+        query = "SELECT * FROM jobs"
+        params = []
+        if status is not None:
+            query += " WHERE status = ?"
+            params.append(status)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [self._to_job(row, include_result=False) for row in rows]
+
+    def counts(self):
+        """Return the number of jobs in each state."""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        counts = dict.fromkeys(STATUSES, 0)
+        counts.update({row["status"]: row["n"] for row in rows})
+        return counts
+
+    def requeue_running(self, worker=None, max_attempts=None):
+        """
+        Put jobs left running by workers that stopped back in the queue.
+
+        Args:
+            worker: Only requeue the jobs of this worker (all running jobs if None)
+            max_attempts: Fail jobs that already ran this many times instead of requeuing them,
+                          so a job that keeps killing its worker does not run forever
+
+        Returns:
+            Number of jobs requeued
+        """
+        condition = "status = ?"
+        params = [RUNNING]
+        if worker is not None:
+            condition += " AND worker = ?"
+            params.append(worker)
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                failed = 0
+                if max_attempts is not None:
+                    failed = self._conn.execute(
+                        f"UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE {condition} AND attempts >= ?",
+                        [FAILED, f"Worker stopped during the job {max_attempts} times", time.time()] + params
+                        + [max_attempts]
+                    ).rowcount
+                requeued = self._conn.execute(
+                    f"UPDATE jobs SET status = ?, worker = NULL, started_at = NULL WHERE {condition}",
+                    [QUEUED] + params
+                ).rowcount
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        if failed:
+            logger.warning(f"Failed {failed} interrupted jobs after {max_attempts} attempts")
+        if requeued:
+            logger.info(f"Requeued {requeued} interrupted jobs")
+        return requeued
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+            self.closed = True
+
+    @staticmethod
+    def _to_job(row, include_result=True):
+        job = {
+            "id": row["id"],
+            "url": row["url"],
+            "instructions": row["instructions"],
+            "options": json.loads(row["options"]),
+            "status": row["status"],
+            "error": row["error"],
+            "worker": row["worker"],
+            "attempts": row["attempts"],
+            "created_at": row["created_at"],
+            "started_at": row["started_at"],
+            "finished_at": row["finished_at"],
+        }
+        if include_result:
+            job["result"] = json.loads(row["result"]) if row["result"] is not None else None
+        return job
@@ -0,0 +1,131 @@
+import re
+from functools import lru_cache
+from logger import logger
+
+# Try to import optional packages with fallbacks
+try:
+    import ahocorasick
+except ImportError:
+    logger.warning("pyahocorasick not available. Keyword filtering will use a regex matcher.")
+    ahocorasick = None
+
+# Words in instructions, keeping inner hyphens and apostrophes ("e-mail", "don't")
+INSTRUCTION_WORD_PATTERN = re.compile(r"\w(?:[\w'-]*\w)?")
+
+
+def instruction_keywords(instructions, stop_words=()):
+    """
+    Turn free-form instructions into filter keywords.
+
+    Args:
+        instructions: Instructions given by the user
+        stop_words: Words to leave out
+
+    Returns:
+        Unique lowercase keywords in the order they first appear
+    """
+    if not instructions:
+        return []
+
+    keywords = []
+    seen = set()
+    for word in INSTRUCTION_WORD_PATTERN.findall(instructions.lower()):
+        if word in stop_words or word in seen:
+            continue
+        seen.add(word)
+        keywords.append(word)
+    return keywords
+
+
+class KeywordMatcher:
+    """
+    Multi-keyword matcher that counts whole-word hits in a single pass over the text.
+
+    Uses an Aho-Corasick automaton when pyahocorasick is installed, and a
+    single compiled alternation regex otherwise.
+    """
+    def __init__(self, keywords):
+        """
+        Build the matcher.
+
+        Args:
+            keywords: Lowercase keywords to look for
+        """
+        self.keywords = list(dict.fromkeys(keywords))
+        self._automaton = None
+        self._pattern = None
+
+        if not self.keywords:
+            return
+
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for keyword in self.keywords:
+                self._automaton.add_word(keyword, keyword)
+            self._automaton.make_automaton()
+        else:
+            # Longest keywords first so the alternation prefers the full word
+            alternatives = sorted(self.keywords, key=len, reverse=True)
+            self._pattern = re.compile(
+                r'(?<!\w)(?:' + '|'.join(re.escape(k) for k in alternatives) + r')(?!\w)'
+            )
+
+    def __bool__(self):
+        return bool(self.keywords)
+
+    def count(self, text):
+        """
+        Count whole-word keyword hits in the text.
+
+        Args:
+            text: Text to search
+
+        Returns:
+            Dictionary mapping each matched keyword to its number of hits
+        """
+        hits = {}
+        if not self.keywords or not text:
+            return hits
+
+        lowered = text.lower()
+
+        if self._pattern is not None:
+            for match in self._pattern.finditer(lowered):
+                keyword = match.group(0)
+                hits[keyword] = hits.get(keyword, 0) + 1
+            return hits
+
+        length = len(lowered)
+        for end, keyword in self._automaton.iter(lowered):
+            start = end - len(keyword) + 1
+            # Only count whole words, so "art" does not match inside "start"
+            if start > 0 and _is_word_char(lowered[start - 1]):
+                continue
+            if end + 1 < length and _is_word_char(lowered[end + 1]):
+                continue
+            hits[keyword] = hits.get(keyword, 0) + 1
+
+        return hits
+
+
+def _is_word_char(char):
+    return char.isalnum() or char == '_'
+
+
+@lru_cache(maxsize=128)
+def _compile(instructions, stop_words):
+    return KeywordMatcher(instruction_keywords(instructions, stop_words))
+
+
+def compile_instructions(instructions, stop_words=frozenset()):
+    """
+    Get the keyword matcher for an instructions string, building it only once.
+
+    Args:
+        instructions: Instructions given by the user
+        stop_words: Words to leave out of the keywords
+
+    Returns:
+        KeywordMatcher for the instructions
+    """
+    return _compile(instructions or "", frozenset(stop_words))
@@ -0,0 +1,202 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from logger import logger
+
+# Request parameters that determine the model response
+KEY_FIELDS = ("model", "messages", "temperature", "top_p", "response_format")
+
+
+class LLMResponseCache:
+    """
+    Disk-backed cache of model responses keyed by the request.
+
+    The key is a hash of the model, messages and sampling parameters, so an
+    identical request is answered from disk without calling the API. Entries
+    expire a TTL after they were written, and the least recently used entries
+    are evicted once the store grows past its size limit. A file's mtime is
+    its creation time and its atime the last hit, so eviction does not have
+    to read the entries.
+    """
+    def __init__(self, cache_dir, ttl=7 * 24 * 3600, max_bytes=256 * 1024 * 1024,
+                 bypass=False, refresh=False):
+        """
+        Initialize the response cache.
+
+        Args:
+            cache_dir: Directory holding the cached responses
+            ttl: Seconds a response stays valid, or None to keep responses until evicted
+            max_bytes: Maximum total size of the store before old entries are evicted
+            bypass: Neither read nor write the cache
+            refresh: Skip cached responses but store fresh ones, replacing old entries
+        """
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.bypass = bypass
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._total_bytes = None
+
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(request):
+        """
+        Compute the cache key for a request.
+
+        Args:
+            request: Chat completion parameters (model, messages, temperature, ...)
+
+        Returns:
+            Hex SHA-256 digest of the canonical JSON of the key fields
+        """
+        fields = {name: request.get(name) for name in KEY_FIELDS}
+        canonical = json.dumps(fields, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, request):
+        """
+        Look up the cached response for a request.
+
+        Args:
+            request: Chat completion parameters
+
+        Returns:
+            Cached response text, or None on a miss, an expired entry, or when bypassing/refreshing
+        """
+        if self.bypass or self.refresh:
+            return None
+
+        path = self._path(self.make_key(request))
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            entry = None
+        except Exception as e:
+            logger.debug(f"Ignoring unreadable LLM cache entry {path}: {str(e)}")
+            entry = None
+
+        if entry is not None and self.ttl is not None and time.time() - entry.get("created", 0) > self.ttl:
+            logger.debug(f"LLM cache entry {path} expired")
+            self._remove(path)
+            entry = None
+
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        # Move the access time only, so size-based eviction drops the least recently used entries
+        # first while the modification time keeps the creation time the TTL is measured from
+        try:
+            os.utime(path, (time.time(), os.stat(path).st_mtime))
+        except OSError:
+            pass
+        return entry["content"]
+
+    def put(self, request, content):
+        """
+        Store the response for a request.
+
+        Args:
+            request: Chat completion parameters
+            content: Response text
+        """
+        if self.bypass or not content:
+            return
+
+        path = self._path(self.make_key(request))
+        entry = {"created": time.time(), "model": request.get("model"), "content": content}
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            previous = os.path.getsize(path) if os.path.exists(path) else 0
+            # Write to a temporary file first so readers never see partial entries
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.utime(tmp_path, (entry["created"], entry["created"]))
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.debug(f"Failed to write LLM cache entry {path}: {str(e)}")
+            return
+
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_size()
+            else:
+                self._total_bytes += size - previous
+            over_limit = self.max_bytes is not None and self._total_bytes > self.max_bytes
+
+        if over_limit:
+            self.evict()
+
+    def evict(self):
+        """Delete expired entries, then the least recently used ones until the store is under 90% of its limit."""
+        entries = []
+        for path in self._entry_paths():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_atime, stat.st_mtime, stat.st_size, path))
+
+        now = time.time()
+        total = sum(size for _, _, size, _ in entries)
+        target = self.max_bytes * 0.9 if self.max_bytes is not None else total
+        removed = 0
+        # Least recently used first; expired entries go wherever they are in that order
+        for last_used, created, size, path in sorted(entries):
+            expired = self.ttl is not None and now - created > self.ttl
+            if not expired and total <= target:
+                continue
+            if self._remove(path):
+                total -= size
+                removed += 1
+
+        with self._lock:
+            self._total_bytes = total
+        if removed:
+            logger.debug(f"Evicted {removed} LLM cache entries; {total} bytes remain")
+
+    def clear(self):
+        """Delete every cached response."""
+        for path in self._entry_paths():
+            self._remove(path)
+        with self._lock:
+            self._total_bytes = 0
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _entry_paths(self):
+        for shard in os.scandir(self.cache_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(".json"):
+                    yield entry.path
+
+    def _scan_size(self):
+        total = 0
+        for path in self._entry_paths():
+            try:
+                total += os.path.getsize(path)
+            except OSError:
+                pass
+        return total
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
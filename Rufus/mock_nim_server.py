@@ -0,0 +1,258 @@
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from logger import logger
+from utils import estimate_tokens
+
+# Characters sent per streamed token, matching the estimate_tokens approximation
+CHARS_PER_TOKEN = 4
+
+
+def document_response(prompt):
+    """Build a valid synthesis document from the prompt, so the synthesizer's schema checks pass."""
+    words = prompt.split()
+    return json.dumps({
+        "title": " ".join(words[:8]) or "Mock document",
+        "summary": f"Mock synthesis of {len(words)} words of prompt.",
+        "key_points": [" ".join(words[i:i + 6]) for i in range(0, min(len(words), 30), 6)] or ["No content"],
+        "content_sections": [{"heading": "Mock section", "content": " ".join(words[:50])}],
+        "metadata": {"source_count": prompt.count("URL: "), "mock": True},
+    })
+
+
+class MockNIMServer:
+    """
+    Local stand-in for the NIM OpenAI-compatible API, for offline tests and benchmarks.
+
+    Serves /v1/chat/completions (plain and streamed) and /v1/models. The time
+    to first token, the streaming token rate and the fraction of requests
+    rejected with 429 are configurable, and responses are either a fixed
+    text, an echo of the prompt, or a valid synthesis document built from it.
+    """
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, tokens_per_second=None, rate_limit_rate=0.0,
+                 retry_after=1.0, mode="document", response=None, seed=0):
+        """
+        Initialize the server.
+
+        Args:
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free port)
+            latency: Seconds before the first token of every response
+            tokens_per_second: Completion token rate, or None to answer at once
+            rate_limit_rate: Fraction of requests answered with 429 Too Many Requests
+            retry_after: Retry-After seconds sent with 429 responses
+            mode: "document" (valid synthesis JSON), "echo" (the last user message) or "canned"
+            response: Response text for "canned" mode
+            seed: Seed for the 429 injection, so runs are repeatable
+        """
+        if mode not in ("document", "echo", "canned"):
+            raise ValueError(f"Unknown mock response mode: {mode}")
+
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.mode = mode
+        self.response = response or ""
+        self.requests = 0
+        self.rate_limited = 0
+        self.active = 0
+        self.peak_concurrency = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread = None
+
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+
+    @property
+    def base_url(self):
+        """Base URL to configure as the synthesizer's NIM base URL."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        """Serve requests in a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, name="rufus-mock-nim", daemon=True)
+        self._thread.start()
+        logger.info(f"Mock NIM server listening on {self.base_url}")
+        return self
+
+    def serve_forever(self):
+        """Serve requests in the calling thread until interrupted."""
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._server.server_close()
+
+    def stop(self):
+        """Stop serving and close the socket."""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def stats(self):
+        """Return request counters."""
+        with self._lock:
+            return {"requests": self.requests, "rate_limited": self.rate_limited,
+                    "peak_concurrency": self.peak_concurrency}
+
+    def completion_text(self, request):
+        """Return the response text for a chat completion request."""
+        if self.mode == "canned":
+            return self.response
+        user_messages = [m.get("content") or "" for m in request.get("messages", []) if m.get("role") == "user"]
+        prompt = user_messages[-1] if user_messages else ""
+        if self.mode == "echo":
+            return prompt
+        return document_response(prompt)
+
+    def _admit(self):
+        # Decide whether to reject the request, and track concurrency of admitted ones
+        with self._lock:
+            self.requests += 1
+            if self.rate_limit_rate and self._random.random() < self.rate_limit_rate:
+                self.rate_limited += 1
+                return False
+            self.active += 1
+            self.peak_concurrency = max(self.peak_concurrency, self.active)
+            return True
+
+    def _release(self):
+        with self._lock:
+            self.active -= 1
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                logger.debug(f"Mock NIM server: {format % args}")
+
+            def do_GET(self):
+                if self.path.rstrip("/").endswith("/models"):
+                    self._send_json(200, {"object": "list", "data": [{"id": "mock-model", "object": "model"}]})
+                else:
+                    self._send_json(404, {"error": {"message": "Not found"}})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    request = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    self._send_json(400, {"error": {"message": "Invalid JSON body"}})
+                    return
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._send_json(404, {"error": {"message": "Not found"}})
+                    return
+
+                if not server._admit():
+                    self._send_json(429, {"error": {"message": "Too many requests", "type": "rate_limit"}},
+                                    headers={"Retry-After": f"{server.retry_after:g}"})
+                    return
+                try:
+                    if server.latency:
+                        time.sleep(server.latency)
+                    text = server.completion_text(request)
+                    if request.get("stream"):
+                        self._stream(request, text)
+                    else:
+                        self._complete(request, text)
+                finally:
+                    server._release()
+
+            def _complete(self, request, text):
+                completion_tokens = estimate_tokens(text)
+                if server.tokens_per_second:
+                    time.sleep(completion_tokens / server.tokens_per_second)
+                prompt_tokens = sum(estimate_tokens(m.get("content") or "") for m in request.get("messages", []))
+                self._send_json(200, {
+                    "id": f"chatcmpl-{uuid.uuid4().hex}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": request.get("model", "mock-model"),
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": text},
+                                 "finish_reason": "stop"}],
+                    "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                              "total_tokens": prompt_tokens + completion_tokens},
+                })
+
+            def _stream(self, request, text):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+
+                chunk_id = f"chatcmpl-{uuid.uuid4().hex}"
+                delay = 1 / server.tokens_per_second if server.tokens_per_second else 0
+                for start in range(0, len(text), CHARS_PER_TOKEN):
+                    if delay:
+                        time.sleep(delay)
+                    self._send_event(chunk_id, request, {"content": text[start:start + CHARS_PER_TOKEN]})
+                self._send_event(chunk_id, request, {}, finish_reason="stop")
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+
+            def _send_event(self, chunk_id, request, delta, finish_reason=None):
+                chunk = {
+                    "id": chunk_id,
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": request.get("model", "mock-model"),
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                }
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+
+            def _send_json(self, status, body, headers=None):
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock of the NIM OpenAI-compatible API")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=None, help="Completion token rate")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--mode", choices=["document", "echo", "canned"], default="document", help="Response mode")
+    parser.add_argument("--response", default=None, help="Response text for canned mode")
+    args = parser.parse_args()
+
+    server = MockNIMServer(host=args.host, port=args.port, latency=args.latency,
+                           tokens_per_second=args.tokens_per_second, rate_limit_rate=args.rate_limit_rate,
+                           retry_after=args.retry_after, mode=args.mode, response=args.response)
+    print(f"Mock NIM server listening on {server.base_url} (set NVIDIA_NIM_BASE_URL to use it)")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
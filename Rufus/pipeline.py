@@ -0,0 +1,249 @@
+import queue
+import threading
+import time
+from logger import logger
+
+# Marks the end of a stage's input; one is sent to each downstream worker
+_DONE = object()
+
+
+class Stage:
+    """
+    One step of a Pipeline, run by a fixed number of worker threads.
+
+    Each input item is passed to fn, which returns an iterable of output
+    items (empty to drop the item). A stage that holds items back, such as
+    one packing items into batches, returns the rest from flush() once its
+    input is exhausted.
+    """
+    def __init__(self, name, fn, workers=1, flush=None, queue_size=None):
+        """
+        Initialize the stage.
+
+        Args:
+            name: Stage name used in logs and statistics
+            fn: Function turning one input item into an iterable of output items
+            workers: Number of worker threads
+            flush: Optional function returning the output items left over after the last input
+            queue_size: Size of the stage's input queue (defaults to the pipeline's queue size)
+        """
+        if workers < 1:
+            raise ValueError(f"Stage {name} needs at least one worker")
+        self.name = name
+        self.fn = fn
+        self.workers = workers
+        self.flush = flush
+        self.queue_size = queue_size
+        self.items = 0
+        self.busy = 0.0
+        self.starved = 0.0
+        self.blocked = 0.0
+        self._lock = threading.Lock()
+        self._finished = 0
+
+    def record(self, busy=0.0, starved=0.0, blocked=0.0, items=0):
+        with self._lock:
+            self.busy += busy
+            self.starved += starved
+            self.blocked += blocked
+            self.items += items
+
+    def finish_worker(self):
+        """Count a finished worker; returns True for the last one."""
+        with self._lock:
+            self._finished += 1
+            return self._finished == self.workers
+
+
+class Pipeline:
+    """
+    Run a source and a chain of stages concurrently, connected by bounded queues.
+
+    The source (an iterable, such as a crawl yielding pages as they arrive)
+    is drained by its own thread, and every stage runs its own workers, so
+    network-bound, CPU-bound and API-bound steps overlap instead of running
+    one after another. When a queue is full the stage feeding it waits, so
+    a fast stage never runs far ahead of a slow one and memory stays
+    bounded. End-to-end time approaches that of the slowest stage.
+
+    Per-stage statistics show where the time goes: busy time, time starved
+    waiting for input, time blocked on a full output queue, and
+    utilization, the busy fraction of the stage's worker time.
+    """
+    def __init__(self, source, stages, queue_size=8, source_name="source"):
+        """
+        Initialize the pipeline.
+
+        Args:
+            source: Iterable of input items for the first stage
+            stages: List of Stage objects, in order
+            queue_size: Default size of the queue in front of each stage and of the output queue
+            source_name: Name of the source in logs and statistics
+        """
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage")
+        self.source = source
+        self.source_stage = Stage(source_name, None)
+        self.stages = stages
+        self.queue_size = queue_size
+        self.elapsed = 0.0
+        self._queues = [queue.Queue(maxsize=stage.queue_size or queue_size) for stage in stages]
+        self._queues.append(queue.Queue(maxsize=queue_size))
+        self._stop = threading.Event()
+        self._errors = []
+        self._threads = []
+        self._start = None
+
+    def run(self):
+        """
+        Start the pipeline and yield the output of the last stage as it is produced.
+
+        Closing the generator early stops every stage. If a stage raises, the
+        pipeline stops and the exception is raised here.
+
+        Yields:
+            Output items of the last stage, in completion order
+        """
+        self._start = time.perf_counter()
+        self._spawn(self._run_source, f"{self.source_stage.name}")
+        for index, stage in enumerate(self.stages):
+            for worker in range(stage.workers):
+                self._spawn(self._run_worker, f"{stage.name}-{worker}", index)
+
+        output = self._queues[-1]
+        try:
+            while True:
+                item = output.get()
+                if item is _DONE:
+                    break
+                yield item
+                if self._stop.is_set():
+                    break
+        finally:
+            self._stop.set()
+            for thread in self._threads:
+                thread.join()
+            self.elapsed = time.perf_counter() - self._start
+            logger.info(f"Pipeline finished in {self.elapsed:.2f}s: {self.describe_stats()}")
+
+        if self._errors:
+            raise self._errors[0]
+
+    def stats(self):
+        """
+        Return per-stage statistics, source first.
+
+        Returns:
+            Dictionary mapping stage names to workers, items, busy_seconds,
+            starved_seconds, blocked_seconds and utilization (0 to 1)
+        """
+        elapsed = self.elapsed or (time.perf_counter() - self._start if self._start else 0.0)
+        report = {}
+        for stage in [self.source_stage] + self.stages:
+            capacity = elapsed * stage.workers
+            report[stage.name] = {
+                "workers": stage.workers,
+                "items": stage.items,
+                "busy_seconds": round(stage.busy, 4),
+                "starved_seconds": round(stage.starved, 4),
+                "blocked_seconds": round(stage.blocked, 4),
+                "utilization": round(min(1.0, stage.busy / capacity), 4) if capacity else 0.0,
+            }
+        return report
+
+    def describe_stats(self):
+        """Summarize stage utilization in one line for logs."""
+        return ", ".join(f"{name} {stats['items']} items {stats['utilization']:.0%} busy"
+                         for name, stats in self.stats().items())
+
+    def _spawn(self, target, name, *args):
+        thread = threading.Thread(target=target, args=args, name=f"rufus-pipeline-{name}", daemon=True)
+        self._threads.append(thread)
+        thread.start()
+
+    def _run_source(self):
+        stage = self.source_stage
+        iterator = iter(self.source)
+        try:
+            while not self._stop.is_set():
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                stage.record(busy=time.perf_counter() - start, items=1)
+                stage.record(blocked=self._put(self._queues[0], item))
+        except Exception as e:
+            self._fail(stage, e)
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+            self._finish(self._queues[0], self.stages[0].workers)
+
+    def _run_worker(self, index):
+        stage = self.stages[index]
+        inbox = self._queues[index]
+        outbox = self._queues[index + 1]
+        try:
+            while not self._stop.is_set():
+                start = time.perf_counter()
+                item = self._get(inbox)
+                stage.record(starved=time.perf_counter() - start)
+                if item is _DONE:
+                    break
+                self._process(stage, outbox, stage.fn, item)
+            if stage.finish_worker():
+                if stage.flush is not None and not self._stop.is_set():
+                    self._process(stage, outbox, stage.flush)
+                self._finish(outbox, self._downstream_workers(index))
+        except Exception as e:
+            self._fail(stage, e)
+            if stage.finish_worker():
+                self._finish(outbox, self._downstream_workers(index))
+
+    def _process(self, stage, outbox, fn, *item):
+        start = time.perf_counter()
+        blocked = 0.0
+        results = fn(*item)
+        for result in results or ():
+            blocked += self._put(outbox, result)
+        stage.record(busy=time.perf_counter() - start - blocked, blocked=blocked, items=1 if item else 0)
+
+    def _downstream_workers(self, index):
+        # The output queue is read by the single consumer in run()
+        return self.stages[index + 1].workers if index + 1 < len(self.stages) else 1
+
+    def _put(self, target, item):
+        # Wait for room, unless the pipeline is stopping; returns the time spent blocked
+        start = time.perf_counter()
+        while not self._stop.is_set():
+            try:
+                target.put(item, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        return time.perf_counter() - start
+
+    def _get(self, source):
+        while not self._stop.is_set():
+            try:
+                return source.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _finish(self, target, count):
+        for _ in range(count):
+            self._put(target, _DONE)
+        if self._stop.is_set():
+            # Nobody may be reading any more; make sure the consumer in run() wakes up
+            try:
+                self._queues[-1].put_nowait(_DONE)
+            except queue.Full:
+                pass
+
+    def _fail(self, stage, error):
+        logger.error(f"Pipeline stage {stage.name} failed: {str(error)}", exc_info=True)
+        self._errors.append(error)
+        self._stop.set()
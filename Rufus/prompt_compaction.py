@@ -0,0 +1,132 @@
+from collections import Counter
+from logger import logger
+from utils import estimate_tokens
+from chunker import SENTENCE_GAP_PATTERN
+
+
+def _segments(text):
+    """
+    Split text into lines, and each line into sentences.
+
+    Extracted text normally arrives as a single line (clean_text collapses
+    newlines), so segments are in practice sentences; line breaks are only
+    kept for text that still has them.
+    """
+    return [
+        [sentence for sentence in SENTENCE_GAP_PATTERN.split(line.strip()) if sentence]
+        for line in text.splitlines()
+        if line.strip()
+    ]
+
+
+def _segment_key(segment):
+    # Case and spacing differences do not make a banner unique
+    return hash(" ".join(segment.split()).lower())
+
+
+class PromptCompactor:
+    """
+    Removes boilerplate repeated across pages before the synthesis prompt is built.
+
+    Cookie banners, navigation labels and footer sentences show up on nearly
+    every page of a crawl. Short sentences are hashed and counted by the
+    number of pages they appear on. For those found on more than a threshold
+    fraction of the pages, the first occurrence is kept and later copies are
+    dropped, so repeated facts (an address, a price) still reach the prompt once.
+    """
+    def __init__(self, threshold=0.8, min_pages=3, enabled=True, max_segment_tokens=40):
+        """
+        Initialize the compactor.
+
+        Args:
+            threshold: Fraction of pages a sentence must appear on (strictly more than) to be dropped
+            min_pages: Minimum number of pages before anything is dropped
+            enabled: Whether to compact at all
+            max_segment_tokens: Only sentences up to this many estimated tokens count as boilerplate
+        """
+        self.threshold = threshold
+        self.min_pages = min_pages
+        self.enabled = enabled
+        self.max_segment_tokens = max_segment_tokens
+        self.tokens_saved = 0
+
+    def compact(self, scraped_data):
+        """
+        Drop cross-page boilerplate from scraped content.
+
+        Args:
+            scraped_data: Dictionary mapping URLs to extracted text
+
+        Returns:
+            Tuple of (compacted scraped data, report dict with tokens before, after and saved)
+        """
+        tokens_before = sum(estimate_tokens(text) for text in scraped_data.values())
+        report = {"pages": len(scraped_data), "dropped_segments": 0, "tokens_before": tokens_before,
+                  "tokens_after": tokens_before, "tokens_saved": 0}
+
+        if not self.enabled or len(scraped_data) < self.min_pages:
+            return scraped_data, report
+
+        # One pass over the pages: split once and count each segment once per page
+        pages = {}
+        page_counts = Counter()
+        for url, text in scraped_data.items():
+            lines = [[(sentence, self._key(sentence)) for sentence in line] for line in _segments(text)]
+            pages[url] = lines
+            page_counts.update({key for line in lines for _, key in line if key is not None})
+
+        limit = self.threshold * len(scraped_data)
+        boilerplate = {key for key, pages_seen in page_counts.items() if pages_seen > limit}
+        if not boilerplate:
+            return scraped_data, report
+
+        compacted = {}
+        dropped = 0
+        seen = set()
+        for url, lines in pages.items():
+            kept_lines = []
+            for line in lines:
+                kept = []
+                for sentence, key in line:
+                    if key in boilerplate:
+                        # Keep the first copy of a repeated sentence, drop the later ones
+                        if key in seen:
+                            continue
+                        seen.add(key)
+                    kept.append(sentence)
+                dropped += len(line) - len(kept)
+                if kept:
+                    kept_lines.append(" ".join(kept))
+            if kept_lines:
+                compacted[url] = "\n".join(kept_lines)
+
+        tokens_after = sum(estimate_tokens(text) for text in compacted.values())
+        report.update(dropped_segments=dropped, tokens_after=tokens_after,
+                      tokens_saved=tokens_before - tokens_after)
+        self.tokens_saved += report["tokens_saved"]
+
+        saved_percent = 100 * report["tokens_saved"] / tokens_before if tokens_before else 0
+        logger.info(f"Prompt compaction dropped {dropped} boilerplate segments, saving "
+                    f"{report['tokens_saved']} of {tokens_before} tokens ({saved_percent:.1f}%)")
+        return compacted, report
+
+    def _key(self, sentence):
+        # Long sentences are content even when repeated, so they are never counted
+        if self.max_segment_tokens is not None and estimate_tokens(sentence) > self.max_segment_tokens:
+            return None
+        return _segment_key(sentence)
+
+
+def compact_pages(scraped_data, threshold=0.8, min_pages=3):
+    """
+    Drop cross-page boilerplate from scraped content.
+
+    Args:
+        scraped_data: Dictionary mapping URLs to extracted text
+        threshold: Fraction of pages a sentence must appear on (strictly more than) to be dropped
+        min_pages: Minimum number of pages before anything is dropped
+
+    Returns:
+        Tuple of (compacted scraped data, report dict)
+    """
+    return PromptCompactor(threshold=threshold, min_pages=min_pages).compact(scraped_data)
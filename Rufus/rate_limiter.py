@@ -1,4 +1,6 @@
+import asyncio
 import time
+import threading
 from collections import defaultdict
 from logger import logger
 import random
@@ -8,31 +10,35 @@ class RateLimiter:
         self.requests_per_minute = requests_per_minute
         self.window_size = 60  # seconds
         self.timestamps = defaultdict(list)
+        # Crawlers running in parallel may share one limiter
+        self._lock = threading.Lock()
     
     def wait_if_needed(self, domain):
         """
         Check if we need to wait before making another request to this domain.
+        Safe to call from several threads; each call reserves its own slot.
         """
-        current_time = time.time()
-        
-        # Clean up old timestamps
-        self.timestamps[domain] = [ts for ts in self.timestamps[domain] 
-                                  if current_time - ts < self.window_size]
-        
-        # Check if we've hit the rate limit
-        if len(self.timestamps[domain]) >= self.requests_per_minute:
-            # Calculate how long to wait
-            oldest_timestamp = min(self.timestamps[domain])
-            sleep_time = self.window_size - (current_time - oldest_timestamp)
+        while True:
+            with self._lock:
+                current_time = time.time()
+                
+                # Clean up old timestamps
+                self.timestamps[domain] = [ts for ts in self.timestamps[domain] 
+                                          if current_time - ts < self.window_size]
+                
+                # Reserve a slot if we haven't hit the rate limit
+                if len(self.timestamps[domain]) < self.requests_per_minute:
+                    self.timestamps[domain].append(current_time)
+                    return
+                
+                # Calculate how long to wait
+                oldest_timestamp = min(self.timestamps[domain])
+                sleep_time = self.window_size - (current_time - oldest_timestamp)
             
-            if sleep_time > 0:
-                # Add a small random jitter to avoid synchronized requests
-                sleep_time += random.uniform(0.1, 1.0)
-                logger.info(f"Rate limiting for {domain}. Waiting {sleep_time:.2f} seconds")
-                time.sleep(sleep_time)
-        
-        # Add current timestamp
-        self.timestamps[domain].append(time.time())
+            # Add a small random jitter to avoid synchronized requests
+            sleep_time = max(sleep_time, 0) + random.uniform(0.1, 1.0)
+            logger.info(f"Rate limiting for {domain}. Waiting {sleep_time:.2f} seconds")
+            time.sleep(sleep_time)
         
     def make_request_with_backoff(self, request_func, url, max_retries=5, base_delay=3, **kwargs):
         """
@@ -74,3 +80,157 @@ class RateLimiter:
         
         # This should not be reached due to the raise in the loop
         raise Exception(f"Unexpected error in make_request_with_backoff for {url}")
+
+class TokenRateLimiter:
+    """
+    Thread-safe request-per-minute and token-per-minute limiter for API quotas.
+
+    Requests and tokens are drawn from two token buckets that refill
+    continuously, so a burst can use the full per-minute quota and sustained
+    traffic settles at the configured rates. When the server asks to back
+    off (HTTP 429 with Retry-After), every caller pauses, not just the one
+    that got the error.
+    """
+    def __init__(self, requests_per_minute=40, tokens_per_minute=None):
+        """
+        Initialize the limiter.
+
+        Args:
+            requests_per_minute: Maximum requests per minute, or None for no limit
+            tokens_per_minute: Maximum tokens (prompt and completion) per minute, or None for no limit
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = float(requests_per_minute or 0)
+        self._tokens = float(tokens_per_minute or 0)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._condition = threading.Condition()
+
+    def _refill(self, now):
+        elapsed = now - self._updated
+        self._updated = now
+        if self.requests_per_minute:
+            self._requests = min(self.requests_per_minute,
+                                 self._requests + elapsed * self.requests_per_minute / 60)
+        if self.tokens_per_minute:
+            self._tokens = min(self.tokens_per_minute,
+                               self._tokens + elapsed * self.tokens_per_minute / 60)
+
+    def _wait_time(self, now, tokens):
+        wait = max(0.0, self._paused_until - now)
+        if self.requests_per_minute and self._requests < 1:
+            wait = max(wait, (1 - self._requests) * 60 / self.requests_per_minute)
+        if self.tokens_per_minute and self._tokens < tokens:
+            wait = max(wait, (tokens - self._tokens) * 60 / self.tokens_per_minute)
+        return wait
+
+    def acquire(self, tokens=0):
+        """
+        Block until a request of the given size fits the quota, then reserve it.
+
+        Args:
+            tokens: Estimated tokens of the request
+
+        Returns:
+            Number of tokens reserved (capped at the per-minute quota)
+        """
+        tokens = self._cap(tokens)
+        with self._condition:
+            while True:
+                wait = self._try_reserve(tokens)
+                if wait <= 0:
+                    return tokens
+                logger.debug(f"API rate limit reached. Waiting {wait:.2f} seconds")
+                self._condition.wait(wait)
+
+    async def acquire_async(self, tokens=0):
+        """
+        Wait without blocking the event loop until a request fits the quota, then reserve it.
+
+        The quota is shared with callers of acquire(), so threaded and asyncio
+        callers of one limiter stay inside the same limits.
+
+        Args:
+            tokens: Estimated tokens of the request
+
+        Returns:
+            Number of tokens reserved (capped at the per-minute quota)
+        """
+        tokens = self._cap(tokens)
+        while True:
+            with self._condition:
+                wait = self._try_reserve(tokens)
+            if wait <= 0:
+                return tokens
+            logger.debug(f"API rate limit reached. Waiting {wait:.2f} seconds")
+            await asyncio.sleep(wait)
+
+    def _cap(self, tokens):
+        return min(tokens, self.tokens_per_minute) if self.tokens_per_minute else 0
+
+    def _try_reserve(self, tokens):
+        # Reserve the request if it fits now; otherwise return the time to wait
+        now = time.monotonic()
+        self._refill(now)
+        wait = self._wait_time(now, tokens)
+        if wait <= 0:
+            if self.requests_per_minute:
+                self._requests -= 1
+            self._tokens -= tokens
+        return wait
+
+    def record_usage(self, reserved, actual):
+        """
+        Correct the token bucket once the real token usage of a request is known.
+
+        Args:
+            reserved: Tokens reserved by acquire()
+            actual: Tokens the request actually used
+        """
+        if not self.tokens_per_minute or actual is None:
+            return
+        with self._condition:
+            self._tokens -= actual - reserved
+            self._condition.notify_all()
+
+    def pause(self, seconds):
+        """
+        Hold back every caller for the given time, e.g. after a 429 with Retry-After.
+
+        Args:
+            seconds: Time to pause in seconds
+        """
+        with self._condition:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            logger.warning(f"API asked to back off. Pausing requests for {seconds:.2f} seconds")
+
+
+class AsyncRateLimiter:
+    """
+    Per-domain request limiter for asyncio crawlers.
+
+    Works like RateLimiter, but waits with asyncio.sleep, so waiting for a
+    slot neither blocks the event loop nor prevents cancellation.
+    """
+    def __init__(self, requests_per_minute=20):
+        self.requests_per_minute = requests_per_minute
+        self.window_size = 60  # seconds
+        self.timestamps = defaultdict(list)
+
+    async def wait_if_needed(self, domain):
+        """Wait until another request to this domain fits the limit, and reserve it."""
+        while True:
+            current_time = time.time()
+            self.timestamps[domain] = [ts for ts in self.timestamps[domain]
+                                      if current_time - ts < self.window_size]
+
+            # Nothing awaits between the check and the reservation, so no lock is needed
+            if len(self.timestamps[domain]) < self.requests_per_minute:
+                self.timestamps[domain].append(current_time)
+                return
+
+            sleep_time = self.window_size - (current_time - min(self.timestamps[domain]))
+            sleep_time = max(sleep_time, 0) + random.uniform(0.1, 1.0)
+            logger.info(f"Rate limiting for {domain}. Waiting {sleep_time:.2f} seconds")
+            await asyncio.sleep(sleep_time)
@@ -0,0 +1,345 @@
+import re
+from collections import defaultdict
+from itertools import count
+import numpy as np
+from logger import logger
+from utils import estimate_tokens
+from chunker import chunk_pages
+
+TOKEN_PATTERN = re.compile(r"\w+")
+PUNCTUATION_PATTERN = re.compile(r'[^\w\s]')
+
+
+def tokenize(text, stop_words=frozenset()):
+    """
+    Split text into lowercase word tokens.
+
+    Args:
+        text: Text to tokenize
+        stop_words: Words to leave out
+
+    Returns:
+        List of tokens
+    """
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    if stop_words:
+        tokens = [token for token in tokens if token not in stop_words]
+    return tokens
+
+
+def build_postings(token_lists, excluded=frozenset()):
+    """
+    Build a sparse term-document matrix from tokenized documents in one pass.
+
+    Postings are grouped by term (CSR layout with terms as rows): the postings
+    of term t are posting_docs[term_offsets[t]:term_offsets[t + 1]], sorted by
+    document, with matching counts in posting_tfs.
+
+    Args:
+        token_lists: List of token lists, one per document
+        excluded: Terms to drop from the matrix (e.g. stop words)
+
+    Returns:
+        Tuple of (vocabulary dict, term_offsets, posting_docs, posting_tfs, doc_lengths)
+    """
+    n_docs = len(token_lists)
+    empty = (
+        {}, np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int32),
+        np.zeros(0, dtype=np.float32), np.zeros(n_docs, dtype=np.float32)
+    )
+
+    # Term ids are assigned in first-seen order by the dict's default factory,
+    # so mapping tokens to ids stays in C
+    vocabulary = defaultdict(count().__next__)
+    term_ids = [
+        np.fromiter(map(vocabulary.__getitem__, tokens), dtype=np.int64, count=len(tokens))
+        for tokens in token_lists
+    ]
+    vocabulary = dict(vocabulary)
+    if not vocabulary:
+        return empty
+
+    terms = np.concatenate(term_ids)
+    docs = np.repeat(np.arange(n_docs, dtype=np.int64), [len(ids) for ids in term_ids])
+
+    excluded_ids = [vocabulary[term] for term in excluded if term in vocabulary]
+    if excluded_ids:
+        keep = ~np.isin(terms, excluded_ids)
+        terms = terms[keep]
+        docs = docs[keep]
+        for term in excluded:
+            vocabulary.pop(term, None)
+        if not vocabulary:
+            return empty
+
+    doc_lengths = np.bincount(docs, minlength=n_docs).astype(np.float32)
+
+    # Collapse (term, doc) pairs into postings with term frequencies
+    unique_keys, tfs = np.unique(terms * n_docs + docs, return_counts=True)
+    posting_terms = unique_keys // n_docs
+
+    doc_freqs = np.bincount(posting_terms, minlength=len(vocabulary) + len(excluded_ids))
+    term_offsets = np.concatenate(([0], np.cumsum(doc_freqs)))
+    posting_docs = (unique_keys % n_docs).astype(np.int32)
+
+    return vocabulary, term_offsets, posting_docs, tfs.astype(np.float32), doc_lengths
+
+
+class BM25Index:
+    """
+    In-memory inverted index with BM25 scoring.
+
+    Postings are stored in CSR-style NumPy arrays (term offsets, document ids
+    and term frequencies), so scoring a query is a handful of vectorized
+    operations per query term instead of a loop over documents.
+    """
+    def __init__(self, k1=1.5, b=0.75, stop_words=frozenset()):
+        """
+        Initialize the index.
+
+        Args:
+            k1: BM25 term frequency saturation parameter
+            b: BM25 document length normalization parameter
+            stop_words: Words left out of documents and queries
+        """
+        self.k1 = k1
+        self.b = b
+        self.stop_words = frozenset(stop_words)
+
+        self.doc_ids = []
+        self.documents = []
+        self._tokens = []
+        self._dirty = False
+        self.vocabulary = {}
+
+        self._term_offsets = np.zeros(1, dtype=np.int64)
+        self._posting_docs = np.zeros(0, dtype=np.int32)
+        self._posting_tfs = np.zeros(0, dtype=np.float32)
+        self._doc_lengths = np.zeros(0, dtype=np.float32)
+        self._idf = np.zeros(0, dtype=np.float32)
+
+    def __len__(self):
+        return len(self.doc_ids)
+
+    def add(self, doc_id, text):
+        """
+        Add a document to the index. The index is rebuilt lazily on the next query.
+
+        Args:
+            doc_id: Identifier returned by queries
+            text: Document text
+        """
+        self.doc_ids.append(doc_id)
+        self.documents.append(text)
+        self._tokens.append(tokenize(text, self.stop_words))
+        self._dirty = True
+
+    def _build(self):
+        if not self._dirty:
+            return
+
+        # Rebuild the arrays from scratch: the vocabulary and IDF depend on every document
+        all_tokens = self._tokens
+        self._dirty = False
+
+        vocabulary, term_offsets, posting_docs, posting_tfs, doc_lengths = build_postings(all_tokens)
+
+        self.vocabulary = vocabulary
+        self._term_offsets = term_offsets
+        self._posting_docs = posting_docs
+        self._posting_tfs = posting_tfs
+        self._doc_lengths = doc_lengths
+
+        n_docs = len(all_tokens)
+        doc_freqs = np.diff(term_offsets)
+        self._idf = np.log1p((n_docs - doc_freqs + 0.5) / (doc_freqs + 0.5)).astype(np.float32)
+
+    def score(self, query):
+        """
+        Score every document against a query.
+
+        Args:
+            query: Query text
+
+        Returns:
+            NumPy array of BM25 scores aligned with doc_ids
+        """
+        self._build()
+        scores = np.zeros(len(self.doc_ids), dtype=np.float32)
+        if not len(scores) or not self.vocabulary:
+            return scores
+
+        avg_length = max(float(self._doc_lengths.mean()), 1.0)
+        length_norm = self.k1 * (1 - self.b + self.b * self._doc_lengths / avg_length)
+
+        for token in set(tokenize(query, self.stop_words)):
+            term_id = self.vocabulary.get(token)
+            if term_id is None:
+                continue
+            start, end = self._term_offsets[term_id], self._term_offsets[term_id + 1]
+            docs = self._posting_docs[start:end]
+            tfs = self._posting_tfs[start:end]
+            scores[docs] += self._idf[term_id] * tfs * (self.k1 + 1) / (tfs + length_norm[docs])
+
+        return scores
+
+    def top(self, query, top_k=None, token_budget=None):
+        """
+        Select the best matching documents for a query.
+
+        Args:
+            query: Query text
+            top_k: Maximum number of documents to return
+            token_budget: Maximum estimated tokens across returned documents
+
+        Returns:
+            List of (doc_id, score) tuples, best first
+        """
+        scores = self.score(query)
+        # Stable sort keeps the original order among equal scores
+        order = np.argsort(-scores, kind="stable")
+        if len(scores) and scores.max() > 0:
+            # Documents that share no term with the query are not relevant at all
+            order = order[scores[order] > 0]
+        if top_k is not None:
+            order = order[:top_k]
+
+        selected = []
+        used_tokens = 0
+        for index in order:
+            if token_budget is not None:
+                tokens = estimate_tokens(self.documents[index])
+                if used_tokens + tokens > token_budget:
+                    # Keep looking for smaller documents that still fit
+                    continue
+                used_tokens += tokens
+            selected.append((self.doc_ids[index], float(scores[index])))
+
+        if not selected and len(order):
+            # Never return nothing; the best document is better than no content at all
+            best = order[0]
+            selected.append((self.doc_ids[best], float(scores[best])))
+
+        return selected
+
+
+def select_relevant(scraped_data, instructions, top_k=None, token_budget=None,
+                    passages=False, passage_tokens=200, stop_words=frozenset(), raw_pages=None):
+    """
+    Keep only the pages or passages that are most relevant to the instructions.
+
+    Args:
+        scraped_data: Dictionary mapping URLs to extracted text
+        instructions: Instructions used as the BM25 query
+        top_k: Maximum number of pages (or passages) to keep
+        token_budget: Maximum estimated tokens to keep
+        passages: Whether to rank passages instead of whole pages
+        passage_tokens: Approximate passage size when ranking passages
+        stop_words: Words left out of documents and queries
+        raw_pages: Optional dictionary mapping URLs to HTML, so passages follow section headings
+
+    Returns:
+        Dictionary mapping URLs to the selected text, most relevant page first
+    """
+    if not scraped_data or (top_k is None and token_budget is None):
+        return scraped_data
+
+    index = BM25Index(stop_words=stop_words)
+    if passages:
+        # Passages repeated across pages are only ranked once
+        for passage in chunk_pages(scraped_data, raw_pages=raw_pages, max_tokens=passage_tokens):
+            index.add((passage["url"], passage["start"]), passage["text"])
+    else:
+        for url, text in scraped_data.items():
+            index.add((url, 0), text)
+
+    selected = index.top(instructions or "", top_k=top_k, token_budget=token_budget)
+
+    if not passages:
+        result = {url: scraped_data[url] for (url, _), _ in selected}
+    else:
+        # Group passages by page, pages ordered by their best passage,
+        # passages kept in reading order within each page
+        by_url = {}
+        for (url, position), _ in selected:
+            by_url.setdefault(url, []).append(position)
+        passage_text = dict(zip(index.doc_ids, index.documents))
+        result = {
+            url: ' '.join(passage_text[(url, position)] for position in sorted(positions))
+            for url, positions in by_url.items()
+        }
+
+    logger.info(f"Relevance selection kept {len(selected)} of {len(index)} "
+                f"{'passages' if passages else 'pages'} from {len(result)} pages")
+    return result
+
+
+def tfidf_keywords(texts, top_n=10, stop_words=frozenset(), min_length=3):
+    """
+    Extract keywords for every page and for the whole site with corpus-level TF-IDF.
+
+    Terms that appear on most pages (navigation labels, the site name) get a low
+    inverse document frequency, so page keywords reflect what makes each page
+    distinct. Scoring runs as vectorized operations over the sparse matrix.
+
+    Args:
+        texts: Dictionary mapping URLs to text, or a list of texts
+        top_n: Number of keywords to return per page and for the site
+        stop_words: Words to leave out
+        min_length: Minimum keyword length
+
+    Returns:
+        Dictionary with "pages" (mapping each URL or list index to its keywords)
+        and "site" (keywords for the whole corpus)
+    """
+    keys = list(texts) if isinstance(texts, dict) else list(range(len(texts)))
+    documents = list(texts.values()) if isinstance(texts, dict) else list(texts)
+
+    # Same word splitting as ContentAnalyzer.extract_keywords; short words and
+    # numbers are dropped per vocabulary term after scoring, not per token
+    token_lists = [PUNCTUATION_PATTERN.sub('', (text or "").lower()).split() for text in documents]
+    vocabulary, term_offsets, posting_docs, posting_tfs, doc_lengths = build_postings(
+        token_lists, excluded=stop_words
+    )
+
+    result = {"pages": {key: [] for key in keys}, "site": []}
+    if not vocabulary:
+        return result
+
+    n_terms = len(term_offsets) - 1
+    terms_by_id = np.empty(n_terms, dtype=object)
+    for term, term_id in vocabulary.items():
+        terms_by_id[term_id] = term
+
+    n_docs = len(documents)
+    doc_freqs = np.diff(term_offsets)
+    posting_terms = np.repeat(np.arange(n_terms), doc_freqs)
+
+    # Smoothed IDF and length-normalized TF
+    idf = np.log((1 + n_docs) / (1 + doc_freqs)) + 1
+    scores = (posting_tfs / np.maximum(doc_lengths[posting_docs], 1)) * idf[posting_terms]
+
+    # Short words and pure numbers (years, prices, ids) are not useful keywords
+    dropped_terms = np.fromiter(
+        (term is None or len(term) < min_length or term.isdigit() for term in terms_by_id),
+        dtype=bool, count=n_terms
+    )
+    scores[dropped_terms[posting_terms]] = 0
+
+    # Per-page top-n: order postings by page, then by descending score (term id breaks ties)
+    order = np.lexsort((posting_terms, -scores, posting_docs))
+    sorted_docs = posting_docs[order]
+    page_starts = np.searchsorted(sorted_docs, np.arange(n_docs))
+    rank = np.arange(len(order)) - page_starts[sorted_docs]
+    keep = order[(rank < top_n) & (scores[order] > 0)]
+    page_sizes = np.bincount(posting_docs[keep], minlength=n_docs)
+    page_terms = np.split(terms_by_id[posting_terms[keep]], np.cumsum(page_sizes)[:-1])
+    for key, terms in zip(keys, page_terms):
+        result["pages"][key] = terms.tolist()
+
+    # Site keywords: total TF-IDF mass of each term across all pages
+    site_scores = np.bincount(posting_terms, weights=scores, minlength=n_terms)
+    site_order = np.lexsort((np.arange(n_terms), -site_scores))[:top_n]
+    result["site"] = [terms_by_id[term_id] for term_id in site_order if site_scores[term_id] > 0]
+
+    return result
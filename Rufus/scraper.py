@@ -1,79 +1,94 @@
-from bs4 import BeautifulSoup
 from logger import logger
-from utils import clean_text as utils_clean_text
+from utils import is_installed
+from text_normalizer import normalize_text
+from extraction_cache import ExtractionCache
+from extractor_stats import ExtractorStats
+from extractors import default_registry
+from site_template import SiteTemplateLearner
+from extraction_watchdog import OK, TIMEOUT, ERROR
+from keyword_matcher import compile_instructions
+from relevance import tfidf_keywords
+from chunker import chunk_pages
+import os
 import re
 import time
 import json
 import requests
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from urllib.parse import urlparse
+import threading
 import traceback
 
-# Try to import optional packages with fallbacks
-try:
-    import trafilatura
-except ImportError:
-    logger.warning("Trafilatura not available. Some extraction methods will be disabled.")
-    trafilatura = None
+# Selenium is imported by the first page that needs it; checking it is installed is cheap
+SELENIUM_AVAILABLE = is_installed('selenium') and is_installed('webdriver_manager')
 
-try:
-    from goose3 import Goose
-except ImportError:
-    logger.warning("Goose3 not available. Some extraction methods will be disabled.")
-    Goose = None
+# Process-wide in-memory cache, statistics and site templates used when callers do not provide their own
+default_extraction_cache = ExtractionCache(config=default_registry.config())
+default_extractor_stats = ExtractorStats()
+default_site_templates = SiteTemplateLearner()
 
-try:
-    from readability import Document
-except ImportError:
-    logger.warning("Readability-lxml not available. Some extraction methods will be disabled.")
-    Document = None
+# In-memory caches for callers that bring their own registry but no cache, one per extractor configuration
+_registry_caches = {}
+_registry_caches_lock = threading.Lock()
 
-try:
-    from selenium import webdriver
-    from selenium.webdriver.chrome.options import Options
-    from selenium.webdriver.chrome.service import Service
-    from webdriver_manager.chrome import ChromeDriverManager
-    SELENIUM_AVAILABLE = True
-except ImportError:
-    logger.warning("Selenium not available. JavaScript rendering will be disabled.")
-    SELENIUM_AVAILABLE = False
+def default_cache_for(registry):
+    """
+    Return the process-wide extraction cache matching a registry's configuration.
+    
+    Results are keyed by the extractor configuration, so a registry with
+    other extractors or settings never gets results of the default one.
+    
+    Args:
+        registry: ExtractorRegistry, or None for the process-wide registry
+        
+    Returns:
+        ExtractionCache for the registry's configuration
+    """
+    if registry is None or registry is default_registry:
+        return default_extraction_cache
+    config = registry.config()
+    key = json.dumps(config, sort_keys=True, default=str)
+    with _registry_caches_lock:
+        cache = _registry_caches.get(key)
+        if cache is None:
+            cache = _registry_caches[key] = ExtractionCache(config=config)
+        return cache
 
-def scrape_content(raw_pages, instructions):
+def scrape_content(raw_pages, instructions, cache=None, stats=None, registry=None, templates=None,
+                   watchdog=None, return_hits=False):
     """
     Filter raw HTML pages to extract text that matches the user-defined instructions.
     Uses multiple content extraction methods for better results.
+
+    Args:
+        raw_pages: Dictionary mapping URLs to their HTML content
+        instructions: Instructions used to derive filter keywords
+        cache: Optional ExtractionCache; the process-wide cache is used by default
+        stats: Optional ExtractorStats; the process-wide statistics are used by default
+        registry: Optional ExtractorRegistry; the process-wide registry is used by default
+        templates: Optional SiteTemplateLearner; the process-wide learner is used by default
+        watchdog: Optional ExtractionWatchdog enforcing time budgets and a page size limit
+        return_hits: Whether to also return per-keyword hit counts for each page
+        
+    Returns:
+        Dictionary mapping URLs to extracted text, or a tuple of that dictionary
+        and a dictionary mapping URLs to {keyword: hit count} if return_hits is set
     """
     logger.info(f"Scraping content with instructions: {instructions}")
     
     filtered_content = {}
-    keywords = instructions.lower().split() if instructions else []
+    keyword_hits = {}
+    matcher = compile_instructions(instructions, ContentAnalyzer.common_stop_words)
     
-    if keywords:
-        logger.debug(f"Using keywords for filtering: {keywords}")
+    if matcher:
+        logger.debug(f"Using keywords for filtering: {matcher.keywords}")
     
     for url, html in raw_pages.items():
-        logger.debug(f"Processing HTML from {url}")
-        
-        if not html or len(html) < 100:
-            logger.warning(f"HTML content from {url} is too small or empty")
-            continue
-        
-        # Try multiple content extraction methods
-        extracted_content = extract_content_multi_method(html, url)
-        
-        if not extracted_content or extracted_content.startswith('[No content'):
-            logger.debug(f"No content extracted from {url}")
-            continue
-        
-        if keywords:
-            matches = [keyword for keyword in keywords if keyword in extracted_content.lower()]
-            if matches:
-                logger.debug(f"Content at {url} matched keywords: {matches}")
-                filtered_content[url] = extracted_content
-            else:
-                logger.debug(f"Content at {url} did not match any keywords")
-        else:
-            logger.debug(f"No keywords specified, including all content from {url}")
-            filtered_content[url] = extracted_content
+        match = extract_matching(url, html, matcher, cache=cache, stats=stats, registry=registry,
+                                 templates=templates, watchdog=watchdog)
+        if match is not None:
+            filtered_content[url], keyword_hits[url] = match
     
     logger.info(f"Filtered content from {len(raw_pages)} pages down to {len(filtered_content)} pages")
     
@@ -82,132 +97,220 @@ def scrape_content(raw_pages, instructions):
         # Get the first URL and its content
         first_url = next(iter(raw_pages))
         first_html = raw_pages[first_url]
-        extracted = extract_content_multi_method(first_html, first_url)
+        extracted = extract_content_multi_method(first_html, first_url, cache=cache, stats=stats,
+                                                 registry=registry, templates=templates, watchdog=watchdog)
         filtered_content[first_url] = extracted
+        keyword_hits[first_url] = {}
         logger.info("No content matched filters. Returning the first page by default.")
     
+    # Persist what we learned about the site's extractors for the next run
+    (stats if stats is not None else default_extractor_stats).save()
+    
+    if return_hits:
+        return filtered_content, keyword_hits
     return filtered_content
 
-def extract_content_multi_method(html, url):
+def extract_matching(url, html, matcher, cache=None, stats=None, registry=None, templates=None, watchdog=None):
+    """
+    Extract one page and check it against the instruction keywords.
+    
+    Args:
+        url: URL of the page
+        html: HTML content of the page
+        matcher: KeywordMatcher from compile_instructions, or None to keep every page
+        cache, stats, registry, templates, watchdog: Extraction options, as for scrape_content
+        
+    Returns:
+        Tuple of (extracted text, {keyword: hit count}), or None if the page has no matching content
+    """
+    logger.debug(f"Processing HTML from {url}")
+    
+    if not html or len(html) < 100:
+        logger.warning(f"HTML content from {url} is too small or empty")
+        return None
+    
+    # Try multiple content extraction methods
+    extracted_content = extract_content_multi_method(html, url, cache=cache, stats=stats, registry=registry,
+                                                     templates=templates, watchdog=watchdog)
+    
+    if not extracted_content or extracted_content.startswith('[No content'):
+        logger.debug(f"No content extracted from {url}")
+        return None
+    
+    if not matcher:
+        logger.debug(f"No keywords specified, including all content from {url}")
+        return extracted_content, {}
+    
+    hits = matcher.count(extracted_content)
+    if not hits:
+        logger.debug(f"Content at {url} did not match any keywords")
+        return None
+    logger.debug(f"Content at {url} matched keywords: {hits}")
+    return extracted_content, hits
+
+def scrape_passages(raw_pages, instructions, max_tokens=200, dedup=True, **options):
+    """
+    Scrape pages and split the matching content into passages with stable IDs.
+
+    Args:
+        raw_pages: Dictionary mapping URLs to their HTML content
+        instructions: Instructions used to derive filter keywords
+        max_tokens: Approximate maximum number of tokens per passage
+        dedup: Whether to drop passages repeated across pages
+        **options: Extraction options passed on to scrape_content (cache, stats, registry, ...)
+
+    Yields:
+        Passage dictionaries with id, url, text, start, end, heading and tokens
+    """
+    scraped_data = scrape_content(raw_pages, instructions, **options)
+    yield from chunk_pages(scraped_data, raw_pages=raw_pages, max_tokens=max_tokens, dedup=dedup)
+
+def extract_content_multi_method(html, url, cache=None, stats=None, registry=None, templates=None,
+                                 watchdog=None):
     """
     Extract content using multiple methods with better fallbacks.
     
+    Once the layout of a site section has been learned, pages are extracted
+    with a single selector lookup and only fall back to the extractor
+    cascade when the template does not match.
+    
     Args:
         html: HTML content of the page
         url: URL of the page
+        cache: Optional ExtractionCache; a process-wide cache matching the registry is used by default
+        stats: Optional ExtractorStats; the process-wide statistics are used by default
+        registry: Optional ExtractorRegistry; the process-wide registry is used by default
+        templates: Optional SiteTemplateLearner; the process-wide learner is used by default
+        watchdog: Optional ExtractionWatchdog enforcing time budgets and a page size limit
         
     Returns:
         Extracted text content or placeholder if extraction fails
     """
     logger.info(f"Attempting content extraction from {url}")
-    extracted_text = ""
-    extraction_attempts = 0
     
     # Check if HTML is not None and not empty
     if not html or len(html.strip()) < 100:
         logger.warning(f"HTML content from {url} is too small or empty")
         return f"[Empty or minimal content from {url}]"
     
-    # Method 1: Try Trafilatura (good for news articles and blog posts)
-    if trafilatura:
-        try:
-            extraction_attempts += 1
-            logger.debug(f"Attempting extraction with Trafilatura for {url}")
-            trafilatura_text = trafilatura.extract(html, include_comments=False, 
-                                                include_tables=True, 
-                                                output_format="text",
-                                                favor_precision=True)
-            if trafilatura_text and len(trafilatura_text) > 50:  # Lower minimum for minimal sites
-                extracted_text = trafilatura_text
-                logger.debug(f"Successfully extracted content with Trafilatura: {len(extracted_text)} chars")
-                return clean_text(extracted_text)
-        except Exception as e:
-            logger.debug(f"Trafilatura extraction failed for {url}: {str(e)}")
-    
-    # Method 2: Try Readability (Mozilla's algorithm)
-    if Document:
-        try:
-            extraction_attempts += 1
-            logger.debug(f"Attempting extraction with Readability for {url}")
-            doc = Document(html)
-            readable_text = doc.summary()
-            # Convert the HTML summary to plain text
-            readable_soup = BeautifulSoup(readable_text, "html.parser")
-            readable_text = readable_soup.get_text(separator=' ', strip=True)
-            
-            if readable_text and len(readable_text) > 50:
-                extracted_text = readable_text
-                logger.debug(f"Successfully extracted content with Readability: {len(extracted_text)} chars")
-                return clean_text(extracted_text)
-        except Exception as e:
-            logger.debug(f"Readability extraction failed for {url}: {str(e)}")
-    
-    # Method 3: Try Goose (good for news articles)
-    if Goose:
-        try:
-            extraction_attempts += 1
-            logger.debug(f"Attempting extraction with Goose for {url}")
-            g = Goose({'browser_user_agent': 'Mozilla/5.0'})
-            article = g.extract(raw_html=html)
-            goose_text = article.cleaned_text
-            if goose_text and len(goose_text) > 50:
-                extracted_text = goose_text
-                logger.debug(f"Successfully extracted content with Goose: {len(extracted_text)} chars")
-                return clean_text(extracted_text)
-        except Exception as e:
-            logger.debug(f"Goose extraction failed for {url}: {str(e)}")
-    
-    # Method 4: BeautifulSoup fallback with more relaxed criteria
-    try:
-        extraction_attempts += 1
-        logger.debug(f"Attempting extraction with BeautifulSoup for {url}")
-        soup = BeautifulSoup(html, "html.parser")
+    if cache is None:
+        cache = default_cache_for(registry)
+    
+    cached = cache.get(html)
+    if cached is not None:
+        logger.debug(f"Extraction cache hit for {url} (method: {cached['method']})")
+        return cached['text']
+    
+    if stats is None:
+        stats = default_extractor_stats
+    if templates is None:
+        templates = default_site_templates
+    
+    # The cache is keyed on the page as fetched; extractors only see the truncated page
+    page_html = watchdog.prepare(html, url) if watchdog is not None else html
+    
+    if templates.template_for(url) is not None:
+        start_time = time.perf_counter()
+        extracted_text = templates.extract(url, page_html)
+        stats.record(url, 'template', extracted_text is not None, time.perf_counter() - start_time)
+        if extracted_text is not None:
+            # Not cached: a template can be relearned or disabled, and the lookup is cheaper than the cache
+            logger.debug(f"Extracted content from {url} with the learned site template")
+            return extracted_text
+    
+    extracted_text, method, timed_out = _run_extraction_cascade(page_html, url, stats=stats, registry=registry,
+                                                                watchdog=watchdog)
+    
+    # Placeholders mention the URL and are cheap to rebuild, so only real results are cached.
+    # After a timeout a better method may have been cut short, so the result is not kept either.
+    if method and not timed_out:
+        cache.put(html, extracted_text, method)
+    
+    # Learn the site layout from pages where a real extractor found the content
+    if method and method != 'title' and templates.is_learning(url):
+        templates.observe(url, page_html, extracted_text)
+    
+    return extracted_text
+
+def _run_extraction_cascade(html, url, stats=None, registry=None, watchdog=None):
+    """
+    Run the extraction methods in order until one produces enough text.
+    
+    When extractor statistics are available, the method that historically
+    works best for the site runs first and methods that never work there are
+    only tried once everything else has failed. With a watchdog, methods that
+    run past their time budget are abandoned and the cascade moves on.
+    
+    Args:
+        html: HTML content of the page
+        url: URL of the page
+        stats: Optional ExtractorStats used to order methods and record outcomes
+        registry: ExtractorRegistry providing the extraction backends
+        watchdog: Optional ExtractionWatchdog enforcing per-method and per-page time budgets
+        
+    Returns:
+        Tuple of (extracted text, name of the winning method or None, whether any method timed out)
+    """
+    if registry is None:
+        registry = default_registry
+    
+    if stats is not None:
+        ordered, skipped = stats.order_methods(url, registry.extractors)
+        if skipped:
+            logger.debug(f"Skipping extraction methods that never work for {url}: {skipped}")
+    else:
+        ordered, skipped = list(registry.extractors), []
+    
+    budget = watchdog.budget() if watchdog is not None else None
+    
+    extraction_attempts = 0
+    any_timed_out = False
+    for name in ordered + skipped:
+        if budget is not None and budget.exhausted():
+            logger.warning(f"Extraction time budget for {url} exhausted, skipping the remaining methods")
+            any_timed_out = True
+            break
         
-        # Remove unwanted elements
-        for element in soup(['script', 'style', 'nav', 'footer', 'header', 'aside']):
-            element.decompose()
+        extraction_attempts += 1
+        logger.debug(f"Attempting extraction with {name} for {url}")
         
-        # First try to find the main content
-        content_elements = soup.select('article, main, #content, .content, #main, .main, .post, .article, .page-content, .entry-content, .post-content')
-        if content_elements:
-            main_content = max(content_elements, key=lambda x: len(x.get_text()))
-            bs_text = main_content.get_text(separator=' ', strip=True)
+        timed_out = False
+        start_time = time.perf_counter()
+        if watchdog is not None:
+            status, extracted_text = watchdog.run(registry, name, html, budget=budget)
         else:
-            # If no content containers found, use the body with paragraphs
-            paragraphs = soup.find_all('p')
-            if paragraphs:
-                bs_text = ' '.join([p.get_text(strip=True) for p in paragraphs])
+            try:
+                status, extracted_text = OK, registry.extract(name, html)
+            except Exception as e:
+                status, extracted_text = ERROR, str(e)
+        if status == TIMEOUT:
+            logger.warning(f"{name} extraction timed out for {url}: {extracted_text}")
+            extracted_text = None
+            timed_out = any_timed_out = True
+        elif status != OK:
+            logger.debug(f"{name} extraction failed for {url}: {extracted_text}")
+            extracted_text = None
+        elapsed = time.perf_counter() - start_time
+        
+        success = bool(extracted_text) and len(extracted_text) > registry.min_length(name)
+        if stats is not None:
+            if timed_out:
+                stats.record_timeout(url, name, elapsed)
             else:
-                # Last resort: just get all text from body
-                bs_text = soup.body.get_text(separator=' ', strip=True) if soup.body else ""
+                stats.record(url, name, success, elapsed)
         
-        if bs_text and len(bs_text) > 30:  # Very low threshold for basic sites
-            extracted_text = bs_text
-            logger.debug(f"Successfully extracted content with BeautifulSoup: {len(extracted_text)} chars")
-            return clean_text(extracted_text)
-    except Exception as e:
-        logger.debug(f"BeautifulSoup extraction failed for {url}: {str(e)}")
-    
-    # Method 5: Raw HTML extractor - simplest possible approach
-    try:
-        extraction_attempts += 1
-        logger.debug(f"Attempting raw text extraction for {url}")
-        # Strip HTML tags using regex
-        raw_text = re.sub(r'<[^>]+>', ' ', html)
-        # Remove extra whitespace
-        raw_text = re.sub(r'\s+', ' ', raw_text).strip()
-        
-        if raw_text and len(raw_text) > 20:  # Extremely low threshold
-            logger.debug(f"Extracted raw text: {len(raw_text)} chars")
-            return clean_text(raw_text)
-    except Exception as e:
-        logger.debug(f"Raw text extraction failed for {url}: {str(e)}")
+        if success:
+            logger.debug(f"Successfully extracted content with {name}: {len(extracted_text)} chars")
+            if not registry.is_precleaned(name):
+                extracted_text = clean_text(extracted_text)
+            return extracted_text, name, any_timed_out
     
     # If we reached this point, all extraction methods failed
     logger.warning(f"All {extraction_attempts} content extraction methods failed for {url}")
     
     # Look for any text in the HTML as a last resort
     try:
+        from bs4 import BeautifulSoup
         soup = BeautifulSoup(html, "html.parser")
         title = soup.title.string if soup.title else ""
         h1_text = " ".join([h.get_text() for h in soup.find_all('h1')]) if soup.find_all('h1') else ""
@@ -215,12 +318,12 @@ def extract_content_multi_method(html, url):
         if title or h1_text:
             fallback_text = f"Title: {title}\n{h1_text}"
             logger.debug(f"Using title and headings as fallback: {fallback_text[:50]}...")
-            return clean_text(fallback_text)
+            return clean_text(fallback_text), "title", any_timed_out
     except Exception:
         pass
     
     # Return a placeholder rather than empty string
-    return f"[No content could be extracted from {url}]"
+    return f"[No content could be extracted from {url}]", None, any_timed_out
 
 def extract_with_selenium(url, timeout=30):
     """
@@ -240,6 +343,9 @@ def extract_with_selenium(url, timeout=30):
     try:
         logger.info(f"Extracting content from {url} using Selenium")
         
+        from selenium.webdriver.chrome.options import Options
+        from crawler import start_chrome
+        
         options = Options()
         options.add_argument('--headless')
         options.add_argument('--disable-gpu')
@@ -250,8 +356,7 @@ def extract_with_selenium(url, timeout=30):
         options.binary_location = "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"
         
         # Initialize WebDriver
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=options)
+        driver = start_chrome(options)
         driver.set_page_load_timeout(timeout)
         
         driver.get(url)
@@ -272,44 +377,55 @@ def clean_text(text):
     Clean extracted text by removing extra whitespace, normalizing characters,
     and fixing common extraction artifacts.
     
+    Whitespace collapse, leftover tag removal, HTML entity decoding, sentence
+    spacing and Unicode normalization all happen in a single pass; see
+    text_normalizer.TextNormalizer.
+    
     Args:
         text: Text to clean
         
     Returns:
         Cleaned text
     """
-    if not text:
-        return ""
-        
-    # Use the utility clean_text function first
-    text = utils_clean_text(text)
-    
-    # Replace multiple spaces, newlines, and tabs with a single space
-    text = re.sub(r'\s+', ' ', text)
-    
-    # Remove any remaining HTML entities
-    text = re.sub(r'&[a-zA-Z]+;', ' ', text)
-    
-    # Fix broken sentences (no space after period)
-    text = re.sub(r'\.([A-Z])', '. \\1', text)
-    
-    # Strip leading/trailing whitespace
-    text = text.strip()
-    
-    return text
+    return normalize_text(text)
+
+# Simple patterns for common entity types, compiled once. Each pattern has an
+# optional literal that must occur in the text for the pattern to match at all,
+# which lets most pages skip most scans.
+ENTITY_PATTERNS = [
+    ('email', re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'), '@'),
+    ('phone', re.compile(r'\b(\+\d{1,2}\s)?\(?\d{3}\)?[\s.-]\d{3}[\s.-]\d{4}\b'), None),
+    ('url', re.compile(r'https?://[^\s]+'), 'http'),
+    ('date', re.compile(r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b'), None),
+    ('time', re.compile(r'\b\d{1,2}:\d{2}(:\d{2})?\s*([aApP][mM])?\b'), ':'),
+    ('money', re.compile(r'\$\d+(\.\d{2})?'), '$'),
+    ('percentage', re.compile(r'\d+(\.\d+)?\s*%'), '%'),
+    ('address', re.compile(r'\d+\s+[A-Za-z0-9\s,]+(Street|St|Avenue|Ave|Road|Rd|Boulevard|Blvd|Drive|Dr|Lane|Ln|Court|Ct|Way|Place|Pl|Square|Sq)\b'), None),
+]
+ENTITY_PATTERN_MAP = {entity_type: pattern for entity_type, pattern, _ in ENTITY_PATTERNS}
+ADDRESS_PATTERN_IGNORECASE = re.compile(ENTITY_PATTERN_MAP['address'].pattern, re.IGNORECASE)
+
+PUNCTUATION_PATTERN = re.compile(r'[^\w\s]')
+SENTENCE_BOUNDARY_PATTERN = re.compile(r'[.!?]+')
+
+# Question-answer patterns for FAQ extraction
+# Pattern 1: Q: ... A: ...
+QA_PATTERN_PREFIXED = re.compile(r'Q:(.+?)A:(.+?)(?=Q:|$)', re.DOTALL)
+# Pattern 2: Question... Answer...
+QA_PATTERN_QUESTION = re.compile(r'(?:^|\n)(.+\?)\s*(.+?)(?=\n.+\?|$)', re.DOTALL)
 
 class ContentAnalyzer:
     """
     Advanced content analysis to extract structured information from text.
     """
-    def __init__(self):
-        self.common_stop_words = {
-            'a', 'an', 'the', 'and', 'or', 'but', 'is', 'are', 'was', 'were', 
-            'be', 'been', 'being', 'to', 'of', 'for', 'in', 'on', 'at', 'by', 
-            'with', 'about', 'against', 'between', 'into', 'through', 'during', 
-            'before', 'after', 'above', 'below', 'from', 'up', 'down', 'that', 
-            'this', 'these', 'those', 'it', 'they', 'we', 'you', 'he', 'she', 'i'
-        }
+    # Shared with instruction keyword filtering in scrape_content
+    common_stop_words = frozenset({
+        'a', 'an', 'the', 'and', 'or', 'but', 'is', 'are', 'was', 'were', 
+        'be', 'been', 'being', 'to', 'of', 'for', 'in', 'on', 'at', 'by', 
+        'with', 'about', 'against', 'between', 'into', 'through', 'during', 
+        'before', 'after', 'above', 'below', 'from', 'up', 'down', 'that', 
+        'this', 'these', 'those', 'it', 'they', 'we', 'you', 'he', 'she', 'i'
+    })
     
     def extract_entities(self, text):
         """
@@ -324,34 +440,49 @@ class ContentAnalyzer:
             List of extracted entities with type information
         """
         entities = []
+        seen = set()
         
-        # Simple patterns for common entity types
-        patterns = {
-            'email': r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
-            'phone': r'\b(\+\d{1,2}\s)?\(?\d{3}\)?[\s.-]\d{3}[\s.-]\d{4}\b',
-            'url': r'https?://[^\s]+',
-            'date': r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b',
-            'time': r'\b\d{1,2}:\d{2}(:\d{2})?\s*([aApP][mM])?\b',
-            'money': r'\$\d+(\.\d{2})?',
-            'percentage': r'\d+(\.\d+)?\s*%',
-            'address': r'\d+\s+[A-Za-z0-9\s,]+(Street|St|Avenue|Ave|Road|Rd|Boulevard|Blvd|Drive|Dr|Lane|Ln|Court|Ct|Way|Place|Pl|Square|Sq)\b'
-        }
-        
-        for entity_type, pattern in patterns.items():
-            matches = re.findall(pattern, text)
-            for match in matches:
-                if isinstance(match, tuple):  # Some regex captures return tuples
-                    match = ''.join([m for m in match if m])
+        for entity_type, pattern, required in ENTITY_PATTERNS:
+            # Skip the scan entirely when the pattern cannot match
+            if required and required not in text:
+                continue
+            
+            for match in pattern.finditer(text):
+                entity_text = match.group(0)
                 
                 # Avoid duplicates
-                if not any(e['text'] == match for e in entities):
-                    entities.append({
-                        'text': match,
-                        'type': entity_type
-                    })
+                if entity_text in seen:
+                    continue
+                seen.add(entity_text)
+                entities.append({
+                    'text': entity_text,
+                    'type': entity_type
+                })
         
         return entities
     
+    def _tokenize(self, text):
+        """
+        Split text once into the pieces shared by all content metrics.
+        
+        Args:
+            text: Text to tokenize
+            
+        Returns:
+            Tuple of (word count, sentence count, lowercase words without punctuation)
+        """
+        word_count = len(text.split())
+        # Same count as len(re.split(r'[.!?]+', text)) without building the pieces
+        sentence_count = sum(1 for _ in SENTENCE_BOUNDARY_PATTERN.finditer(text)) + 1
+        keyword_words = PUNCTUATION_PATTERN.sub('', text.lower()).split()
+        return word_count, sentence_count, keyword_words
+    
+    def _top_keywords(self, words, top_n):
+        """Count non-stop words and return the most frequent ones."""
+        stop_words = self.common_stop_words
+        word_freq = Counter(word for word in words if len(word) > 2 and word not in stop_words)
+        return [word for word, freq in word_freq.most_common(top_n)]
+    
     def extract_keywords(self, text, top_n=10):
         """
         Extract important keywords from text.
@@ -366,27 +497,30 @@ class ContentAnalyzer:
         """
         if not text:
             return []
-            
-        # Remove punctuation and convert to lowercase
-        text = re.sub(r'[^\w\s]', '', text.lower())
-        
-        # Split into words
-        words = text.split()
-        
-        # Remove common stop words
-        filtered_words = [word for word in words if word not in self.common_stop_words and len(word) > 2]
         
-        # Count word frequencies
-        word_freq = {}
-        for word in filtered_words:
-            if word in word_freq:
-                word_freq[word] += 1
-            else:
-                word_freq[word] = 1
+        # Remove punctuation, convert to lowercase and split into words
+        words = PUNCTUATION_PATTERN.sub('', text.lower()).split()
+        return self._top_keywords(words, top_n)
+    
+    def extract_corpus_keywords(self, texts, top_n=10):
+        """
+        Extract keywords across many pages at once using corpus-level TF-IDF.
+        Terms common to every page of the site are down-weighted, so each page's
+        keywords describe what is specific to it.
         
-        # Get top N keywords
-        sorted_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)
-        return [word for word, freq in sorted_words[:top_n]]
+        Args:
+            texts: Dictionary mapping URLs to text (e.g. scrape_content output), or a list of texts
+            top_n: Number of keywords to return per page and for the whole site
+            
+        Returns:
+            Dictionary with "pages" (keywords per URL or list index) and "site" (corpus keywords)
+        """
+        return tfidf_keywords(texts, top_n=top_n, stop_words=self.common_stop_words)
+    
+    def _reading_time(self, word_count):
+        # Average reading speed: 200-250 words per minute
+        reading_time = round(word_count / 200, 1)
+        return max(0.5, reading_time)  # Minimum 0.5 minutes
     
     def estimate_reading_time(self, text):
         """
@@ -398,10 +532,7 @@ class ContentAnalyzer:
         Returns:
             Estimated reading time in minutes
         """
-        # Average reading speed: 200-250 words per minute
-        word_count = len(text.split())
-        reading_time = round(word_count / 200, 1)
-        return max(0.5, reading_time)  # Minimum 0.5 minutes
+        return self._reading_time(len(text.split()))
     
     def analyze_content(self, text):
         """
@@ -421,17 +552,16 @@ class ContentAnalyzer:
                 'keywords': [],
                 'quality': 'insufficient'
             }
-            
-        # Get basic metrics
-        word_count = len(text.split())
-        sentence_count = len(re.split(r'[.!?]+', text))
+        
+        # Get basic metrics from a single tokenization pass
+        word_count, sentence_count, keyword_words = self._tokenize(text)
         
         # Extract entities and keywords
         entities = self.extract_entities(text)
-        keywords = self.extract_keywords(text)
+        keywords = self._top_keywords(keyword_words, 10)
         
         # Estimate reading time
-        reading_time = self.estimate_reading_time(text)
+        reading_time = self._reading_time(word_count)
         
         # Assess content quality
         avg_sentence_length = word_count / max(1, sentence_count)
@@ -447,6 +577,34 @@ class ContentAnalyzer:
             'avg_sentence_length': round(avg_sentence_length, 1)
         }
     
+    def analyze_batch(self, texts, max_workers=None, executor=None):
+        """
+        Analyze many texts, spreading the work across a process pool.
+        
+        Args:
+            texts: Iterable of texts to analyze
+            max_workers: Number of worker processes (defaults to the CPU count)
+            executor: Optional existing concurrent.futures executor to reuse
+            
+        Returns:
+            List of analysis results in the same order as the texts
+        """
+        texts = list(texts)
+        
+        # Pool start-up costs more than analyzing a single text
+        if executor is None and (len(texts) < 2 or max_workers == 1):
+            return [self.analyze_content(text) for text in texts]
+        
+        workers = max_workers or os.cpu_count() or 1
+        chunksize = max(1, len(texts) // (workers * 4))
+        
+        if executor is not None:
+            return list(executor.map(self.analyze_content, texts, chunksize=chunksize))
+        
+        logger.debug(f"Analyzing {len(texts)} texts with {workers} worker processes")
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(self.analyze_content, texts, chunksize=chunksize))
+    
     def extract_faq(self, text):
         """
         Attempt to extract FAQ-like question-answer pairs from text.
@@ -459,15 +617,8 @@ class ContentAnalyzer:
         """
         faqs = []
         
-        # Look for question-answer patterns
-        # Pattern 1: Q: ... A: ...
-        qa_pattern1 = re.compile(r'Q:(.+?)A:(.+?)(?=Q:|$)', re.DOTALL)
-        
-        # Pattern 2: Question... Answer...
-        qa_pattern2 = re.compile(r'(?:^|\n)(.+\?)\s*(.+?)(?=\n.+\?|$)', re.DOTALL)
-        
         # Try the first pattern
-        matches = qa_pattern1.findall(text)
+        matches = QA_PATTERN_PREFIXED.findall(text)
         if matches:
             for q, a in matches:
                 faqs.append({
@@ -477,7 +628,7 @@ class ContentAnalyzer:
         
         # If no matches with first pattern, try the second
         if not faqs:
-            matches = qa_pattern2.findall(text)
+            matches = QA_PATTERN_QUESTION.findall(text)
             if matches:
                 for q, a in matches:
                     # Filter out false positives (too short answers)
@@ -506,15 +657,13 @@ class ContentAnalyzer:
         }
         
         # Extract emails
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        contact_info['emails'] = re.findall(email_pattern, text)
+        if '@' in text:
+            contact_info['emails'] = ENTITY_PATTERN_MAP['email'].findall(text)
         
         # Extract phone numbers
-        phone_pattern = r'\b(\+\d{1,2}\s)?\(?\d{3}\)?[\s.-]\d{3}[\s.-]\d{4}\b'
-        contact_info['phones'] = re.findall(phone_pattern, text)
+        contact_info['phones'] = [m.group(0) for m in ENTITY_PATTERN_MAP['phone'].finditer(text)]
         
         # Extract addresses
-        address_pattern = r'\d+\s+[A-Za-z0-9\s,]+(Street|St|Avenue|Ave|Road|Rd|Boulevard|Blvd|Drive|Dr|Lane|Ln|Court|Ct|Way|Place|Pl|Square|Sq)\b'
-        contact_info['addresses'] = re.findall(address_pattern, text, re.IGNORECASE)
+        contact_info['addresses'] = [m.group(0) for m in ADDRESS_PATTERN_IGNORECASE.finditer(text)]
         
         return contact_info
@@ -0,0 +1,330 @@
+import itertools
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from .job_queue import JobQueue, STATUSES, DONE, FAILED
+from .logger import logger
+
+# Per-job settings accepted by the API and passed on to RufusClient.scrape
+JOB_OPTIONS = ("max_depth", "max_pages")
+
+
+def run_worker(db_path, client_options, name, threads=2, poll_interval=0.5, stop=None, wakeup=None):
+    """
+    Run a warm worker: one RufusClient serving queued jobs until stopped.
+
+    The client, with its extraction and response caches, the pooled NIM
+    connection, and the HTTP and browser pools from shared_crawlers(), lives
+    as long as the worker, so a job only pays for its own crawl and synthesis.
+    A job's artifacts are saved under its ID.
+
+    Args:
+        db_path: Path of the job queue database
+        client_options: Keyword arguments for RufusClient
+        name: Worker name recorded on the jobs it runs
+        threads: Jobs run at once by this worker
+        poll_interval: Seconds between queue checks when idle
+        stop: Event that stops the worker after its running jobs finish
+        wakeup: Event set when a job is submitted, so idle workers claim it at once
+    """
+    from .client import RufusClient
+
+    stop = stop or threading.Event()
+    jobs = JobQueue(db_path)
+    client = RufusClient(**client_options)
+    slots = threading.BoundedSemaphore(threads)
+    logger.info(f"Scrape worker {name} ready with {threads} threads")
+
+    def run(job, new_crawler):
+        try:
+            options = job["options"]
+            document = client.scrape(job["url"], job["instructions"], options.get("max_depth"),
+                                     options.get("max_pages"), crawler=new_crawler(), job_id=job["id"])
+            if isinstance(document, dict) and "error" in document:
+                jobs.fail(job["id"], str(document["error"]), result=document)
+            else:
+                jobs.complete(job["id"], document)
+            logger.info(f"Worker {name} finished job {job['id']}")
+        except Exception as e:
+            logger.error(f"Job {job['id']} for {job['url']} failed: {str(e)}", exc_info=True)
+            jobs.fail(job["id"], str(e))
+        finally:
+            slots.release()
+
+    try:
+        with client.shared_crawlers(threads) as new_crawler, \
+                ThreadPoolExecutor(max_workers=threads, thread_name_prefix=f"rufus-{name}") as executor:
+            while not stop.is_set():
+                if not slots.acquire(timeout=poll_interval):
+                    continue
+                job = jobs.claim(name)
+                if job is None:
+                    slots.release()
+                    if wakeup is not None and wakeup.wait(poll_interval):
+                        wakeup.clear()
+                    elif wakeup is None:
+                        stop.wait(poll_interval)
+                    continue
+                executor.submit(run, job, new_crawler)
+    finally:
+        client.close()
+        jobs.close()
+        logger.info(f"Scrape worker {name} stopped")
+
+
+class ScrapeService:
+    """
+    Long-running local scrape service.
+
+    Jobs are submitted over a small HTTP/JSON API and stored in a SQLite
+    queue, so they survive restarts. Warm workers (processes by default,
+    each with its own RufusClient) claim and run them, and clients poll for
+    the status and fetch the result. A monitor thread replaces workers that
+    die and requeues the jobs they were running:
+
+        POST /jobs               {"url": ..., "instructions": ..., "max_depth": ..., "max_pages": ...}
+        GET  /jobs?status=&limit=  recent jobs
+        GET  /jobs/<id>          job status
+        GET  /jobs/<id>/result   result document (202 while the job is pending)
+        GET  /health             workers and queue counts (503 while fewer workers than configured are alive)
+    """
+    def __init__(self, db_path="rufus_jobs.db", host="127.0.0.1", port=8765, workers=2, threads_per_worker=2,
+                 client_options=None, processes=True, poll_interval=0.5, monitor_interval=1.0, max_attempts=3):
+        """
+        Initialize the service.
+
+        Args:
+            db_path: Path of the SQLite job queue
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free port)
+            workers: Number of warm workers
+            threads_per_worker: Jobs each worker runs at once
+            client_options: Keyword arguments for each worker's RufusClient
+            processes: Whether workers are processes (True) or threads in this process
+            poll_interval: Seconds between queue checks of an idle worker
+            monitor_interval: Seconds between checks for dead workers
+            max_attempts: Runs of a job cut off by a dead worker before it is failed instead of requeued
+        """
+        self.db_path = db_path
+        self.workers = workers
+        self.threads_per_worker = threads_per_worker
+        self.client_options = dict(client_options or {})
+        self.processes = processes
+        self.poll_interval = poll_interval
+        self.monitor_interval = monitor_interval
+        self.max_attempts = max_attempts
+        self.jobs = JobQueue(db_path)
+        self._context = multiprocessing.get_context("spawn")
+        self._stop = self._context.Event() if processes else threading.Event()
+        self._wakeup = self._context.Event() if processes else threading.Event()
+        # Live workers by name; names are never reused, so a job's worker column identifies one worker
+        self._workers = {}
+        self._worker_ids = itertools.count()
+        self._monitor = None
+        self._thread = None
+
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+
+    @property
+    def base_url(self):
+        """Base URL of the API."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Start the workers and serve the API in a background thread."""
+        self._start_workers()
+        self._thread = threading.Thread(target=self._server.serve_forever, name="rufus-service", daemon=True)
+        self._thread.start()
+        logger.info(f"Rufus scrape service listening on {self.base_url}")
+        return self
+
+    def serve_forever(self):
+        """Start the workers and serve the API in the calling thread until interrupted."""
+        self._start_workers()
+        logger.info(f"Rufus scrape service listening on {self.base_url}")
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._server.server_close()
+            self._stop_workers()
+            self.jobs.close()
+
+    def stop(self):
+        """Stop serving, let the workers finish their running jobs, and close the queue."""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._stop_workers()
+        self.jobs.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def submit(self, url, instructions="", **options):
+        """
+        Queue a job directly, without going through HTTP.
+
+        Returns:
+            ID of the new job
+        """
+        job_id = self.jobs.submit(url, instructions, {key: options[key] for key in JOB_OPTIONS if key in options})
+        self._wakeup.set()
+        return job_id
+
+    def health(self):
+        """Return the number of live workers and the queue counts, degraded while workers are missing."""
+        alive = sum(1 for worker in list(self._workers.values()) if worker.is_alive())
+        return {"status": "ok" if alive >= self.workers else "degraded", "workers": alive,
+                "configured_workers": self.workers, "jobs": self.jobs.counts()}
+
+    def _start_workers(self):
+        if self.jobs.closed:
+            self.jobs = JobQueue(self.db_path)
+        # Jobs left running when the service last stopped are run again
+        self.jobs.requeue_running(max_attempts=self.max_attempts)
+        self._stop.clear()
+        for _ in range(self.workers):
+            self._spawn_worker()
+        self._monitor = threading.Thread(target=self._monitor_workers, name="rufus-service-monitor", daemon=True)
+        self._monitor.start()
+
+    def _spawn_worker(self):
+        name = f"worker-{os.getpid()}-{next(self._worker_ids)}"
+        args = (self.db_path, self.client_options, name, self.threads_per_worker, self.poll_interval,
+                self._stop, self._wakeup)
+        if self.processes:
+            # Not daemonic: a worker runs its own extraction watchdog process
+            worker = self._context.Process(target=run_worker, args=args, name=f"rufus-{name}")
+        else:
+            worker = threading.Thread(target=run_worker, args=args, name=f"rufus-{name}", daemon=True)
+        worker.start()
+        self._workers[name] = worker
+
+    def _monitor_workers(self):
+        while not self._stop.wait(self.monitor_interval):
+            self._replace_dead_workers()
+
+    def _replace_dead_workers(self):
+        for name, worker in list(self._workers.items()):
+            if worker.is_alive() or self._stop.is_set():
+                continue
+            exitcode = getattr(worker, "exitcode", None)
+            logger.warning(f"Worker {worker.name} died (exit code {exitcode}); starting a new one")
+            del self._workers[name]
+            # Only the dead worker's jobs go back in the queue; the others are still running theirs
+            self.jobs.requeue_running(worker=name, max_attempts=self.max_attempts)
+            self._spawn_worker()
+
+    def _stop_workers(self, timeout=60):
+        self._stop.set()
+        if self._monitor is not None:
+            self._monitor.join()
+            self._monitor = None
+        deadline = time.monotonic() + timeout
+        for name, worker in self._workers.items():
+            worker.join(max(0, deadline - time.monotonic()))
+            if worker.is_alive():
+                if not self.processes:
+                    # A thread cannot be stopped, so its jobs are still running and stay claimed by it
+                    logger.warning(f"Worker {worker.name} did not stop in time; leaving its running jobs to it")
+                    continue
+                logger.warning(f"Worker {worker.name} did not stop in time; terminating it")
+                worker.terminate()
+                worker.join()
+            # Jobs cut off by a terminated or dead worker go back in the queue
+            self.jobs.requeue_running(worker=name, max_attempts=self.max_attempts)
+        self._workers = {}
+
+    def _handler_class(self):
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                logger.debug(f"Rufus service: {format % args}")
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                parts = [part for part in parsed.path.split("/") if part]
+
+                if parts == ["health"]:
+                    health = service.health()
+                    self._send_json(200 if health["status"] == "ok" else 503, health)
+                elif parts == ["jobs"]:
+                    query = parse_qs(parsed.query)
+                    status = query.get("status", [None])[0]
+                    if status is not None and status not in STATUSES:
+                        self._send_json(400, {"error": f"Unknown status: {status}"})
+                        return
+                    try:
+                        limit = int(query.get("limit", ["100"])[0])
+                    except ValueError:
+                        self._send_json(400, {"error": "limit must be an integer"})
+                        return
+                    self._send_json(200, {"jobs": service.jobs.list(status=status, limit=limit)})
+                elif len(parts) == 2 and parts[0] == "jobs":
+                    job = service.jobs.get(parts[1], include_result=False)
+                    if job is None:
+                        self._send_json(404, {"error": "No such job"})
+                    else:
+                        self._send_json(200, job)
+                elif len(parts) == 3 and parts[0] == "jobs" and parts[2] == "result":
+                    self._send_result(parts[1])
+                else:
+                    self._send_json(404, {"error": "Not found"})
+
+            def do_POST(self):
+                if urlparse(self.path).path.rstrip("/") != "/jobs":
+                    self._send_json(404, {"error": "Not found"})
+                    return
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    self._send_json(400, {"error": "Invalid JSON body"})
+                    return
+                if not isinstance(body, dict) or not body.get("url"):
+                    self._send_json(400, {"error": "A job needs a url"})
+                    return
+                options = {key: body[key] for key in JOB_OPTIONS if body.get(key) is not None}
+                job_id = service.submit(body["url"], body.get("instructions", ""), **options)
+                self._send_json(202, {"id": job_id, "status": "queued"},
+                                headers={"Location": f"/jobs/{job_id}"})
+
+            def _send_result(self, job_id):
+                job = service.jobs.get(job_id)
+                if job is None:
+                    self._send_json(404, {"error": "No such job"})
+                elif job["status"] == DONE:
+                    self._send_json(200, job["result"])
+                elif job["status"] == FAILED:
+                    self._send_json(500, {"error": job["error"], "result": job["result"]})
+                else:
+                    self._send_json(202, {"id": job_id, "status": job["status"]})
+
+            def _send_json(self, status, body, headers=None):
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+        return Handler
@@ -0,0 +1,281 @@
+import re
+import threading
+from collections import Counter
+from urllib.parse import urlparse
+from logger import logger
+from extractor_stats import url_pattern
+from text_normalizer import normalize_text
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:
+    logger.warning("lxml not available. Site template learning will be disabled.")
+    lxml = None
+    etree = None
+
+# Elements that can hold the main content of a page
+CONTAINER_TAGS = ('body', 'main', 'article', 'section', 'div', 'td')
+# Elements whose text is compared across pages to find repeated blocks
+BLOCK_TAGS = ('div', 'section', 'aside', 'nav', 'header', 'footer', 'form', 'ul', 'ol', 'p', 'table')
+# Elements that never belong to the main content
+STRIP_TAGS = ('script', 'style', 'noscript', 'nav', 'footer', 'aside', 'form', 'iframe')
+# Repeated blocks longer than this are treated as content, not boilerplate
+MAX_BOILERPLATE_CHARS = 400
+
+WORD_PATTERN = re.compile(r'\w+')
+DIGITS_PATTERN = re.compile(r'\d')
+
+
+def _element_text(element):
+    return ' '.join(part.strip() for part in element.itertext() if part.strip())
+
+
+def _class_tokens(element):
+    # Classes with digits ("post-1234") change from page to page and make poor selectors
+    return sorted(token for token in (element.get('class') or '').split()
+                  if "'" not in token and not DIGITS_PATTERN.search(token))[:2]
+
+
+def element_selector(element):
+    """
+    Build an XPath selector for an element that also matches it on sibling pages.
+
+    The path is anchored at the nearest ancestor with a stable id and uses tag
+    names and stable class names, but no positions, so it survives pages with
+    a different number of paragraphs or sidebar widgets.
+
+    Args:
+        element: lxml element
+
+    Returns:
+        XPath expression string
+    """
+    steps = []
+    while element is not None and isinstance(element.tag, str) and element.tag != 'html':
+        element_id = element.get('id')
+        if element_id and "'" not in element_id and not DIGITS_PATTERN.search(element_id):
+            steps.append(f"{element.tag}[@id='{element_id}']")
+            return '//' + '/'.join(reversed(steps))
+
+        step = element.tag
+        for token in _class_tokens(element):
+            step += f"[contains(concat(' ', normalize-space(@class), ' '), ' {token} ')]"
+        steps.append(step)
+        element = element.getparent()
+
+    return '/html/' + '/'.join(reversed(steps))
+
+
+class SiteTemplate:
+    """Learned layout of one site section: where the content lives and which blocks repeat."""
+    def __init__(self, selector, boilerplate):
+        self.selector = selector
+        self.xpath = etree.XPath(selector)
+        self.boilerplate = frozenset(boilerplate)
+        self.hits = 0
+        self.misses = 0
+        self.consecutive_misses = 0
+
+
+class SiteTemplateLearner:
+    """
+    Learns a cheap extraction template for each site section.
+
+    The first pages of a domain and URL pattern go through the full extractor
+    cascade. For each of them the learner finds the DOM element that best
+    matches the extracted text and the short text blocks inside it. Once the
+    same selector wins on enough pages, later pages are extracted with a
+    single XPath lookup, and blocks that repeated on most learning pages
+    (share buttons, "related posts", newsletter boxes) are dropped. Pages
+    where the template does not match fall back to the cascade, and a
+    template that keeps missing is forgotten and learned again.
+    """
+    def __init__(self, min_pages=3, max_learning_pages=10, agreement=0.6,
+                 boilerplate_ratio=0.6, min_length=50, max_misses=3, enabled=True):
+        """
+        Initialize the learner.
+
+        Args:
+            min_pages: Pages to observe before a template may be used
+            max_learning_pages: Pages after which a section without a stable layout is left alone
+            agreement: Fraction of observed pages on which the selector must win
+            boilerplate_ratio: Fraction of observed pages a block must appear on to count as boilerplate
+            min_length: Minimum text length for a template extraction to count as a success
+            max_misses: Consecutive misses after which a template is relearned
+            enabled: Whether to learn and use templates at all
+        """
+        self.enabled = enabled and lxml is not None
+        self.min_pages = min_pages
+        self.max_learning_pages = max_learning_pages
+        self.agreement = agreement
+        self.boilerplate_ratio = boilerplate_ratio
+        self.min_length = min_length
+        self.max_misses = max_misses
+        self._lock = threading.Lock()
+        # {scope: {"selectors": Counter, "blocks": Counter, "pages": int}}
+        self._learning = {}
+        # {scope: SiteTemplate, or None for sections without a stable layout}
+        self._templates = {}
+
+    @staticmethod
+    def _scope(url):
+        return f"{urlparse(url).netloc.lower()}{url_pattern(url)}"
+
+    def template_for(self, url):
+        """Return the learned template for a URL, or None."""
+        if not self.enabled:
+            return None
+        return self._templates.get(self._scope(url))
+
+    def is_learning(self, url):
+        """Check whether pages from this URL's section should still be observed."""
+        return self.enabled and self._scope(url) not in self._templates
+
+    def observe(self, url, html, extracted_text):
+        """
+        Learn from a page that the extractor cascade handled.
+
+        Args:
+            url: URL of the page
+            html: HTML content of the page
+            extracted_text: Text the cascade extracted from the page
+        """
+        if not extracted_text or not self.is_learning(url):
+            return
+
+        try:
+            root = lxml.html.fromstring(html)
+        except Exception as e:
+            logger.debug(f"Could not parse {url} for template learning: {str(e)}")
+            return
+
+        etree.strip_elements(root, etree.Comment, *STRIP_TAGS, with_tail=False)
+        main = self._best_element(root, extracted_text)
+        if main is None:
+            return
+
+        selector = element_selector(main)
+        blocks = set()
+        for block in main.iter(*BLOCK_TAGS):
+            text = _element_text(block)
+            if text and len(text) <= MAX_BOILERPLATE_CHARS:
+                blocks.add(text)
+
+        scope = self._scope(url)
+        with self._lock:
+            if scope in self._templates:
+                return
+            learning = self._learning.setdefault(
+                scope, {"selectors": Counter(), "blocks": Counter(), "pages": 0}
+            )
+            learning["selectors"][selector] += 1
+            learning["blocks"].update(blocks)
+            learning["pages"] += 1
+            self._maybe_finish(scope, learning)
+
+    def _maybe_finish(self, scope, learning):
+        pages = learning["pages"]
+        if pages < self.min_pages:
+            return
+
+        selector, count = learning["selectors"].most_common(1)[0]
+        if count / pages >= self.agreement:
+            needed = max(2, self.boilerplate_ratio * pages)
+            boilerplate = [text for text, seen in learning["blocks"].items() if seen >= needed]
+            self._templates[scope] = SiteTemplate(selector, boilerplate)
+            del self._learning[scope]
+            logger.info(f"Learned site template for {scope}: {selector} "
+                        f"({len(boilerplate)} boilerplate blocks)")
+        elif pages >= self.max_learning_pages:
+            self._templates[scope] = None
+            del self._learning[scope]
+            logger.debug(f"No stable layout found for {scope} after {pages} pages")
+
+    @staticmethod
+    def _best_element(root, extracted_text):
+        # The element whose words best cover the extracted text without adding much else
+        target = set(WORD_PATTERN.findall(extracted_text.lower()))
+        if not target:
+            return None
+
+        best, best_score = None, 0.0
+        for element in root.iter(*CONTAINER_TAGS):
+            words = set(WORD_PATTERN.findall(_element_text(element).lower()))
+            overlap = len(words & target)
+            if not overlap:
+                continue
+            precision = overlap / len(words)
+            recall = overlap / len(target)
+            score = 2 * precision * recall / (precision + recall)
+            # Ties go to the deeper element, which is visited later
+            if score >= best_score:
+                best, best_score = element, score
+        return best
+
+    def extract(self, url, html):
+        """
+        Extract the main content of a page with the learned template.
+
+        Args:
+            url: URL of the page
+            html: HTML content of the page
+
+        Returns:
+            Normalized main-content text, or None when there is no template or it does not match
+        """
+        if not self.enabled:
+            return None
+
+        scope = self._scope(url)
+        template = self._templates.get(scope)
+        if template is None:
+            return None
+
+        text = None
+        try:
+            root = lxml.html.fromstring(html)
+            matches = template.xpath(root)
+            if matches:
+                text = self._template_text(template, max(matches, key=lambda m: len(m.text_content())))
+        except Exception as e:
+            logger.debug(f"Template extraction failed for {url}: {str(e)}")
+
+        success = bool(text) and len(text) > self.min_length
+        with self._lock:
+            if success:
+                template.hits += 1
+                template.consecutive_misses = 0
+            else:
+                template.misses += 1
+                template.consecutive_misses += 1
+                if template.consecutive_misses >= self.max_misses and self._templates.get(scope) is template:
+                    # The layout changed or the section is not uniform after all
+                    del self._templates[scope]
+                    logger.info(f"Forgetting site template for {scope} after {template.misses} misses")
+
+        return text if success else None
+
+    @staticmethod
+    def _template_text(template, main):
+        etree.strip_elements(main, etree.Comment, *STRIP_TAGS, with_tail=False)
+        if template.boilerplate:
+            repeated = [block for block in main.iter(*BLOCK_TAGS)
+                        if block is not main and _element_text(block) in template.boilerplate]
+            for block in repeated:
+                block.drop_tree()
+        return normalize_text(_element_text(main))
+
+    def summary(self):
+        """
+        Describe the learned templates.
+
+        Returns:
+            Dictionary mapping each section to its selector and hit/miss counts
+        """
+        with self._lock:
+            return {
+                scope: {"selector": template.selector, "boilerplate_blocks": len(template.boilerplate),
+                        "hits": template.hits, "misses": template.misses}
+                for scope, template in self._templates.items() if template is not None
+            }
@@ -0,0 +1,183 @@
+import json
+from logger import logger
+
+THINK_OPEN = "<think>"
+THINK_CLOSE = "</think>"
+WHITESPACE = " \t\r\n"
+
+
+def _partial_suffix(text, tag):
+    # Length of the longest end of text that could be the start of tag
+    for length in range(min(len(tag) - 1, len(text)), 0, -1):
+        if text.endswith(tag[:length]):
+            return length
+    return 0
+
+
+class ThinkStripper:
+    """
+    Removes <think>...</think> blocks from streamed text as it arrives.
+
+    Tags split across chunks are held back until the next chunk shows
+    whether they really are tags.
+    """
+    def __init__(self):
+        self._inside = False
+        self._pending = ""
+
+    def feed(self, text):
+        """
+        Process the next chunk of the stream.
+
+        Args:
+            text: Chunk of model output
+
+        Returns:
+            Visible text from this chunk, with reasoning removed
+        """
+        text = self._pending + text
+        self._pending = ""
+        visible = []
+
+        while text:
+            tag = THINK_CLOSE if self._inside else THINK_OPEN
+            position = text.find(tag)
+            if position >= 0:
+                if not self._inside:
+                    visible.append(text[:position])
+                text = text[position + len(tag):]
+                self._inside = not self._inside
+                continue
+
+            keep = _partial_suffix(text, tag)
+            if not self._inside:
+                visible.append(text[:len(text) - keep])
+            self._pending = text[len(text) - keep:]
+            break
+
+        return "".join(visible)
+
+    def finish(self):
+        """Return text held back at the end of the stream."""
+        remaining = "" if self._inside else self._pending
+        self._pending = ""
+        return remaining
+
+
+class IncrementalJSONParser:
+    """
+    Parses the top-level fields of a JSON object while it is still being streamed.
+
+    Text before the opening brace (such as a ```json fence) and after the
+    closing brace is ignored. Each top-level field is reported as soon as its
+    value is complete, so "title" is available long before "content_sections"
+    has finished streaming.
+    """
+    def __init__(self):
+        self.document = {}
+        self.done = False
+        self._text = ""
+        self._position = 0
+        self._root_start = None
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._string_start = None
+        self._key = None
+        self._awaiting_value = False
+        self._value_start = None
+
+    def feed(self, text):
+        """
+        Process the next chunk of the JSON text.
+
+        Args:
+            text: Chunk of visible model output
+
+        Returns:
+            List of (key, value) pairs for the fields completed by this chunk
+        """
+        if self.done or not text:
+            return []
+
+        self._text += text
+        completed = []
+        text = self._text
+        i = self._position
+
+        while i < len(text):
+            char = text[i]
+
+            if self._root_start is None:
+                if char == "{":
+                    self._root_start = i
+                    self._depth = 1
+                i += 1
+                continue
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1 and not self._awaiting_value:
+                        self._key = self._load(text[self._string_start:i + 1])
+                i += 1
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = i
+                self._start_value(i)
+            elif char in "{[":
+                self._start_value(i)
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._finish_value(text, i, completed)
+                    self.done = True
+                    self._position = i + 1
+                    return completed
+            elif self._depth == 1 and char == ":":
+                self._awaiting_value = True
+                self._value_start = None
+            elif self._depth == 1 and char == ",":
+                self._finish_value(text, i, completed)
+            elif char not in WHITESPACE:
+                self._start_value(i)
+            i += 1
+
+        self._position = i
+        return completed
+
+    def _start_value(self, position):
+        if self._depth == 1 and self._awaiting_value and self._value_start is None:
+            self._value_start = position
+
+    def _finish_value(self, text, end, completed):
+        if self._awaiting_value and self._value_start is not None and self._key is not None:
+            value = self._load(text[self._value_start:end].strip())
+            if value is not None or text[self._value_start:end].strip() == "null":
+                self.document[self._key] = value
+                completed.append((self._key, value))
+        self._awaiting_value = False
+        self._value_start = None
+        self._key = None
+
+    @staticmethod
+    def _load(fragment):
+        try:
+            return json.loads(fragment)
+        except ValueError:
+            logger.debug(f"Could not parse streamed JSON fragment: {fragment[:80]}")
+            return None
+
+    def text(self):
+        """Return the JSON text from the opening brace onwards."""
+        if self._root_start is None:
+            return ""
+        end = self._position if self.done else len(self._text)
+        return self._text[self._root_start:end]
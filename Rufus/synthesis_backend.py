@@ -0,0 +1,331 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from logger import logger
+from rate_limiter import TokenRateLimiter
+from utils import estimate_tokens, optional_import
+
+HTTPX_MISSING = "httpx not available. The synthesis backend will use the OpenAI client's default connection pool."
+
+NIM_BASE_URL = "https://integrate.api.nvidia.com/v1"
+
+# HTTP statuses worth retrying: rate limiting and transient server errors
+RETRYABLE_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+
+
+def resolve_base_url(base_url=None):
+    """
+    Pick the API base URL.
+
+    Args:
+        base_url: Explicit base URL, if any
+
+    Returns:
+        base_url, else the NVIDIA_NIM_BASE_URL environment variable, else the NIM endpoint
+    """
+    return base_url or os.getenv("NVIDIA_NIM_BASE_URL") or NIM_BASE_URL
+
+
+def retry_after(error):
+    """
+    Read the delay requested by the server from an API error.
+
+    Args:
+        error: Exception raised by the OpenAI client
+
+    Returns:
+        Delay in seconds from the Retry-After (or retry-after-ms) header, or None if there is none
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    milliseconds = headers.get("retry-after-ms")
+    if milliseconds:
+        try:
+            return max(0.0, float(milliseconds) / 1000)
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    # Retry-After may also be an HTTP date
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class SynthesisBackend:
+    """
+    Long-lived connection to the NIM API shared by every synthesis call.
+
+    One OpenAI client with a pooled HTTP transport is reused, so calls do not
+    pay for new connections. Concurrent calls are capped, requests and tokens
+    are limited per minute to stay inside the NIM quota, and rate-limited or
+    failed calls are retried, honoring Retry-After. A 429 pauses every caller
+    so parallel scrapes back off together instead of retrying in a storm.
+    """
+    def __init__(self, api_key=None, base_url=None, max_concurrency=4, requests_per_minute=40,
+                 tokens_per_minute=None, max_retries=5, base_delay=2.0, max_delay=60.0, timeout=300.0,
+                 expected_output_tokens=2048, client=None, async_client=None):
+        """
+        Initialize the backend.
+
+        Args:
+            api_key: NVIDIA NIM API key
+            base_url: Base URL of the OpenAI-compatible API (defaults to NVIDIA_NIM_BASE_URL or the NIM endpoint)
+            max_concurrency: Maximum number of calls in flight at once
+            requests_per_minute: Maximum requests per minute, or None for no limit
+            tokens_per_minute: Maximum prompt and completion tokens per minute, or None for no limit
+            max_retries: Maximum retries of a failed call
+            base_delay: Initial backoff delay in seconds when the server gives no Retry-After
+            max_delay: Maximum delay between retries in seconds
+            timeout: Timeout of one API call in seconds
+            expected_output_tokens: Completion tokens reserved per call before the real usage is known
+            client: Existing OpenAI-compatible client to use instead of creating one
+            async_client: Existing AsyncOpenAI-compatible client to use instead of creating one
+        """
+        self.api_key = api_key
+        self.base_url = resolve_base_url(base_url)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.expected_output_tokens = expected_output_tokens
+        self.limiter = TokenRateLimiter(requests_per_minute, tokens_per_minute)
+        self.retries = 0
+        self._client = client
+        self._http_client = None
+        self._client_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._async_client = async_client
+        self._async_http_client = None
+        self._async_slots = None
+
+    @property
+    def client(self):
+        """OpenAI client, created on first use."""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = self._create_client()
+        return self._client
+
+    def _create_client(self):
+        # openai is imported with the first client, not at startup
+        from openai import OpenAI
+        logger.debug(f"Initializing pooled OpenAI client for {self.base_url}")
+        options = {}
+        httpx = optional_import("httpx", HTTPX_MISSING)
+        if httpx is not None:
+            self._http_client = httpx.Client(
+                limits=httpx.Limits(max_connections=self.max_concurrency * 2,
+                                    max_keepalive_connections=self.max_concurrency),
+                timeout=self.timeout
+            )
+            options["http_client"] = self._http_client
+        # Retries are handled here, so they can share the rate limiter and back off together
+        return OpenAI(base_url=self.base_url, api_key=self.api_key, max_retries=0, timeout=self.timeout,
+                      **options)
+
+    def estimate_request_tokens(self, request):
+        """
+        Estimate the tokens a request will use, prompt and completion.
+
+        Args:
+            request: Chat completion parameters
+
+        Returns:
+            Estimated token count
+        """
+        prompt = sum(estimate_tokens(message.get("content") or "") for message in request.get("messages", []))
+        return prompt + request.get("max_tokens", self.expected_output_tokens)
+
+    def complete(self, request):
+        """
+        Send a chat completion request.
+
+        Args:
+            request: Chat completion parameters (model, messages, temperature, ...)
+
+        Returns:
+            Response text, or None if the response had no choices
+        """
+        with self._slots:
+            response, reserved = self._create(request)
+
+        usage = getattr(response, "usage", None)
+        self.limiter.record_usage(reserved, getattr(usage, "total_tokens", None))
+
+        if response.choices and len(response.choices) > 0:
+            return response.choices[0].message.content
+        return None
+
+    def stream(self, request):
+        """
+        Send a chat completion request and stream the response.
+
+        Only opening the stream is retried; an error after text has arrived is raised.
+
+        Args:
+            request: Chat completion parameters (model, messages, temperature, ...)
+
+        Yields:
+            Chunks of response text
+        """
+        with self._slots:
+            response, _ = self._create(dict(request, stream=True))
+            for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+    def close(self):
+        """Close the pooled HTTP connections."""
+        with self._client_lock:
+            if self._http_client is not None:
+                self._http_client.close()
+                self._http_client = None
+                self._client = None
+
+    def _create(self, request):
+        tokens = self.estimate_request_tokens(request)
+        attempt = 0
+        while True:
+            reserved = self.limiter.acquire(tokens)
+            try:
+                return self.client.chat.completions.create(**request), reserved
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+                if delay:
+                    time.sleep(delay)
+                attempt += 1
+
+    def _retry_delay(self, error, attempt):
+        # Raise the error if it should not be retried; otherwise return how long this caller must sleep
+        if attempt >= self.max_retries or not self._is_retryable(error):
+            raise error
+
+        delay = retry_after(error)
+        if delay is None:
+            delay = self.base_delay * (2 ** attempt) + random.uniform(0, 1)
+        delay = min(delay, self.max_delay)
+        self.retries += 1
+        if getattr(error, "status_code", None) == 429:
+            # Everyone sharing the quota waits, not just this call
+            self.limiter.pause(delay)
+            return 0
+        logger.warning(f"NIM API call failed ({str(error)}). Retrying in {delay:.2f} seconds")
+        return delay
+
+    @property
+    def async_client(self):
+        """AsyncOpenAI client, created on first use. It belongs to the event loop that first uses it."""
+        if self._async_client is None:
+            self._async_client = self._create_async_client()
+        return self._async_client
+
+    def _create_async_client(self):
+        from openai import AsyncOpenAI
+        logger.debug(f"Initializing pooled AsyncOpenAI client for {self.base_url}")
+        options = {}
+        httpx = optional_import("httpx", HTTPX_MISSING)
+        if httpx is not None:
+            self._async_http_client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=self.max_concurrency * 2,
+                                    max_keepalive_connections=self.max_concurrency),
+                timeout=self.timeout
+            )
+            options["http_client"] = self._async_http_client
+        return AsyncOpenAI(base_url=self.base_url, api_key=self.api_key, max_retries=0, timeout=self.timeout,
+                           **options)
+
+    async def acomplete(self, request):
+        """
+        Send a chat completion request without blocking the event loop.
+
+        Shares the rate limits of complete(); cancelling the awaiting task
+        abandons the call, including any wait for the rate limiter or a retry.
+
+        Args:
+            request: Chat completion parameters (model, messages, temperature, ...)
+
+        Returns:
+            Response text, or None if the response had no choices
+        """
+        if self._async_slots is None:
+            self._async_slots = asyncio.Semaphore(self.max_concurrency)
+
+        tokens = self.estimate_request_tokens(request)
+        attempt = 0
+        async with self._async_slots:
+            while True:
+                reserved = await self.limiter.acquire_async(tokens)
+                try:
+                    response = await self.async_client.chat.completions.create(**request)
+                    break
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    delay = self._retry_delay(e, attempt)
+                    if delay:
+                        await asyncio.sleep(delay)
+                    attempt += 1
+
+        usage = getattr(response, "usage", None)
+        self.limiter.record_usage(reserved, getattr(usage, "total_tokens", None))
+
+        if response.choices and len(response.choices) > 0:
+            return response.choices[0].message.content
+        return None
+
+    async def aclose(self):
+        """Close the pooled async HTTP connections."""
+        if self._async_http_client is not None:
+            await self._async_http_client.aclose()
+        elif self._async_client is not None:
+            await self._async_client.close()
+        self._async_http_client = None
+        self._async_client = None
+        self._async_slots = None
+
+    @staticmethod
+    def _is_retryable(error):
+        from openai import APIConnectionError, APITimeoutError
+        if isinstance(error, (APIConnectionError, APITimeoutError)):
+            return True
+        return getattr(error, "status_code", None) in RETRYABLE_STATUSES
+
+
+_shared_backends = {}
+_shared_lock = threading.Lock()
+
+
+def get_backend(api_key, base_url=None):
+    """
+    Return the backend shared by callers that do not own one, creating it on first use.
+
+    Args:
+        api_key: NVIDIA NIM API key
+        base_url: Base URL of the OpenAI-compatible API (defaults to NVIDIA_NIM_BASE_URL or the NIM endpoint)
+
+    Returns:
+        SynthesisBackend for this key and URL
+    """
+    base_url = resolve_base_url(base_url)
+    with _shared_lock:
+        backend = _shared_backends.get((api_key, base_url))
+        if backend is None:
+            backend = SynthesisBackend(api_key=api_key, base_url=base_url)
+            _shared_backends[(api_key, base_url)] = backend
+        return backend
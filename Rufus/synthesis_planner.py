@@ -0,0 +1,362 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from logger import logger
+from utils import estimate_tokens
+from chunker import iter_passages
+
+
+def format_content(items):
+    """
+    Format (url, text) pairs the way the synthesis prompt presents web content.
+
+    Args:
+        items: Iterable of (url, text) pairs
+
+    Returns:
+        Combined content string
+    """
+    return "\n\n".join(f"URL: {url}\nContent: {content}" for url, content in items)
+
+
+def pack_chunks(scraped_data, token_budget):
+    """
+    Pack scraped pages into chunks that each fit a token budget.
+
+    Pages are packed whole and in order while they fit. A page that is
+    larger than the budget on its own is split into passages first.
+
+    Args:
+        scraped_data: Dictionary mapping URLs to extracted text
+        token_budget: Maximum estimated tokens of formatted content per chunk
+
+    Returns:
+        List of chunks, each a list of (url, text) pairs
+    """
+    chunks = []
+    current = []
+    current_tokens = 0
+
+    for url, text in scraped_data.items():
+        overhead = estimate_tokens(f"URL: {url}\nContent: \n\n")
+        if estimate_tokens(text) + overhead <= token_budget:
+            pieces = [text]
+        else:
+            passage_tokens = max(1, token_budget - overhead)
+            pieces = [passage["text"] for passage in iter_passages(text, url=url, max_tokens=passage_tokens)]
+
+        for piece in pieces:
+            piece_tokens = estimate_tokens(piece) + overhead
+            if current and current_tokens + piece_tokens > token_budget:
+                chunks.append(current)
+                current = []
+                current_tokens = 0
+
+            if current and current[-1][0] == url:
+                # Consecutive passages of one page share a single URL header
+                current[-1] = (url, f"{current[-1][1]} {piece}")
+                current_tokens += piece_tokens - overhead
+            else:
+                current.append((url, piece))
+                current_tokens += piece_tokens
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class ChunkPacker:
+    """
+    Pack pages into budget-sized chunks as they arrive.
+
+    Produces the same chunks as pack_chunks, but hands each chunk out as
+    soon as it is full, so synthesis of the first chunks can start while
+    later pages are still being crawled and extracted.
+    """
+    def __init__(self, token_budget=None):
+        """
+        Initialize the packer.
+
+        Args:
+            token_budget: Maximum estimated tokens of formatted content per chunk, or None for a single chunk
+        """
+        self.token_budget = token_budget
+        self._pending = {}
+        self._tokens = 0
+
+    def add(self, url, text):
+        """
+        Add a page.
+
+        Args:
+            url: URL of the page
+            text: Extracted text of the page
+
+        Returns:
+            List of chunks completed by this page, each a list of (url, text) pairs
+        """
+        self._pending[url] = text
+        self._tokens += estimate_tokens(text) + estimate_tokens(f"URL: {url}\nContent: \n\n")
+        if self.token_budget is None or self._tokens <= self.token_budget:
+            return []
+
+        chunks = pack_chunks(self._pending, self.token_budget)
+        # The last chunk may still have room; keep it for the next pages
+        self._pending = {}
+        self._tokens = 0
+        for url, text in chunks.pop():
+            self._pending[url] = text
+            self._tokens += estimate_tokens(text) + estimate_tokens(f"URL: {url}\nContent: \n\n")
+        return chunks
+
+    def flush(self):
+        """
+        Return the chunks left after the last page.
+
+        Returns:
+            List of chunks, each a list of (url, text) pairs
+        """
+        chunks = pack_chunks(self._pending, self.token_budget) if self.token_budget else [list(self._pending.items())]
+        self._pending = {}
+        self._tokens = 0
+        return [chunk for chunk in chunks if chunk]
+
+
+def is_usable(document):
+    """Check whether a synthesized document is a real result rather than an error or placeholder."""
+    return (isinstance(document, dict) and bool(document)
+            and not any(key in document for key in ("error", "parse_error", "response")))
+
+
+def merge_documents(documents):
+    """
+    Merge partial documents without a model call.
+
+    Used when the reduce call fails. The first title is kept, summaries are
+    joined, lists are concatenated without duplicates and objects are merged.
+
+    Args:
+        documents: List of partial documents
+
+    Returns:
+        Merged document
+    """
+    merged = {}
+    seen_items = {}
+
+    for document in documents:
+        for key, value in document.items():
+            if isinstance(value, list):
+                items = merged.setdefault(key, [])
+                seen = seen_items.setdefault(key, set())
+                for item in value:
+                    marker = json.dumps(item, sort_keys=True, default=str)
+                    if marker not in seen:
+                        seen.add(marker)
+                        items.append(item)
+            elif isinstance(value, dict):
+                merged.setdefault(key, {}).update(value)
+            elif key == "summary" and key in merged:
+                merged[key] = f"{merged[key]} {value}"
+            else:
+                merged.setdefault(key, value)
+
+    merged.setdefault("metadata", {})["partial_documents"] = len(documents)
+    return merged
+
+
+class SynthesisPlanner:
+    """
+    Map-reduce planning for document synthesis.
+
+    Content larger than the prompt budget is packed into chunks that each fit
+    it. One map call per chunk runs concurrently, up to a concurrency cap, and
+    one reduce call merges the partial documents. Latency is roughly one map
+    round plus one reduce round, however large the crawl. If the partial
+    documents do not fit one reduce prompt, they are reduced in concurrent
+    groups first.
+    """
+    def __init__(self, token_budget=24000, max_concurrency=4):
+        """
+        Initialize the planner.
+
+        Args:
+            token_budget: Maximum estimated tokens of content per model call
+            max_concurrency: Maximum number of model calls in flight
+        """
+        self.token_budget = token_budget
+        self.max_concurrency = max_concurrency
+
+    def needs_map_reduce(self, combined_text):
+        """Check whether the combined content is too large for a single prompt."""
+        return estimate_tokens(combined_text) > self.token_budget
+
+    def plan(self, scraped_data):
+        """
+        Split scraped data into chunks that each fit the budget.
+
+        Args:
+            scraped_data: Dictionary mapping URLs to extracted text
+
+        Returns:
+            List of chunks, each a list of (url, text) pairs
+        """
+        return pack_chunks(scraped_data, self.token_budget)
+
+    def run(self, chunks, map_fn, reduce_fn):
+        """
+        Synthesize a document from planned chunks.
+
+        Args:
+            chunks: Chunks returned by plan()
+            map_fn: Function turning formatted chunk content into a partial document
+            reduce_fn: Function turning a list of partial documents into one document
+
+        Returns:
+            Final document, or an error document if every map call failed
+        """
+        logger.info(f"Synthesizing {len(chunks)} chunks with up to {self.max_concurrency} concurrent calls")
+        partials = self._run_concurrently(map_fn, [format_content(chunk) for chunk in chunks])
+        return self.reduce(partials, reduce_fn)
+
+    def reduce(self, partials, reduce_fn):
+        """
+        Reduce partial documents into the final document.
+
+        Args:
+            partials: Partial documents from the map calls
+            reduce_fn: Function turning a list of partial documents into one document
+
+        Returns:
+            Final document
+        """
+        steps = self._reduce_steps(partials)
+        try:
+            inputs = next(steps)
+            while True:
+                inputs = steps.send(self._run_concurrently(reduce_fn, inputs))
+        except StopIteration as finished:
+            return finished.value
+
+    async def arun(self, chunks, map_fn, reduce_fn):
+        """
+        Synthesize a document from planned chunks with coroutine map and reduce functions.
+
+        Works like run(), with the calls running as concurrent tasks on the
+        event loop instead of threads.
+
+        Args:
+            chunks: Chunks returned by plan()
+            map_fn: Coroutine function turning formatted chunk content into a partial document
+            reduce_fn: Coroutine function turning a list of partial documents into one document
+
+        Returns:
+            Final document, or an error document if every map call failed
+        """
+        logger.info(f"Synthesizing {len(chunks)} chunks with up to {self.max_concurrency} concurrent calls")
+        partials = await self._arun_concurrently(map_fn, [format_content(chunk) for chunk in chunks])
+        return await self.areduce(partials, reduce_fn)
+
+    async def areduce(self, partials, reduce_fn):
+        """
+        Reduce partial documents into the final document, like reduce(), with a coroutine reduce function.
+
+        Args:
+            partials: Partial documents from the map calls
+            reduce_fn: Coroutine function turning a list of partial documents into one document
+
+        Returns:
+            Final document
+        """
+        steps = self._reduce_steps(partials)
+        try:
+            inputs = next(steps)
+            while True:
+                inputs = steps.send(await self._arun_concurrently(reduce_fn, inputs))
+        except StopIteration as finished:
+            return finished.value
+
+    def _reduce_steps(self, partials):
+        """
+        Reduction logic shared by reduce() and areduce().
+
+        Yields the inputs of each round of reduce calls and receives their
+        results, so the sync and async paths only differ in how they run calls.
+        Returns the final document.
+        """
+        usable = [partial for partial in partials if is_usable(partial)]
+        if not usable:
+            errors = [partial for partial in partials if isinstance(partial, dict)]
+            logger.error("No chunk produced a usable partial document")
+            return errors[0] if errors else {"error": "Synthesis failed for every chunk"}
+        if len(usable) == 1:
+            return usable[0]
+
+        groups = self._group(usable)
+        while len(groups) > 1:
+            logger.info(f"Partial documents exceed the budget; reducing {len(groups)} groups first")
+            reduced = yield groups
+            usable = [doc if is_usable(doc) else merge_documents(group) for doc, group in zip(reduced, groups)]
+            next_groups = self._group(usable)
+            if len(next_groups) >= len(groups):
+                # The merged groups are not getting smaller; finish without the model
+                return merge_documents(usable)
+            groups = next_groups
+
+        document, = yield [usable]
+        if not is_usable(document):
+            logger.warning("Reduce call did not return a usable document; merging partial documents directly")
+            document = merge_documents(usable)
+        return document
+
+    def _group(self, documents):
+        groups = []
+        current = []
+        current_tokens = 0
+        for document in documents:
+            tokens = estimate_tokens(json.dumps(document))
+            if current and current_tokens + tokens > self.token_budget:
+                groups.append(current)
+                current = []
+                current_tokens = 0
+            current.append(document)
+            current_tokens += tokens
+        if current:
+            groups.append(current)
+        return groups
+
+    def _run_concurrently(self, fn, inputs):
+        workers = max(1, min(self.max_concurrency, len(inputs)))
+        if workers == 1:
+            return [self._call(fn, item) for item in inputs]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(lambda item: self._call(fn, item), inputs))
+
+    async def _arun_concurrently(self, fn, inputs):
+        slots = asyncio.Semaphore(max(1, self.max_concurrency))
+
+        async def call(item):
+            async with slots:
+                return await self._acall(fn, item)
+
+        return await asyncio.gather(*(call(item) for item in inputs))
+
+    @classmethod
+    async def _acall(cls, fn, item):
+        try:
+            return await fn(item)
+        except Exception as e:
+            return cls._failed(e)
+
+    @classmethod
+    def _call(cls, fn, item):
+        try:
+            return fn(item)
+        except Exception as e:
+            return cls._failed(e)
+
+    @staticmethod
+    def _failed(error):
+        # A failed call becomes an error document, so one chunk cannot fail the whole synthesis
+        logger.error(f"Synthesis call failed: {str(error)}")
+        return {"error": str(error)}
@@ -1,52 +1,330 @@
-from openai import OpenAI
 from logger import logger
+from synthesis_backend import get_backend
+from synthesis_planner import SynthesisPlanner, format_content
+from artifact_writer import default_writer
+from streaming import ThinkStripper, IncrementalJSONParser
+from tolerant_json import repair_json
+from document_schema import validate_document, describe_fields
 import re
 import json
 import os
+import uuid
 from datetime import datetime
 
-def synthesize_document(scraped_data, instructions, nim_api_key, model="deepseek-ai/deepseek-r1", output_dir="outputs"):
+def synthesize_document(scraped_data, instructions, nim_api_key, model="deepseek-ai/deepseek-r1", output_dir="outputs",
+                        max_prompt_tokens=None, max_concurrency=4, cache=None, writer=None, backend=None,
+                        base_url=None, job_id=None, source_urls=None):
     """
     Synthesize scraped data into a structured document using Nvidia's NIM API
     through the OpenAI client package (without using guided_json).
+    
+    When max_prompt_tokens is set and the content is larger than that, the
+    content is split into chunks that are synthesized concurrently and then
+    reduced into one document. With an LLMResponseCache, identical requests
+    are answered from the cache without calling the API. The scraped content
+    and the document are saved by an ArtifactWriter in the background, so
+    synthesis never waits for disk writes.
+    
+    API calls go through a SynthesisBackend, which reuses pooled connections
+    and limits requests and tokens per minute. Without one, the backend
+    shared by every caller with the same API key and base_url is used;
+    base_url (or NVIDIA_NIM_BASE_URL) can point at a local MockNIMServer.
+    
+    Malformed JSON is repaired rather than discarded, and the document is
+    validated against the output schema; only missing or invalid fields are
+    asked for again, in a short follow-up to the original call.
+    
+    Artifacts are named after job_id (a new ID when not given) and, with an
+    ArtifactStore behind the writer, indexed under it and under the request:
+    source_urls (the scraped URLs when not given) and instructions.
     """
     logger.info(f"Synthesizing document from {len(scraped_data)} pages using model: {model}")
     
-    # Create output directory if it doesn't exist
-    os.makedirs(output_dir, exist_ok=True)
+    if writer is None:
+        writer = default_writer
     
-    # Generate timestamp for filenames
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    # Name and index the artifacts of this run
+    artifacts = _ArtifactNames(output_dir, job_id, source_urls or list(scraped_data), instructions)
     
     # Combine the scraped text from all pages
-    combined_text = "\n\n".join(
-        [f"URL: {url}\nContent: {content}" for url, content in scraped_data.items()]
-    )
+    combined_text = format_content(scraped_data.items())
     
     logger.debug(f"Combined text length: {len(combined_text)} characters")
     
-    # Save the combined content to a text file
-    content_filename = f"{output_dir}/web_content_{timestamp}.txt"
-    with open(content_filename, "w", encoding="utf-8") as f:
-        f.write(combined_text)
+    # Save the combined content to a text file in the background
+    content_filename = writer.write_text(artifacts.content_path, combined_text, record=artifacts.record("content"))
+    if content_filename:
+        logger.info(f"Web content queued for saving to {content_filename}")
+    
+    try:
+        if backend is None:
+            backend = get_backend(nim_api_key, base_url)
+        
+        planner = SynthesisPlanner(token_budget=max_prompt_tokens, max_concurrency=max_concurrency) \
+            if max_prompt_tokens else None
+        
+        if planner is not None and planner.needs_map_reduce(combined_text):
+            chunks = planner.plan(scraped_data)
+            structured_document = planner.run(
+                chunks,
+                map_fn=lambda content: _synthesize(backend, model, _build_prompt(instructions, content), cache),
+                reduce_fn=lambda partials: _synthesize(backend, model, _build_reduce_prompt(instructions, partials),
+                                                       cache)
+            )
+        else:
+            structured_document = _synthesize(backend, model, _build_prompt(instructions, combined_text), cache)
+        
+        if "error" in structured_document:
+            return structured_document
+        
+        # Save the JSON response to a file in the background
+        json_filename = writer.write_json(artifacts.document_path, structured_document,
+                                          record=artifacts.record("document"))
+        if json_filename:
+            logger.info(f"Structured document queued for saving to {json_filename}")
+        
+        return structured_document
+    
+    except Exception as e:
+        # In case of an API error, return the error message
+        logger.error(f"Error in API call: {str(e)}", exc_info=True)
+        return {"error": str(e)}
+
+async def asynthesize_document(scraped_data, instructions, nim_api_key, model="deepseek-ai/deepseek-r1",
+                               output_dir="outputs", max_prompt_tokens=None, max_concurrency=4, cache=None,
+                               writer=None, backend=None, base_url=None, job_id=None, source_urls=None):
+    """
+    Synthesize a document like synthesize_document, without blocking the event loop.
+    
+    Model calls go through the backend's AsyncOpenAI client and share its
+    rate limits; map-reduce chunks run as concurrent tasks. Cancelling the
+    awaiting task cancels the model calls in flight.
+    """
+    logger.info(f"Synthesizing document from {len(scraped_data)} pages using model: {model}")
+    
+    if writer is None:
+        writer = default_writer
+    
+    artifacts = _ArtifactNames(output_dir, job_id, source_urls or list(scraped_data), instructions)
+    combined_text = format_content(scraped_data.items())
+    writer.write_text(artifacts.content_path, combined_text, record=artifacts.record("content"))
+    
+    try:
+        if backend is None:
+            backend = get_backend(nim_api_key, base_url)
+        
+        planner = SynthesisPlanner(token_budget=max_prompt_tokens, max_concurrency=max_concurrency) \
+            if max_prompt_tokens else None
+        
+        if planner is not None and planner.needs_map_reduce(combined_text):
+            structured_document = await planner.arun(
+                planner.plan(scraped_data),
+                map_fn=lambda content: _asynthesize(backend, model, _build_prompt(instructions, content), cache),
+                reduce_fn=lambda partials: _asynthesize(backend, model, _build_reduce_prompt(instructions, partials),
+                                                        cache)
+            )
+        else:
+            structured_document = await _asynthesize(backend, model, _build_prompt(instructions, combined_text),
+                                                     cache)
+        
+        if "error" in structured_document:
+            return structured_document
+        
+        writer.write_json(artifacts.document_path, structured_document, record=artifacts.record("document"))
+        return structured_document
+    
+    except Exception as e:
+        logger.error(f"Error in async API call: {str(e)}", exc_info=True)
+        return {"error": str(e)}
+
+def synthesize_chunk(chunk, instructions, nim_api_key, model="deepseek-ai/deepseek-r1", cache=None, backend=None,
+                     base_url=None):
+    """
+    Synthesize a partial document from one chunk of pages: the map step of
+    map-reduce synthesis, for callers that produce chunks as pages arrive.
+    
+    Args:
+        chunk: List of (url, text) pairs, e.g. from a ChunkPacker
+        instructions: User instructions for the synthesis
+        nim_api_key: NVIDIA NIM API key
+        
+    Returns:
+        Partial document, or {"error": ...} if the call failed
+    """
+    try:
+        if backend is None:
+            backend = get_backend(nim_api_key, base_url)
+        return _synthesize(backend, model, _build_prompt(instructions, format_content(chunk)), cache)
+    except Exception as e:
+        logger.error(f"Error in API call: {str(e)}", exc_info=True)
+        return {"error": str(e)}
+
+def reduce_chunk_documents(partials, chunks, instructions, nim_api_key, model="deepseek-ai/deepseek-r1",
+                           output_dir="outputs", max_prompt_tokens=None, max_concurrency=4, cache=None, writer=None,
+                           backend=None, base_url=None, job_id=None, source_urls=None):
+    """
+    Finish a synthesis whose map calls ran through synthesize_chunk.
+    
+    A single partial document is the result as it is, exactly as if the
+    content had been synthesized in one call; several are reduced as in
+    synthesize_document. The content and the document are saved like
+    synthesize_document saves them.
     
-    logger.info(f"Web content saved to {content_filename}")
+    Args:
+        partials: Partial documents from synthesize_chunk
+        chunks: The chunks they were synthesized from, for the saved content
+        
+    Returns:
+        Final document
+    """
+    if writer is None:
+        writer = default_writer
+    
+    artifacts = _ArtifactNames(output_dir, job_id, source_urls or [url for chunk in chunks for url, _ in chunk],
+                               instructions)
+    combined_text = format_content(pair for chunk in chunks for pair in chunk)
+    writer.write_text(artifacts.content_path, combined_text, record=artifacts.record("content"))
     
     try:
-        logger.debug("Initializing OpenAI client with NIM configuration")
-        client = OpenAI(
-            base_url="https://integrate.api.nvidia.com/v1",
-            api_key=nim_api_key
+        if backend is None:
+            backend = get_backend(nim_api_key, base_url)
+        
+        planner = SynthesisPlanner(token_budget=max_prompt_tokens, max_concurrency=max_concurrency)
+        structured_document = planner.reduce(
+            partials,
+            reduce_fn=lambda documents: _synthesize(backend, model, _build_reduce_prompt(instructions, documents),
+                                                    cache)
         )
         
-        # Read the content from file
-        with open(content_filename, "r", encoding="utf-8") as f:
-            web_content = f.read()
-            
-        # Create a detailed prompt with explicit formatting instructions
-        prompt = f"""
-        You are tasked with creating a structured JSON document based on web content and user instructions.
+        if "error" in structured_document:
+            return structured_document
+        
+        writer.write_json(artifacts.document_path, structured_document, record=artifacts.record("document"))
+        return structured_document
+    
+    except Exception as e:
+        logger.error(f"Error in API call: {str(e)}", exc_info=True)
+        return {"error": str(e)}
+
+def stream_synthesize_document(scraped_data, instructions, nim_api_key, model="deepseek-ai/deepseek-r1",
+                               output_dir="outputs", max_prompt_tokens=None, max_concurrency=4, cache=None,
+                               writer=None, backend=None, base_url=None, job_id=None, source_urls=None):
+    """
+    Synthesize a document like synthesize_document, streaming the model response.
+    
+    Reasoning blocks are stripped as they arrive and the JSON is parsed
+    incrementally, so each top-level field (title, summary, key_points, ...)
+    is yielded as soon as it is complete. Content that needs map-reduce is
+    synthesized as usual and its fields are yielded once the document is ready.
+    
+    Yields:
+        {"event": "field", "key": ..., "value": ...} for each completed field, then
+        {"event": "document", "document": ...} with the final document
+    """
+    logger.info(f"Streaming document synthesis from {len(scraped_data)} pages using model: {model}")
+    
+    if writer is None:
+        writer = default_writer
+    
+    artifacts = _ArtifactNames(output_dir, job_id, source_urls or list(scraped_data), instructions)
+    combined_text = format_content(scraped_data.items())
+    writer.write_text(artifacts.content_path, combined_text, record=artifacts.record("content"))
+    
+    structured_document = None
+    try:
+        if backend is None:
+            backend = get_backend(nim_api_key, base_url)
+        
+        planner = SynthesisPlanner(token_budget=max_prompt_tokens, max_concurrency=max_concurrency) \
+            if max_prompt_tokens else None
+        
+        if planner is not None and planner.needs_map_reduce(combined_text):
+            structured_document = planner.run(
+                planner.plan(scraped_data),
+                map_fn=lambda content: _synthesize(backend, model, _build_prompt(instructions, content), cache),
+                reduce_fn=lambda partials: _synthesize(backend, model, _build_reduce_prompt(instructions, partials),
+                                                       cache)
+            )
+            if isinstance(structured_document, dict):
+                for key, value in structured_document.items():
+                    yield {"event": "field", "key": key, "value": value}
+        else:
+            request = _build_request(model, _build_prompt(instructions, combined_text))
+            for event in _stream_synthesize(backend, request, cache):
+                if event["event"] == "document":
+                    structured_document = event["document"]
+                else:
+                    yield event
+    
+    except Exception as e:
+        logger.error(f"Error in streaming API call: {str(e)}", exc_info=True)
+        structured_document = {"error": str(e)}
+    
+    if "error" not in structured_document:
+        writer.write_json(artifacts.document_path, structured_document, record=artifacts.record("document"))
+    
+    yield {"event": "document", "document": structured_document}
+
+class _ArtifactNames:
+    """Paths and store index entries of one synthesis run's artifacts."""
+    def __init__(self, output_dir, job_id, urls, instructions):
+        self.job_id = job_id or uuid.uuid4().hex
+        self.urls = list(urls)
+        self.instructions = instructions or ""
+        # The job ID keeps concurrent runs in the same second from overwriting each other's files
+        stem = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{self.job_id[:8]}"
+        self.content_path = os.path.join(output_dir, f"web_content_{stem}.txt")
+        self.document_path = os.path.join(output_dir, f"structured_document_{stem}.json")
+    
+    def record(self, kind):
+        return {"kind": kind, "urls": self.urls, "instructions": self.instructions, "job_id": self.job_id}
+
+def _stream_synthesize(backend, request, cache=None):
+    """Run one streaming synthesis call, yielding fields as they complete and the parsed document last."""
+    cached = cache.get(request) if cache is not None else None
+    if cached is not None:
+        logger.info("Using cached model response")
+        chunks = [cached]
+    else:
+        logger.info("Making streaming API call to NIM for document synthesis")
+        chunks = backend.stream(request)
+    
+    stripper = ThinkStripper()
+    parser = IncrementalJSONParser()
+    visible = []
+    
+    for chunk in chunks:
+        text = stripper.feed(chunk)
+        visible.append(text)
+        for key, value in parser.feed(text):
+            yield {"event": "field", "key": key, "value": value}
+    
+    tail = stripper.finish()
+    visible.append(tail)
+    for key, value in parser.feed(tail):
+        yield {"event": "field", "key": key, "value": value}
+    
+    content = "".join(visible)
+    if not content.strip():
+        logger.error("No content in streamed response from NIM API")
+        yield {"event": "document", "document": {"error": "No content in response"}}
+        return
+    
+    # Whether to cache is decided on the full response, before falling back to the streamed fields
+    structured_document = _store_response(request, content, cache) if cached is None else _parse_document(content)
+    if "parse_error" in structured_document and parser.document:
+        # Keep the fields that did parse while streaming
+        structured_document = parser.document
+    structured_document, fixed = _complete_document(backend, request, content, structured_document, cache)
+    for key in fixed:
+        yield {"event": "field", "key": key, "value": structured_document[key]}
+    yield {"event": "document", "document": structured_document}
 
+def _build_prompt(instructions, web_content):
+    """Create a detailed prompt with explicit formatting instructions."""
+    return f"""
+        You are tasked with creating a structured JSON document based on web content and user instructions.
+        
         INSTRUCTIONS: {instructions}
         
         WEB CONTENT:
@@ -64,87 +342,220 @@ def synthesize_document(scraped_data, instructions, nim_api_key, model="deepseek
         3. If the instructions mention HR or chatbot, include:
            - For HR: Include "policies" array with HR-related information
            - For chatbots: Include "faq" array with question/answer pairs
-
+        
         4. IMPORTANT: Return ONLY valid JSON without any explanation, markdown formatting, or code block markers.
         5. Ensure proper JSON syntax with quotes around property names.
         """
+
+def _build_reduce_prompt(instructions, partial_documents):
+    """Create the prompt that merges partial documents, one per content chunk, into one document."""
+    partials = "\n\n".join(json.dumps(document, ensure_ascii=False) for document in partial_documents)
+    return f"""
+        You are tasked with merging partial JSON documents into one structured JSON document.
+        Each partial document was created from a different part of the same web content.
         
-        logger.info("Making API call to NIM for document synthesis")
-        response = client.chat.completions.create(
-            model=model,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.2,
-            top_p=0.7,
-            response_format={"type": "json_object"}  # Request JSON format but without schema constraints
-        )
+        INSTRUCTIONS: {instructions}
         
-        if response.choices and len(response.choices) > 0:
-            content = response.choices[0].message.content
-            logger.debug(f"Received response: {len(content)} characters")
-        else:
-            logger.error("No content in response from NIM API")
-            return {"error": "No content in response"}
+        PARTIAL DOCUMENTS:
+        {partials}
+        
+        OUTPUT REQUIREMENTS:
+        1. Create one JSON document with the same fields as the partial documents:
+           - title: A descriptive title summarizing all of the content
+           - summary: Brief summary of key information (2-3 sentences)
+           - key_points: Array of main points/takeaways, without duplicates
+           - content_sections: Array of objects with "heading" and "content" fields, merging sections on the same topic
+           - metadata: Object with source count and processing timestamp
+        2. Keep any "policies" or "faq" arrays, merged without duplicates.
+        3. IMPORTANT: Return ONLY valid JSON without any explanation, markdown formatting, or code block markers.
+        4. Ensure proper JSON syntax with quotes around property names.
+        """
+
+def _build_request(model, prompt):
+    """Create the chat completion parameters for one prompt."""
+    return {
+        "model": model,
+        "messages": [{"role": "user", "content": prompt}],
+        "temperature": 0.2,
+        "top_p": 0.7,
+        "response_format": {"type": "json_object"}  # Request JSON format but without schema constraints
+    }
+
+def _call_model(backend, request):
+    """Send one request to the model and return the response text, or None."""
+    logger.info("Making API call to NIM for document synthesis")
+    content = backend.complete(request)
+    
+    if content:
+        logger.debug(f"Received response: {len(content)} characters")
+        return content
+    
+    logger.error("No content in response from NIM API")
+    return None
+
+def _parse_document(content):
+    """Parse the model response into a document, repairing malformed JSON."""
+    # Clean the response to ensure it's valid JSON
+    clean_content = clean_response(content)
+    
+    try:
+        # Attempt to parse as JSON
+        structured_document = json.loads(clean_content)
+        logger.info("Successfully parsed response as JSON")
+        return structured_document
+    
+    except json.JSONDecodeError as e:
+        logger.warning(f"Failed to parse response as JSON: {str(e)}")
         
-        # Clean the response to ensure it's valid JSON
-        clean_content = clean_response(content)
+        # Repair quoting, commas and truncation without touching the content
+        try:
+            structured_document = repair_json(clean_content)
+            if isinstance(structured_document, dict):
+                logger.info("Successfully parsed response as JSON after repair")
+                return structured_document
+        except ValueError:
+            pass
         
+        # If still can't parse, create a fallback response
+        logger.error("Failed to parse response even after repair")
+        
+        # If the response contains "NO WEB CONTENT" but isn't valid JSON, format it properly
+        if "NO WEB CONTENT" in clean_content:
+            return {"response": "NO WEB CONTENT"}
+        return {"content": clean_content, "parse_error": str(e)}
+
+def _build_fix_request(request, content, fields):
+    """Create a follow-up request asking the model for only the missing or invalid fields."""
+    messages = list(request["messages"]) + [
+        {"role": "assistant", "content": clean_response(content)},
+        {"role": "user", "content": f"""
+        The JSON document above is missing these fields or has invalid values for them:
+        {describe_fields(fields)}
+        
+        Return ONLY a JSON object containing just these fields with valid values.
+        Do not repeat the other fields. Do not add any explanation or code block markers.
+        """}
+    ]
+    return dict(request, messages=messages)
+
+def _complete_document(backend, request, content, structured_document, cache=None):
+    """
+    Validate a document against the output schema and re-ask for the fields that failed.
+    
+    Only the missing or invalid fields are requested again, so a bad field costs
+    a short follow-up instead of a full synthesis run. Fields the follow-up
+    does not fix keep the values the model first returned.
+    
+    Returns:
+        Tuple of (validated document, names of the fields that were fixed)
+    """
+    original = structured_document
+    structured_document, invalid = validate_document(structured_document)
+    if not invalid:
+        return structured_document, []
+    
+    fix_request, fix_content = _prepare_fix(request, content, invalid, cache)
+    cached = fix_content is not None
+    if not cached:
         try:
-            # Attempt to parse as JSON
-            structured_document = json.loads(clean_content)
-            logger.info("Successfully parsed response as JSON")
-            
-            # Save the JSON response to a file
-            json_filename = f"{output_dir}/structured_document_{timestamp}.json"
-            with open(json_filename, "w", encoding="utf-8") as f:
-                json.dump(structured_document, f, indent=2)
-                
-            logger.info(f"Structured document saved to {json_filename}")
-            
+            fix_content = _call_model(backend, fix_request)
+        except Exception as e:
+            logger.error(f"Error asking for missing fields: {str(e)}")
+            fix_content = None
+    return _apply_fixes(original, structured_document, invalid, fix_request, fix_content, cached, cache)
+
+async def _acomplete_document(backend, request, content, structured_document, cache=None):
+    """Validate a document and re-ask for the fields that failed, like _complete_document, without blocking."""
+    original = structured_document
+    structured_document, invalid = validate_document(structured_document)
+    if not invalid:
+        return structured_document, []
+    
+    fix_request, fix_content = _prepare_fix(request, content, invalid, cache)
+    cached = fix_content is not None
+    if not cached:
+        try:
+            fix_content = await backend.acomplete(fix_request)
+        except Exception as e:
+            logger.error(f"Error asking for missing fields: {str(e)}")
+            fix_content = None
+    return _apply_fixes(original, structured_document, invalid, fix_request, fix_content, cached, cache)
+
+def _prepare_fix(request, content, invalid, cache=None):
+    """Build the re-ask request for the failed fields, returning it with its cached response, if any."""
+    logger.warning(f"Document fields missing or invalid: {', '.join(invalid)}. Asking the model for them again")
+    fix_request = _build_fix_request(request, content, invalid)
+    return fix_request, cache.get(fix_request) if cache is not None else None
+
+def _apply_fixes(original, structured_document, invalid, fix_request, fix_content, cached, cache=None):
+    """Merge the re-asked fields into the document and validate it again."""
+    if not fix_content:
+        return _keep_original(structured_document, original, invalid), []
+    
+    fixes = _parse_document(fix_content)
+    if "parse_error" in fixes:
+        return _keep_original(structured_document, original, invalid), []
+    if cache is not None and not cached:
+        cache.put(fix_request, fix_content)
+    
+    merged = dict(structured_document)
+    merged.update({name: fixes[name] for name in invalid if name in fixes})
+    merged, remaining = validate_document(merged)
+    if remaining:
+        logger.warning(f"Document fields still missing or invalid after re-ask: {', '.join(remaining)}")
+    return _keep_original(merged, original, remaining), [name for name in invalid if name not in remaining]
+
+def _keep_original(structured_document, original, names):
+    """Put back the model's first values for fields that could not be fixed, rather than losing the content."""
+    kept = dict(structured_document)
+    kept.update({name: original[name] for name in names if name in original})
+    return kept
+
+def _store_response(request, content, cache=None):
+    """Parse a fresh model response, caching it if it parsed."""
+    structured_document = _parse_document(content)
+    # Only responses that parsed are cached, so a bad response is retried on the next run
+    if cache is not None and "parse_error" not in structured_document:
+        cache.put(request, content)
+    return structured_document
+
+def _synthesize(backend, model, prompt, cache=None):
+    """Run one synthesis call and parse its result, answering from the cache when possible."""
+    request = _build_request(model, prompt)
+    
+    if cache is not None:
+        cached = cache.get(request)
+        if cached is not None:
+            logger.info("Using cached model response")
+            structured_document, _ = _complete_document(backend, request, cached, _parse_document(cached), cache)
             return structured_document
-            
-        except json.JSONDecodeError as e:
-            logger.warning(f"Failed to parse response as JSON: {str(e)}")
-            
-            # Additional cleaning attempt for common JSON errors
-            try:
-                # Fix missing quotes around property names
-                fixed_content = re.sub(r'(\s*?)(\w+)(\s*?):', r'\1"\2"\3:', clean_content)
-                # Replace single quotes with double quotes
-                fixed_content = fixed_content.replace("'", '"')
-                
-                structured_document = json.loads(fixed_content)
-                logger.info("Successfully parsed response as JSON after fixing")
-                
-                # Save the fixed JSON
-                json_filename = f"{output_dir}/structured_document_{timestamp}.json"
-                with open(json_filename, "w", encoding="utf-8") as f:
-                    json.dump(structured_document, f, indent=2)
-                    
-                logger.info(f"Fixed structured document saved to {json_filename}")
-                
-                return structured_document
-            except json.JSONDecodeError:
-                # If still can't parse, create a fallback response
-                logger.error("Failed to parse response even after fixes")
-                
-                # If the response contains "NO WEB CONTENT" but isn't valid JSON, format it properly
-                result = {"content": clean_content, "parse_error": str(e)}
-                if "NO WEB CONTENT" in clean_content:
-                    result = {"response": "NO WEB CONTENT"}
-                
-                    # Save the result anyway
-                    json_filename = f"{output_dir}/structured_document_{timestamp}.json"
-                    with open(json_filename, "w", encoding="utf-8") as f:
-                        json.dump(result, f, indent=2)
-                    
-                logger.info(f"Fallback document saved to {json_filename}")
-                
-                return result
-            
-    except Exception as e:
-        # In case of an API error, return the error message
-        logger.error(f"Error in API call: {str(e)}", exc_info=True)
-        return {"error": str(e)}
+    
+    content = _call_model(backend, request)
+    if content is None:
+        return {"error": "No content in response"}
+    
+    structured_document = _store_response(request, content, cache)
+    structured_document, _ = _complete_document(backend, request, content, structured_document, cache)
+    return structured_document
+
+async def _asynthesize(backend, model, prompt, cache=None):
+    """Run one synthesis call like _synthesize, awaiting the model instead of blocking."""
+    request = _build_request(model, prompt)
+    
+    content = cache.get(request) if cache is not None else None
+    if content is not None:
+        logger.info("Using cached model response")
+        structured_document = _parse_document(content)
+    else:
+        logger.info("Making async API call to NIM for document synthesis")
+        content = await backend.acomplete(request)
+        if not content:
+            logger.error("No content in response from NIM API")
+            return {"error": "No content in response"}
+        structured_document = _store_response(request, content, cache)
+    
+    structured_document, _ = await _acomplete_document(backend, request, content, structured_document, cache)
+    return structured_document
 
 def clean_response(content):
     """Clean the LLM response by removing thinking blocks and markdown formatting."""
@@ -0,0 +1,128 @@
+import html
+import re
+import unicodedata
+
+# Entities that decode to whitespace are folded into the surrounding whitespace
+WHITESPACE_ENTITIES = r'&(?:nbsp|ensp|emsp|thinsp|#160|#x[aA]0|#32|#x20);'
+
+# HTML elements whose leftover tags are stripped. Only real tag names count, so
+# comparisons and generics in code or math ("x<y and y>z", "List<String>") survive.
+HTML_TAG_NAMES = (
+    'a|abbr|address|article|aside|b|bdi|bdo|blockquote|body|br|button|caption|cite|code|col|colgroup|dd|del|'
+    'details|dfn|div|dl|dt|em|figcaption|figure|font|footer|form|h[1-6]|head|header|hr|html|i|iframe|img|'
+    'input|ins|kbd|label|li|link|main|mark|meta|nav|noscript|ol|option|p|picture|pre|q|s|samp|section|select|'
+    'small|source|span|strong|sub|summary|sup|svg|table|tbody|td|textarea|tfoot|th|thead|time|title|tr|u|ul|'
+    'var|wbr'
+)
+# Pieces of the fused pattern. Each of these is replaced by a single space.
+# A run of adjacent tags ("</a><br/>") becomes a single space.
+TAG_ALTERNATIVE = (r'\s*(?:</?(?i:' + HTML_TAG_NAMES + r')'
+                   r'(?:\s+[\w:-]+(?:\s*=\s*(?:"[^"]*"|\'[^\']*\'|[^\s"\'<>]+))?)*\s*/?>\s*)+')
+SPACE_ENTITY_ALTERNATIVE = r'\s*' + WHITESPACE_ENTITIES + r'\s*'
+# Runs of two or more whitespace characters, or a single non-space one (\n, \t, ...)
+WHITESPACE_ALTERNATIVE = r'\s{2,}|[^\S ]'
+# A period directly followed by a capital letter: "end.Next" -> "end. Next".
+# The period is captured so the replacement template can put it back.
+SENTENCE_ALTERNATIVE = r'(\.)(?=[A-Z])'
+
+# Remaining entities are decoded in a second pass, only when the text contains '&'
+ENTITY_PATTERN = re.compile(r'&(?:#\d{1,7}|#[xX][0-9a-fA-F]{1,6}|[A-Za-z][A-Za-z0-9]{1,31});')
+
+
+def _decode_entity(match):
+    decoded = html.unescape(match.group(0))
+    return ' ' if decoded.isspace() else decoded
+
+
+class TextNormalizer:
+    """
+    Single-pass text normalization for extracted content.
+
+    One compiled regex handles whitespace collapse, HTML tag removal,
+    whitespace entities and sentence spacing, with a constant replacement
+    template so the substitution never calls back into Python. A leading
+    lookahead on the few characters that can start a match lets the scan
+    skip ordinary text quickly. Other HTML entities are decoded afterwards,
+    only for text that contains '&'. Unicode normalization runs first and is
+    skipped for ASCII text.
+    """
+    def __init__(self, unicode_form="NFC", decode_entities=True, strip_tags=True,
+                 fix_sentence_spacing=True):
+        """
+        Build the normalizer.
+
+        Args:
+            unicode_form: Unicode normalization form or None to skip it. NFC only composes
+                          characters; NFKC also folds compatibility characters ("x²" -> "x2")
+            decode_entities: Whether to decode HTML entities such as &amp; and &#39;
+            strip_tags: Whether to replace leftover tags of known HTML elements with a space
+            fix_sentence_spacing: Whether to add a space after periods followed by a capital letter
+        """
+        self.unicode_form = unicode_form
+        self.decode_entities = decode_entities
+
+        alternatives = []
+        first_chars = r'\s'
+        if strip_tags:
+            alternatives.append(TAG_ALTERNATIVE)
+            first_chars += '<'
+        if decode_entities:
+            alternatives.append(SPACE_ENTITY_ALTERNATIVE)
+            first_chars += '&'
+        alternatives.append(WHITESPACE_ALTERNATIVE)
+
+        pattern = '(?:' + '|'.join(alternatives) + ')'
+        self._template = ' '
+        if fix_sentence_spacing:
+            pattern += '|' + SENTENCE_ALTERNATIVE
+            first_chars += '.'
+            self._template = r'\1 '
+
+        self._pattern = re.compile(f'(?=[{first_chars}])(?:{pattern})')
+
+    def config(self):
+        """Describe the settings that influence output, for keying caches."""
+        return {'unicode_form': self.unicode_form, 'decode_entities': self.decode_entities,
+                'pattern': self._pattern.pattern}
+
+    def normalize(self, text):
+        """
+        Normalize text in a single scan.
+
+        Args:
+            text: Text to normalize
+
+        Returns:
+            Normalized text with collapsed whitespace and no leading/trailing space
+        """
+        if not text:
+            return ""
+
+        if self.unicode_form and not text.isascii():
+            text = unicodedata.normalize(self.unicode_form, text)
+
+        text = self._pattern.sub(self._template, text)
+
+        if self.decode_entities and '&' in text:
+            text = ENTITY_PATTERN.sub(_decode_entity, text)
+
+        return text.strip()
+
+    __call__ = normalize
+
+
+# Normalizer with the default settings used across the scraper
+default_normalizer = TextNormalizer()
+
+
+def normalize_text(text):
+    """
+    Normalize text with the default settings.
+
+    Args:
+        text: Text to normalize
+
+    Returns:
+        Normalized text
+    """
+    return default_normalizer.normalize(text)
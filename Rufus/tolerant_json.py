@@ -0,0 +1,223 @@
+import json
+import re
+from logger import logger
+
+WHITESPACE_PATTERN = re.compile(r'(?:\s+|//[^\n]*|/\*.*?(?:\*/|$))+', re.DOTALL)
+BARE_VALUE_PATTERN = re.compile(r'[^,\]\}\n]*')
+BARE_KEY_PATTERN = re.compile(r'[^:,\]\}\n]*')
+STRING_SPECIAL = {'"': re.compile(r'["\\]'), "'": re.compile(r"['\\]")}
+LITERALS = {"true": True, "false": False, "null": None, "True": True, "False": False, "None": None}
+ESCAPES = {'"': '"', "'": "'", "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+# Characters that may follow a closing quote; any other quote is part of the text
+STRING_END_FOLLOWERS = {
+    "key": ":",
+    "value": ",}]",
+}
+
+
+class _RepairParser:
+    """Recursive-descent JSON parser that tolerates the mistakes models make."""
+    def __init__(self, text):
+        self.text = text
+        self.pos = 0
+        self.repairs = 0
+
+    def skip(self):
+        match = WHITESPACE_PATTERN.match(self.text, self.pos)
+        if match:
+            self.pos = match.end()
+
+    def at_end(self):
+        self.skip()
+        return self.pos >= len(self.text)
+
+    def value(self):
+        if self.at_end():
+            self.repairs += 1
+            return None
+
+        char = self.text[self.pos]
+        if char == "{":
+            return self.object()
+        if char == "[":
+            return self.array()
+        if char in STRING_SPECIAL:
+            return self.string("value")
+        return self.bare(BARE_VALUE_PATTERN)
+
+    def object(self):
+        self.pos += 1
+        result = {}
+        while True:
+            if self.at_end():
+                # Truncated output: close the object
+                self.repairs += 1
+                return result
+
+            char = self.text[self.pos]
+            if char == "}":
+                self.pos += 1
+                return result
+            if char in ",;":
+                self.pos += 1
+                continue
+            if char == "]":
+                # Mismatched bracket
+                self.repairs += 1
+                self.pos += 1
+                return result
+
+            if char in STRING_SPECIAL:
+                key = self.string("key")
+            else:
+                key = self.bare(BARE_KEY_PATTERN, literal=False)
+                if not key:
+                    # Unparseable character where a key should be
+                    self.repairs += 1
+                    self.pos += 1
+                    continue
+
+            if self.at_end():
+                self.repairs += 1
+                return result
+            if self.text[self.pos] == ":":
+                self.pos += 1
+            else:
+                self.repairs += 1
+
+            if self.at_end() or self.text[self.pos] in ",}":
+                # Key without a value
+                self.repairs += 1
+                continue
+            result[str(key)] = self.value()
+
+    def array(self):
+        self.pos += 1
+        result = []
+        while True:
+            if self.at_end():
+                self.repairs += 1
+                return result
+
+            char = self.text[self.pos]
+            if char == "]":
+                self.pos += 1
+                return result
+            if char == ",":
+                self.pos += 1
+                continue
+            if char == "}":
+                self.repairs += 1
+                self.pos += 1
+                return result
+            result.append(self.value())
+
+    def string(self, role):
+        quote = self.text[self.pos]
+        if quote != '"':
+            self.repairs += 1
+        special = STRING_SPECIAL[quote]
+        followers = STRING_END_FOLLOWERS[role]
+        self.pos += 1
+        parts = []
+
+        while True:
+            match = special.search(self.text, self.pos)
+            if match is None:
+                # Truncated output: close the string
+                self.repairs += 1
+                parts.append(self.text[self.pos:])
+                self.pos = len(self.text)
+                return "".join(parts)
+
+            parts.append(self.text[self.pos:match.start()])
+            self.pos = match.end()
+
+            if match.group() == "\\":
+                parts.append(self._escape())
+                continue
+
+            # A quote only closes the string if what follows fits; otherwise it is
+            # an unescaped quote (or an apostrophe) inside the text
+            end = self.pos
+            self.skip()
+            if self.pos >= len(self.text) or self.text[self.pos] in followers:
+                return "".join(parts)
+            if role == "value" and self.text[self.pos] in STRING_SPECIAL and "\n" in self.text[end:self.pos]:
+                # Missing comma before the next key on a new line
+                self.repairs += 1
+                return "".join(parts)
+            self.repairs += 1
+            parts.append(self.text[end - 1:self.pos])
+
+    def _escape(self):
+        if self.pos >= len(self.text):
+            return ""
+        char = self.text[self.pos]
+        self.pos += 1
+        if char in ESCAPES:
+            return ESCAPES[char]
+        if char == "u":
+            digits = self.text[self.pos:self.pos + 4]
+            try:
+                code = int(digits, 16)
+                self.pos += 4
+                return chr(code)
+            except ValueError:
+                pass
+        self.repairs += 1
+        return char
+
+    def bare(self, pattern, literal=True):
+        match = pattern.match(self.text, self.pos)
+        self.pos = match.end()
+        token = match.group().strip()
+        if not literal:
+            self.repairs += 1
+            return token.strip("'\"")
+
+        if token in LITERALS:
+            if token not in ("true", "false", "null"):
+                self.repairs += 1
+            return LITERALS[token]
+        try:
+            return json.loads(token)
+        except ValueError:
+            # Unquoted text value
+            self.repairs += 1
+            return token
+
+
+def repair_json(text):
+    """
+    Parse JSON, repairing the errors models commonly produce.
+
+    Handles text around the JSON, unquoted keys, single-quoted strings,
+    unescaped quotes inside strings, trailing or missing commas, comments,
+    Python literals and output truncated mid-document. Apostrophes and other
+    quotes inside the content are kept intact.
+
+    Args:
+        text: Model output containing a JSON object or array
+
+    Returns:
+        Parsed object or list
+
+    Raises:
+        ValueError: If the text contains no JSON object or array
+    """
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+
+    starts = [position for position in (text.find("{"), text.find("[")) if position >= 0]
+    if not starts:
+        raise ValueError("No JSON object or array found")
+
+    parser = _RepairParser(text)
+    parser.pos = min(starts)
+    result = parser.value()
+    logger.debug(f"Repaired JSON with {parser.repairs} fixes")
+    return result
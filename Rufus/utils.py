@@ -1,7 +1,14 @@
 from urllib.parse import urljoin, urlparse
 from logger import logger
+import importlib
+import importlib.util
 import re
 
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+# Optional dependencies already reported as missing
+_reported_missing = set()
+
 def normalize_url(href, base):
     """
     Normalize relative URLs against a base URL and return a complete URL.
@@ -65,7 +72,42 @@ def is_same_domain(url1, url2):
 def clean_text(text):
     """Clean extracted text by removing extra whitespace."""
     # Replace multiple spaces, newlines, and tabs with a single space
-    text = re.sub(r'\s+', ' ', text)
+    text = WHITESPACE_PATTERN.sub(' ', text)
     # Remove leading/trailing whitespace
     text = text.strip()
     return text
+
+def estimate_tokens(text):
+    """
+    Estimate the number of LLM tokens in a text.
+    Uses the common approximation of four characters per token.
+    """
+    if not text:
+        return 0
+    return max(1, len(text) // 4)
+
+def optional_import(name, warning=None):
+    """
+    Import an optional dependency when it is first needed rather than at startup.
+    
+    Args:
+        name: Module name, e.g. 'httpx' or 'selenium.webdriver'
+        warning: Message logged (once per module) if it is not installed
+        
+    Returns:
+        The module, or None if it is not installed
+    """
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        if warning and name not in _reported_missing:
+            _reported_missing.add(name)
+            logger.warning(warning)
+        return None
+
+def is_installed(name):
+    """Check whether a module can be imported, without importing it."""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
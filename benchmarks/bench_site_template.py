@@ -0,0 +1,64 @@
+"""Benchmark same-site extraction with and without learned site templates."""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Rufus'))
+
+from extraction_cache import ExtractionCache
+from extractor_stats import ExtractorStats
+from site_template import SiteTemplateLearner
+from scraper import extract_content_multi_method
+
+WORDS = ["energy", "policy", "grid", "solar", "storage", "market", "price", "demand",
+         "capacity", "investment", "region", "report", "analysis", "growth"]
+
+
+def make_page(n, rng):
+    paragraphs = "".join(
+        "<p>" + " ".join(rng.choice(WORDS) for _ in range(rng.randint(40, 90))) + ".</p>"
+        for _ in range(rng.randint(8, 20))
+    )
+    sidebar = "".join(f"<li><a href='/blog/post-{i}'>Related post {i}</a></li>" for i in range(30))
+    return (
+        "<html><head><title>Energy blog</title><script>var x = 1;</script></head><body>"
+        "<header><div class='logo'>Energy blog</div><nav><a href='/'>Home</a><a href='/blog'>Blog</a></nav></header>"
+        f"<div id='content'><article class='post post-{n}'><h1>Post {n}</h1>{paragraphs}"
+        "<div class='share'>Share this post on social media</div></article></div>"
+        f"<aside><ul>{sidebar}</ul></aside>"
+        "<footer>Copyright Energy blog. All rights reserved.</footer></body></html>"
+    )
+
+
+def run(pages, templates):
+    cache = ExtractionCache(max_entries=1)
+    stats = ExtractorStats(exploration_rate=0)
+    start = time.perf_counter()
+    for n, html in enumerate(pages):
+        extract_content_multi_method(html, f"https://example.com/blog/post-{n}",
+                                     cache=cache, stats=stats, templates=templates)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Site template benchmark")
+    parser.add_argument("--pages", type=int, default=200, help="Number of pages from the same site")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    pages = [make_page(n, rng) for n in range(args.pages)]
+
+    cascade = run(pages, SiteTemplateLearner(enabled=False))
+    learner = SiteTemplateLearner()
+    templated = run(pages, learner)
+
+    print(f"{args.pages} pages: cascade {cascade:.2f}s | with templates {templated:.2f}s "
+          f"| speedup {cascade / templated:.1f}x")
+    print(f"Templates: {learner.summary()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark synthesis throughput, concurrency and retries against the local mock NIM server."""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Rufus'))
+
+from artifact_writer import ArtifactWriter
+from mock_nim_server import MockNIMServer
+from synthesis_backend import SynthesisBackend
+from synthesizer import synthesize_document
+
+WORDS = ["energy", "policy", "grid", "solar", "storage", "market", "price", "demand",
+         "capacity", "investment", "region", "report", "analysis", "growth"]
+
+
+def make_pages(job, pages=5, words=300):
+    return {
+        f"https://example.com/job{job}/page{n}": " ".join(WORDS[(job + n + i) % len(WORDS)] for i in range(words)) + "."
+        for n in range(pages)
+    }
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthesis benchmark against a local mock NIM server")
+    parser.add_argument("--jobs", type=int, default=40, help="Number of synthesis jobs")
+    parser.add_argument("--workers", type=int, default=16, help="Concurrent callers")
+    parser.add_argument("--concurrency", type=int, default=8, help="Backend concurrency cap")
+    parser.add_argument("--latency", type=float, default=0.2, help="Mock time to first token in seconds")
+    parser.add_argument("--tokens-per-second", type=float, default=500, help="Mock completion token rate")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.1, help="Fraction of requests answered with 429")
+    parser.add_argument("--retry-after", type=float, default=0.2, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--requests-per-minute", type=int, default=None, help="Backend request limit")
+    args = parser.parse_args()
+
+    server = MockNIMServer(latency=args.latency, tokens_per_second=args.tokens_per_second,
+                           rate_limit_rate=args.rate_limit_rate, retry_after=args.retry_after).start()
+    backend = SynthesisBackend(api_key="benchmark", base_url=server.base_url, max_concurrency=args.concurrency,
+                               requests_per_minute=args.requests_per_minute, base_delay=0.1)
+    writer = ArtifactWriter(enabled=False)
+    output_dir = tempfile.mkdtemp()
+
+    def job(n):
+        start = time.perf_counter()
+        document = synthesize_document(make_pages(n), "Summarize the market", "benchmark", output_dir=output_dir,
+                                       writer=writer, backend=backend)
+        return time.perf_counter() - start, "error" not in document
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        results = list(executor.map(job, range(args.jobs)))
+    elapsed = time.perf_counter() - start
+
+    backend.close()
+    server.stop()
+
+    latencies = [latency for latency, _ in results]
+    succeeded = sum(ok for _, ok in results)
+    stats = server.stats()
+    print(f"{args.jobs} jobs in {elapsed:.2f}s | {args.jobs / elapsed:.1f} jobs/s | {succeeded} succeeded")
+    print(f"Latency p50 {percentile(latencies, 0.5):.2f}s | p95 {percentile(latencies, 0.95):.2f}s")
+    print(f"Server: {stats['requests']} requests, {stats['rate_limited']} rate limited, "
+          f"peak concurrency {stats['peak_concurrency']} | backend retries {backend.retries}")
+
+
+if __name__ == "__main__":
+    main()
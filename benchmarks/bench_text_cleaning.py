@@ -0,0 +1,60 @@
+"""Benchmark the single-pass text normalizer against the previous clean_text pipeline."""
+
+import argparse
+import os
+import random
+import re
+import sys
+import timeit
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Rufus'))
+
+from text_normalizer import normalize_text
+
+
+def legacy_clean_text(text):
+    """The pipeline used before text_normalizer: four full passes with uncompiled patterns."""
+    if not text:
+        return ""
+    text = re.sub(r'\s+', ' ', text)
+    text = text.strip()
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'&[a-zA-Z]+;', ' ', text)
+    text = re.sub(r'\.([A-Z])', '. \\1', text)
+    return text.strip()
+
+
+def make_page(size_bytes, seed=0):
+    """Build extracted-looking text with paragraphs, entities and the odd missing space."""
+    rng = random.Random(seed)
+    words = ["climate", "policy", "energy", "the", "of", "and", "solar", "wind",
+             "report", "data", "café", "naïve", "results", "growth"]
+    pieces = []
+    size = 0
+    while size < size_bytes:
+        sentence = " ".join(rng.choice(words) for _ in range(rng.randint(6, 18)))
+        sentence = sentence.capitalize() + rng.choice([". ", ".", ".\n\n", " &amp; ", "&nbsp; ", ".\t"])
+        pieces.append(sentence)
+        size += len(sentence)
+    return "".join(pieces)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Text cleaning benchmark")
+    parser.add_argument("--size-mb", type=float, default=4.0, help="Size of the synthetic page in MB")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of timed runs")
+    args = parser.parse_args()
+
+    text = make_page(int(args.size_mb * 1024 * 1024))
+    ascii_text = text.encode("ascii", "ignore").decode("ascii")
+
+    print(f"Page size: {len(text) / 1024 / 1024:.1f} MB")
+    for label, sample in (("mixed unicode", text), ("ascii only", ascii_text)):
+        legacy = min(timeit.repeat(lambda: legacy_clean_text(sample), number=1, repeat=args.repeat))
+        fused = min(timeit.repeat(lambda: normalize_text(sample), number=1, repeat=args.repeat))
+        print(f"{label:>14}: legacy {legacy * 1000:8.1f} ms | single-pass {fused * 1000:8.1f} ms "
+              f"| speedup {legacy / fused:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
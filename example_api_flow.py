@@ -8,8 +8,6 @@ import argparse
 # current_dir = os.path.dirname(os.path.realpath(__file__))
 # sys.path.append(os.path.join(current_dir, 'Rufus'))
 
-from Rufus.client import RufusClient
-
 
 def main():
     parser = argparse.ArgumentParser(description="Rufus Web Scraper")
@@ -23,6 +21,13 @@ def main():
                         default="INFO", help="Logging level")
     parser.add_argument("--log-file", default="rufus_scrape.log", help="Log file path")
     parser.add_argument("--output-dir", default="outputs", help="Directory for output files")
+    parser.add_argument("--serve", action="store_true",
+                        help="Run as a local scrape service with a job queue and warm workers")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface the service listens on")
+    parser.add_argument("--port", type=int, default=8765, help="Port the service listens on")
+    parser.add_argument("--workers", type=int, default=2, help="Number of warm worker processes")
+    parser.add_argument("--threads", type=int, default=2, help="Jobs each worker runs at once")
+    parser.add_argument("--queue-db", default="rufus_jobs.db", help="SQLite database of the job queue")
     
     args = parser.parse_args()
     
@@ -33,6 +38,10 @@ def main():
     api_key = os.getenv('Rufus_API_KEY', 'dummy_api_key')
     nim_api_key = os.getenv('NVIDIA_NIM_API_KEY', 'dummy_nvidia_nim_api_key')
     
+    if args.serve:
+        serve(args, api_key, nim_api_key, log_level)
+        return
+    
     print(f"Starting web scraping of {args.url}")
     print(f"Instructions: '{args.instructions}'")
     print(f"Maximum depth: {args.depth}, Maximum pages: {args.pages}")
@@ -41,6 +50,9 @@ def main():
     print(f"Output directory: {args.output_dir}")
     print("-------------------------")
     
+    # Imported here so `--help` answers without loading the scraping stack
+    from Rufus.client import RufusClient
+    
     # Initialize client with configuration
     client = RufusClient(
         api_key=api_key,
@@ -63,5 +75,30 @@ def main():
     print(f"\nComplete log available in: {args.log_file}")
     print(f"Output files stored in: {args.output_dir}")
 
+def serve(args, api_key, nim_api_key, log_level):
+    """Run the scrape service until interrupted; the crawl options become the defaults of every job."""
+    from Rufus.service import ScrapeService
+    
+    service = ScrapeService(
+        db_path=args.queue_db,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        threads_per_worker=args.threads,
+        client_options={
+            "api_key": api_key,
+            "nim_api_key": nim_api_key,
+            "log_level": log_level,
+            "log_file": args.log_file,
+            "use_selenium": args.selenium,
+            "max_depth": args.depth,
+            "max_pages": args.pages,
+            "output_dir": args.output_dir,
+        }
+    )
+    print(f"Rufus scrape service on {service.base_url} with {args.workers} workers (queue: {args.queue_db})")
+    print("Submit jobs with POST /jobs, poll GET /jobs/<id>, fetch GET /jobs/<id>/result")
+    service.serve_forever()
+
 if __name__ == "__main__":
     main()
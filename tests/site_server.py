@@ -0,0 +1,38 @@
+"""Local HTTP site shared by the tests that crawl real sockets."""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class SiteHandler(BaseHTTPRequestHandler):
+    """Serves the pages in `pages`, or `page_for(path)` for the rest, and 404 otherwise."""
+    pages = {}
+    delay = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def page_for(self, path):
+        return None
+
+    def do_GET(self):
+        time.sleep(self.delay)
+        body = self.pages.get(self.path)
+        if body is None:
+            body = self.page_for(self.path)
+        payload = (body if body is not None else "Not found").encode("utf-8")
+        self.send_response(200 if body is not None else 404)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def start_site(test, handler):
+    """Serve handler on a free local port for the duration of a test."""
+    site = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    site.daemon_threads = True
+    threading.Thread(target=site.serve_forever, daemon=True).start()
+    test.addCleanup(site.server_close)
+    test.addCleanup(site.shutdown)
+    return f"http://127.0.0.1:{site.server_address[1]}"
@@ -0,0 +1,146 @@
+import unittest
+import os
+import sys
+import json
+import time
+import tempfile
+import shutil
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from artifact_store import ArtifactStore, request_key
+from artifact_writer import ArtifactWriter
+from mock_nim_server import MockNIMServer
+from synthesis_backend import SynthesisBackend
+from synthesizer import synthesize_document
+
+PAGES = {
+    "https://example.com/a": "Solar panels convert sunlight into electricity.",
+    "https://example.com/b": "Inverters convert direct current into alternating current.",
+}
+
+
+class TestArtifactStore(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        self.store = ArtifactStore(self.root)
+        self.addCleanup(self.store.close)
+
+    def test_content_addressed_and_deduplicated(self):
+        """Test that identical content is stored once, compressed, and read back intact"""
+        text = "Solar panels convert sunlight into electricity. " * 500
+        first = self.store.record("content", text, ["https://example.com"], "Solar", job_id="job-1")
+        second = self.store.record("content", text, ["https://example.com"], "Solar", job_id="job-2")
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.store.get(first).decode("utf-8"), text)
+        self.assertTrue(os.path.exists(self.store.object_path(first)))
+
+        stats = self.store.stats()
+        self.assertEqual(stats["records"], 2)
+        self.assertEqual(stats["objects"], 1)
+        self.assertLess(stats["stored_bytes"], stats["bytes"] / 10)
+        self.assertIsNone(self.store.get("0" * 64))
+
+    def test_lookup(self):
+        """Test lookups by job ID and by URL set and instructions"""
+        self.store.record("document", json.dumps({"title": "Old"}), ["https://b.com", "https://a.com"], "Solar",
+                          job_id="job-1")
+        self.store.record("document", json.dumps({"title": "New"}), ["https://a.com", "https://b.com"], "Solar",
+                          job_id="job-2")
+
+        # The URL set is unordered, and the latest artifact of a request wins
+        self.assertEqual(self.store.load(["https://b.com", "https://a.com"], "Solar"), {"title": "New"})
+        self.assertEqual(self.store.load(job_id="job-1"), {"title": "Old"})
+        self.assertEqual(self.store.lookup(job_id="job-1")["urls"], ["https://a.com", "https://b.com"])
+        self.assertIsNone(self.store.load(["https://a.com"], "Solar"))
+        self.assertIsNone(self.store.load(job_id="job-1", kind="content"))
+        self.assertEqual(request_key(["x", "y"], "i"), request_key(["y", "x", "x"], "i"))
+
+    def test_prune(self):
+        """Test that the retention policy removes old records and the objects only they used"""
+        old = self.store.record("document", "old document", ["https://a.com"], job_id="old")
+        kept = self.store.record("document", "new document", ["https://b.com"], job_id="new")
+        # Age the first record past the retention period
+        self.store._conn().execute("UPDATE records SET created_at = ? WHERE job_id = 'old'",
+                                   (time.time() - 10 * 24 * 3600,))
+
+        removed = self.store.prune(retention_days=7)
+        self.assertEqual((removed["records"], removed["objects"]), (1, 1))
+        self.assertFalse(os.path.exists(self.store.object_path(old)))
+        self.assertIsNone(self.store.lookup(job_id="old"))
+        self.assertEqual(self.store.get(kept), b"new document")
+
+        # A size limit removes the oldest records first
+        self.store.record("document", os.urandom(4096).hex(), ["https://c.com"], job_id="large")
+        self.store.prune(max_bytes=self.store.stats()["stored_bytes"] - 1)
+        self.assertIsNone(self.store.lookup(job_id="new"))
+        self.assertIsNotNone(self.store.lookup(job_id="large"))
+
+    def test_record_races_prune(self):
+        """Test that a record never points at an object a concurrent prune removed"""
+        stop = threading.Event()
+
+        def prune():
+            while not stop.is_set():
+                self.store.prune()
+            self.store.close()
+
+        pruner = threading.Thread(target=prune)
+        pruner.start()
+        try:
+            for n in range(1000):
+                digest = self.store.record("content", "shared text", ["https://a.com"], job_id=f"job-{n}")
+                self.assertEqual(self.store.get(digest), b"shared text")
+                # Drop the record again, leaving the object unused for the pruner
+                self.store._conn().execute("DELETE FROM records WHERE job_id = ?", (f"job-{n}",))
+        finally:
+            stop.set()
+            pruner.join()
+
+    def test_writer_path_of_stored_object(self):
+        """Test that the writer returns the path of an object stored with another codec"""
+        digest = self.store.put("stored before")
+        other = ArtifactStore(self.root, compression="none")
+        self.addCleanup(other.close)
+        self.assertNotEqual(other.object_path(digest), self.store.object_path(digest))
+
+        path = ArtifactWriter(store=other).write_text("unused.txt", "stored before")
+        self.assertEqual(path, self.store.object_path(digest))
+        self.assertTrue(os.path.exists(path))
+
+    def test_writer_uses_store(self):
+        """Test that an ArtifactWriter with a store indexes artifacts instead of writing their paths"""
+        output_dir = os.path.join(self.root, "outputs")
+        writer = ArtifactWriter(store=self.store)
+        record = {"kind": "document", "urls": ["https://example.com"], "instructions": "Solar", "job_id": "job-1"}
+        path = writer.write_json(os.path.join(output_dir, "doc.json"), {"title": "Doc"}, record=record)
+        writer.flush()
+
+        self.assertFalse(os.path.exists(output_dir))
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(self.store.load(["https://example.com"], "Solar"), {"title": "Doc"})
+
+    def test_synthesize_document_records_artifacts(self):
+        """Test that concurrent-looking runs are kept apart by job ID and found again by request"""
+        server = MockNIMServer().start()
+        self.addCleanup(server.stop)
+        backend = SynthesisBackend(api_key="test-key", base_url=server.base_url, requests_per_minute=None)
+        self.addCleanup(backend.close)
+        writer = ArtifactWriter(store=self.store)
+
+        for job_id in ("job-1", "job-2"):
+            document = synthesize_document(PAGES, "Summarize", "test-key", writer=writer, backend=backend,
+                                           job_id=job_id, source_urls=["https://example.com"])
+        writer.flush()
+
+        self.assertEqual(self.store.load(job_id="job-1"), document)
+        self.assertEqual(self.store.load(["https://example.com"], "Summarize"), document)
+        self.assertIn("Solar panels", self.store.load(job_id="job-2", kind="content"))
+        # Both runs produced the same content and document, stored once each
+        self.assertEqual(self.store.stats()["objects"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
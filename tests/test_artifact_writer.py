@@ -0,0 +1,75 @@
+import unittest
+import os
+import sys
+import gc
+import gzip
+import json
+import shutil
+import tempfile
+import weakref
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from artifact_writer import ArtifactWriter
+
+
+class TestArtifactWriter(unittest.TestCase):
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    def test_background_writes(self):
+        """Test that queued artifacts are on disk after a flush"""
+        writer = ArtifactWriter()
+        data = {"title": "Doc"}
+        text_path = writer.write_text(os.path.join(self.output_dir, "sub", "content.txt"), "hello " * 1000)
+        json_path = writer.write_json(os.path.join(self.output_dir, "doc.json"), data)
+
+        # Later changes to the data do not leak into the artifact
+        data["title"] = "Changed"
+        writer.flush()
+
+        with open(text_path, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "hello " * 1000)
+        with open(json_path, encoding="utf-8") as f:
+            self.assertEqual(json.load(f), {"title": "Doc"})
+        self.assertEqual(sorted(os.listdir(self.output_dir)), ["doc.json", "sub"])
+
+    def test_compressed(self):
+        """Test gzip-compressed artifacts"""
+        writer = ArtifactWriter(compress=True)
+        path = writer.write_text(os.path.join(self.output_dir, "content.txt"), "compressed text")
+        writer.flush()
+
+        self.assertTrue(path.endswith("content.txt.gz"))
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            self.assertEqual(f.read(), "compressed text")
+
+    def test_close_stops_thread(self):
+        """Test that close() writes pending artifacts, stops the thread and lets the writer be collected"""
+        writer = ArtifactWriter()
+        path = writer.write_text(os.path.join(self.output_dir, "content.txt"), "text")
+        thread = writer._thread
+        writer.close()
+
+        self.assertFalse(thread.is_alive())
+        with open(path, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "text")
+
+        # The exit hook does not keep closed writers alive
+        ref = weakref.ref(writer)
+        del writer
+        gc.collect()
+        self.assertIsNone(ref())
+
+    def test_disabled(self):
+        """Test that a disabled writer writes nothing"""
+        writer = ArtifactWriter(enabled=False)
+        self.assertIsNone(writer.write_text(os.path.join(self.output_dir, "content.txt"), "text"))
+        writer.flush()
+        self.assertEqual(os.listdir(self.output_dir), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
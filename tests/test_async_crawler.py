@@ -0,0 +1,88 @@
+import unittest
+import os
+import sys
+import asyncio
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from async_crawler import AsyncWebCrawler
+from rate_limiter import AsyncRateLimiter
+from site_server import SiteHandler, start_site
+
+SITE = {
+    "/": '<html><body><h1>Home</h1><a href="/a">A</a><a href="/b">B</a><a href="/private/x">X</a></body></html>',
+    "/a": '<html><body><h1>A</h1><a href="/">Home</a></body></html>',
+    "/b": '<html><body><h1>B</h1></body></html>',
+    "/private/x": '<html><body><h1>Private</h1></body></html>',
+    "/robots.txt": "User-agent: *\nDisallow: /private/\n",
+}
+
+
+class CrawlSite(SiteHandler):
+    pages = SITE
+
+
+class TestAsyncCrawler(unittest.TestCase):
+    def test_crawl_respects_robots(self):
+        """Test that the async crawler follows links and skips disallowed pages"""
+        base = start_site(self, CrawlSite)
+
+        async def crawl():
+            crawler = AsyncWebCrawler(requests_per_minute=600)
+            try:
+                return await crawler.crawl(base + "/", max_depth=1, max_pages=10)
+            finally:
+                await crawler.aclose()
+
+        pages = asyncio.run(crawl())
+        self.assertEqual(set(pages), {base + "/", base + "/a", base + "/b"})
+        self.assertIn("<h1>A</h1>", pages[base + "/a"])
+
+    def test_crawls_run_concurrently_and_cancel(self):
+        """Test that crawls overlap on one event loop and can be cancelled"""
+        base = start_site(self, CrawlSite)
+        CrawlSite.delay = 0.2
+        self.addCleanup(setattr, CrawlSite, "delay", 0.0)
+
+        async def run():
+            limiter = AsyncRateLimiter(requests_per_minute=600)
+            crawlers = [AsyncWebCrawler(rate_limiter=limiter, respect_robots=False) for _ in range(4)]
+            start = time.monotonic()
+            await asyncio.gather(*(crawler.crawl(base + "/b", max_depth=0) for crawler in crawlers))
+            elapsed = time.monotonic() - start
+
+            task = asyncio.ensure_future(crawlers[0].crawl(base + "/", max_depth=1))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            for crawler in crawlers:
+                await crawler.aclose()
+            return elapsed
+
+        self.assertLess(asyncio.run(run()), 0.6)
+
+    def test_async_rate_limiter(self):
+        """Test that the async limiter waits for a slot without blocking other tasks"""
+        limiter = AsyncRateLimiter(requests_per_minute=1)
+        limiter.window_size = 0.2
+        ticks = []
+
+        async def ticker():
+            for _ in range(3):
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.05)
+
+        async def run():
+            await limiter.wait_if_needed("example.com")
+            start = time.monotonic()
+            await asyncio.gather(limiter.wait_if_needed("example.com"), ticker())
+            return time.monotonic() - start
+
+        self.assertGreaterEqual(asyncio.run(run()), 0.2)
+        self.assertEqual(len(ticks), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chunker import iter_passages, chunk_pages, extract_headings, passage_id
+
+TEXT = ("Introduction This guide covers solar panels. Panels convert light into power. "
+        "Installation Mount the panels facing south. Connect the inverter. Check the wiring!")
+HEADINGS = ["Introduction", "Installation"]
+
+
+class TestChunker(unittest.TestCase):
+    def test_offsets_and_ids(self):
+        """Test that offsets point into the source text and IDs are content hashes"""
+        passages = list(iter_passages(TEXT, url="https://example.com", max_tokens=200))
+
+        self.assertEqual(len(passages), 1)
+        for passage in passages:
+            self.assertEqual(TEXT[passage["start"]:passage["end"]], passage["text"])
+            self.assertEqual(passage["id"], passage_id(passage["text"]))
+            self.assertEqual(passage["url"], "https://example.com")
+
+    def test_heading_boundaries(self):
+        """Test that passages never cross a heading"""
+        passages = list(iter_passages(TEXT, max_tokens=200, headings=HEADINGS))
+
+        self.assertEqual([p["heading"] for p in passages], HEADINGS)
+        self.assertTrue(passages[0]["text"].endswith("into power."))
+        self.assertTrue(passages[1]["text"].startswith("Installation"))
+
+    def test_token_budget(self):
+        """Test that passages hold whole sentences within the token budget"""
+        passages = list(iter_passages(TEXT, max_tokens=12, headings=HEADINGS))
+
+        self.assertGreater(len(passages), 2)
+        for passage in passages:
+            self.assertLessEqual(len(passage["text"]), 12 * 4)
+            self.assertEqual(TEXT[passage["start"]:passage["end"]], passage["text"])
+        self.assertIn("Connect the inverter. Check the wiring!", [p["text"] for p in passages])
+
+        # A sentence longer than the budget is split at word boundaries
+        long_passages = list(iter_passages("word " * 100, max_tokens=10))
+        self.assertTrue(all(len(p["text"]) <= 40 for p in long_passages))
+        self.assertEqual(" ".join(p["text"] for p in long_passages), ("word " * 100).strip())
+
+    def test_chunk_pages_dedup(self):
+        """Test that passages repeated across pages are only produced once"""
+        shared = "Subscribe to our newsletter for weekly updates."
+        pages = {
+            "https://example.com/a": f"Page A talks about wind turbines. {shared}",
+            "https://example.com/b": f"Page B talks about hydro dams. {shared}",
+        }
+
+        passages = list(chunk_pages(pages, max_tokens=12))
+        texts = [p["text"] for p in passages]
+        self.assertEqual(texts.count(shared), 1)
+        self.assertEqual(len(list(chunk_pages(pages, max_tokens=12, dedup=False))), len(passages) + 1)
+
+    def test_extract_headings(self):
+        """Test heading extraction from HTML"""
+        html = "<h1>Main <em>title</em></h1><p>text</p><h2 class='x'>Second&amp;more</h2>"
+        self.assertEqual(extract_headings(html), ["Main title", "Second&more"])
+
+
+if __name__ == "__main__":
+    unittest.main()
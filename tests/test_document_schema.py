@@ -0,0 +1,96 @@
+import unittest
+import os
+import sys
+import json
+from types import SimpleNamespace
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from document_schema import validate_document, REQUIRED_FIELDS
+from synthesis_backend import SynthesisBackend
+from synthesizer import _synthesize
+
+DOCUMENT = {
+    "title": "Solar",
+    "summary": "Panels and inverters.",
+    "key_points": ["one", "two"],
+    "content_sections": [{"heading": "Intro", "content": "Text"}],
+    "metadata": {"source_count": 2},
+}
+
+
+class ScriptedClient:
+    """Chat client that answers with a list of responses in turn and records the requests"""
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **request):
+        self.requests.append(request)
+        message = SimpleNamespace(content=self.responses.pop(0))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+class TestDocumentSchema(unittest.TestCase):
+    def test_valid_document(self):
+        """Test that a complete document passes with extra fields kept"""
+        document, invalid = validate_document(dict(DOCUMENT, faq=[{"question": "Q", "answer": "A"}], extra=1))
+        self.assertEqual(invalid, [])
+        self.assertEqual(document["faq"], [{"question": "Q", "answer": "A"}])
+        self.assertEqual(document["extra"], 1)
+
+    def test_invalid_and_missing_fields(self):
+        """Test that only the failing fields are reported and removed"""
+        broken = dict(DOCUMENT, key_points="one, two", content_sections=[{"heading": "Intro"}])
+        del broken["summary"]
+        document, invalid = validate_document(broken)
+        self.assertEqual(sorted(invalid), ["content_sections", "key_points", "summary"])
+        self.assertEqual(document, {"title": "Solar", "metadata": {"source_count": 2}})
+        self.assertEqual(set(REQUIRED_FIELDS), {"title", "summary", "key_points", "content_sections"})
+
+    def test_special_responses_pass(self):
+        """Test that status replies are not validated as documents"""
+        for response in ({"response": "NO WEB CONTENT"}, {"error": "boom"}, {"content": "x", "parse_error": "y"}):
+            self.assertEqual(validate_document(response), (response, []))
+
+    def test_reask_only_invalid_fields(self):
+        """Test that a targeted follow-up asks for just the failing fields and merges them"""
+        first = dict(DOCUMENT, key_points="one, two")
+        del first["summary"]
+        client = ScriptedClient([
+            json.dumps(first),
+            json.dumps({"summary": "Panels and inverters.", "key_points": ["one", "two"]}),
+        ])
+
+        document = _synthesize(SynthesisBackend(client=client), "test-model", "Summarize this")
+
+        self.assertEqual(document, DOCUMENT)
+        self.assertEqual(len(client.requests), 2)
+        follow_up = client.requests[1]["messages"]
+        self.assertEqual(len(follow_up), 3)
+        self.assertEqual(follow_up[1]["role"], "assistant")
+        self.assertIn("- key_points", follow_up[2]["content"])
+        self.assertIn("- summary", follow_up[2]["content"])
+        self.assertNotIn("- title", follow_up[2]["content"])
+
+    def test_failed_reask_keeps_valid_fields(self):
+        """Test that a useless follow-up leaves the valid part of the document"""
+        client = ScriptedClient([json.dumps({"title": "Solar"}), "sorry"])
+        document = _synthesize(SynthesisBackend(client=client), "test-model", "Summarize this")
+        self.assertEqual(document, {"title": "Solar"})
+
+    def test_unfixed_fields_keep_original_values(self):
+        """Test that fields a failed or useless follow-up does not fix keep what the model first returned"""
+        key_points = [{"point": "Panels convert sunlight"}, {"point": "Inverters convert current"}]
+        first = json.dumps(dict(DOCUMENT, key_points=key_points))
+
+        for follow_up in ("sorry", json.dumps({"key_points": "still not a list"}), ""):
+            with self.subTest(follow_up=follow_up):
+                client = ScriptedClient([first, follow_up])
+                document = _synthesize(SynthesisBackend(client=client), "test-model", "Summarize this")
+                self.assertEqual(document["key_points"], key_points)
+                self.assertEqual(document["title"], "Solar")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extraction_cache import ExtractionCache
+
+class TestExtractionCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.html = "<html><body><p>Some page content that is long enough to extract.</p></body></html>"
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_memory_tier_round_trip(self):
+        """Test that stored results are returned with the winning method"""
+        cache = ExtractionCache()
+        self.assertIsNone(cache.get(self.html))
+
+        cache.put(self.html, "Some page content", "trafilatura")
+        entry = cache.get(self.html)
+
+        self.assertEqual(entry["text"], "Some page content")
+        self.assertEqual(entry["method"], "trafilatura")
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.misses, 1)
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first"""
+        cache = ExtractionCache(max_entries=2)
+        cache.put("page one", "one", "raw")
+        cache.put("page two", "two", "raw")
+        cache.get("page one")
+        cache.put("page three", "three", "raw")
+
+        self.assertIsNotNone(cache.get("page one"))
+        self.assertIsNone(cache.get("page two"))
+        self.assertIsNotNone(cache.get("page three"))
+
+    def test_disk_tier_survives_new_instance(self):
+        """Test that results persist across cache instances"""
+        ExtractionCache(cache_dir=self.temp_dir).put(self.html, "Persisted text", "readability")
+
+        entry = ExtractionCache(cache_dir=self.temp_dir).get(self.html)
+        self.assertEqual(entry, {"text": "Persisted text", "method": "readability"})
+
+    def test_config_change_invalidates_entries(self):
+        """Test that a different extractor configuration produces different keys"""
+        ExtractionCache(cache_dir=self.temp_dir, config={"goose": True}).put(self.html, "text", "goose")
+
+        cache = ExtractionCache(cache_dir=self.temp_dir, config={"goose": False})
+        self.assertIsNone(cache.get(self.html))
+
+if __name__ == '__main__':
+    unittest.main()
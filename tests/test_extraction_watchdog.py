@@ -0,0 +1,152 @@
+import unittest
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from unittest.mock import patch
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extraction_watchdog import ExtractionWatchdog, PageBudget, OK, TIMEOUT, truncate_html
+from extraction_cache import ExtractionCache
+from extractor_stats import ExtractorStats
+from extractors import ExtractorRegistry
+from scraper import _run_extraction_cascade, extract_content_multi_method
+
+PAGE = (
+    "<html><head><title>Test</title></head><body><main><p>"
+    + "This page has plenty of readable text for the extractors to find. " * 5
+    + "</p></main></body></html>"
+)
+
+
+def slow_extract(self, html):
+    time.sleep(30)
+    return "never"
+
+
+def one_second_extract(self, html):
+    time.sleep(1)
+    return "done"
+
+
+class ShoutingRegistry(ExtractorRegistry):
+    """Registry with its own behavior, to check that workers run the caller's registry."""
+    def _extract_raw(self, html):
+        return "RAW TEXT FROM THE CALLER'S REGISTRY"
+
+
+@unittest.skipUnless("fork" in multiprocessing.get_all_start_methods(), "needs the fork start method")
+class TestExtractionWatchdog(unittest.TestCase):
+    def setUp(self):
+        self.registry = ExtractorRegistry(extractors=['raw', 'beautifulsoup'])
+
+    def make_watchdog(self, **kwargs):
+        watchdog = ExtractionWatchdog(mp_context=multiprocessing.get_context("fork"), **kwargs)
+        self.addCleanup(watchdog.close)
+        return watchdog
+
+    def test_truncate_html(self):
+        """Test that truncation cuts after a complete tag"""
+        html = "<p>one</p><p>two</p><p>three</p>"
+        self.assertEqual(truncate_html(html, 12), "<p>one</p>")
+        self.assertEqual(truncate_html(html, None), html)
+        self.assertEqual(truncate_html(html, 1000), html)
+
+    def test_isolated_run_matches_in_process(self):
+        """Test that running in the worker process gives the same text"""
+        watchdog = self.make_watchdog()
+        self.assertEqual(watchdog.run(self.registry, 'raw', PAGE), (OK, self.registry.extract('raw', PAGE)))
+
+    def test_worker_runs_callers_registry(self):
+        """Test that the worker extracts with the registry it is given, not a default one"""
+        watchdog = self.make_watchdog()
+        registry = ShoutingRegistry(extractors=['raw'])
+        self.assertEqual(watchdog.run(registry, 'raw', PAGE), (OK, "RAW TEXT FROM THE CALLER'S REGISTRY"))
+        self.assertEqual(watchdog.run(self.registry, 'raw', PAGE), (OK, self.registry.extract('raw', PAGE)))
+
+    def test_concurrent_callers_do_not_queue(self):
+        """Test that threads extracting at once each get a worker and no budget is spent waiting"""
+        watchdog = self.make_watchdog(method_timeout=5)
+        results = []
+
+        def extract():
+            budget = PageBudget(1.8)
+            results.append(watchdog.run(self.registry, 'raw', PAGE, budget=budget))
+
+        with patch.object(ExtractorRegistry, '_extract_raw', one_second_extract):
+            threads = [threading.Thread(target=extract) for _ in range(3)]
+            start = time.monotonic()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.monotonic() - start
+
+        self.assertEqual(results, [(OK, "done")] * 3)
+        self.assertEqual(watchdog.timeouts, 0)
+        # One after another the three calls would take at least 3s
+        self.assertLess(elapsed, 2.5)
+
+    def test_slow_method_is_abandoned(self):
+        """Test that a hanging method times out and the cascade moves on"""
+        stats = ExtractorStats(exploration_rate=0)
+        watchdog = self.make_watchdog(method_timeout=0.5)
+
+        # The worker is forked on first use, so it inherits the slow extractor
+        with patch.object(ExtractorRegistry, '_extract_raw', slow_extract):
+            start = time.monotonic()
+            text, method, timed_out = _run_extraction_cascade(PAGE, "https://example.com/slow", stats=stats,
+                                                              registry=self.registry, watchdog=watchdog)
+
+        self.assertLess(time.monotonic() - start, 10)
+        self.assertEqual(method, 'beautifulsoup')
+        self.assertIn("readable text", text)
+        self.assertTrue(timed_out)
+        self.assertEqual(watchdog.timeouts, 1)
+        summary = stats.summary("https://example.com/slow")["example.com/slow"]
+        self.assertEqual(summary['raw']['timeouts'], 1)
+        self.assertEqual(summary['raw']['success_rate'], 0)
+
+        # A fresh worker handles the next page
+        status, text = watchdog.run(self.registry, 'beautifulsoup', PAGE)
+        self.assertEqual(status, OK)
+        self.assertIn("readable text", text)
+
+    def test_timed_out_result_is_not_cached(self):
+        """Test that a page whose cascade hit a timeout is extracted again next time"""
+        cache = ExtractionCache()
+        watchdog = self.make_watchdog(method_timeout=0.5)
+
+        with patch.object(ExtractorRegistry, '_extract_raw', slow_extract):
+            text = extract_content_multi_method(PAGE, "https://example.com/uncached", cache=cache,
+                                                stats=ExtractorStats(exploration_rate=0),
+                                                registry=self.registry, watchdog=watchdog)
+
+        self.assertIn("readable text", text)
+        self.assertIsNone(cache.get(PAGE))
+
+    def test_page_budget(self):
+        """Test that a spent page budget stops the cascade"""
+        watchdog = self.make_watchdog()
+        status, _ = watchdog.run(self.registry, 'raw', PAGE, budget=PageBudget(0))
+        self.assertEqual(status, TIMEOUT)
+
+        budget = PageBudget(10)
+        watchdog.run(self.registry, 'raw', PAGE, budget=budget)
+        self.assertLess(budget.remaining, 10)
+
+
+class TestSpawnedWatchdog(unittest.TestCase):
+    def test_default_context_is_spawn(self):
+        """Test that workers are spawned rather than forked from the multithreaded client"""
+        watchdog = ExtractionWatchdog()
+        self.addCleanup(watchdog.close)
+        self.assertEqual(watchdog._context.get_start_method(), "spawn")
+
+        registry = ExtractorRegistry(extractors=['raw'])
+        self.assertEqual(watchdog.run(registry, 'raw', PAGE), (OK, registry.extract('raw', PAGE)))
+
+
+if __name__ == "__main__":
+    unittest.main()
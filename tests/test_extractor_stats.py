@@ -0,0 +1,89 @@
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extractor_stats import ExtractorStats, url_pattern
+
+class TestExtractorStats(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.methods = ['trafilatura', 'readability', 'goose', 'beautifulsoup', 'raw']
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def record_pages(self, stats, count=5):
+        """Simulate a site where trafilatura always fails and readability wins"""
+        for i in range(count):
+            url = f"https://example.com/blog/{i}/post"
+            stats.record(url, 'trafilatura', False, 0.2)
+            stats.record(url, 'readability', True, 0.05)
+
+    def test_url_pattern(self):
+        """Test that pages sharing a section map to the same pattern"""
+        self.assertEqual(url_pattern("https://example.com/blog/2024/05/post"), "/blog/*")
+        self.assertEqual(url_pattern("https://example.com/about"), "/about")
+        self.assertEqual(url_pattern("https://example.com/"), "/")
+
+    def test_default_order_without_history(self):
+        """Test that unknown sites keep the default cascade order"""
+        stats = ExtractorStats(exploration_rate=0)
+        ordered, skipped = stats.order_methods("https://example.com/page", self.methods)
+
+        self.assertEqual(ordered, self.methods)
+        self.assertEqual(skipped, [])
+
+    def test_best_method_first_and_failing_method_skipped(self):
+        """Test that history reorders the cascade for later pages"""
+        stats = ExtractorStats(exploration_rate=0)
+        self.record_pages(stats)
+
+        ordered, skipped = stats.order_methods("https://example.com/blog/99/new-post", self.methods)
+
+        self.assertEqual(ordered[0], 'readability')
+        self.assertIn('trafilatura', skipped)
+        self.assertNotIn('trafilatura', ordered)
+
+    def test_one_fallback_win_does_not_reorder(self):
+        """Test that a lenient fallback winning once after the precise methods failed keeps the default order"""
+        stats = ExtractorStats(exploration_rate=0)
+        url = "https://example.com/blog/1/post"
+        for method in ('trafilatura', 'readability', 'goose'):
+            stats.record(url, method, False, 0.1)
+        stats.record(url, 'beautifulsoup', True, 0.01)
+
+        ordered, skipped = stats.order_methods("https://example.com/blog/2/post", self.methods)
+        self.assertEqual(ordered, self.methods)
+        self.assertEqual(skipped, [])
+
+        # With enough pages the precise method that usually works keeps the lead
+        for i in range(5):
+            url = f"https://example.com/blog/{i + 2}/post"
+            stats.record(url, 'trafilatura', True, 0.1)
+        ordered, _ = stats.order_methods("https://example.com/blog/9/post", self.methods)
+        self.assertEqual(ordered[0], 'trafilatura')
+
+    def test_exploration_uses_default_order(self):
+        """Test that exploration ignores history"""
+        stats = ExtractorStats(exploration_rate=1.0)
+        self.record_pages(stats)
+
+        ordered, skipped = stats.order_methods("https://example.com/blog/1/post", self.methods)
+        self.assertEqual(ordered, self.methods)
+
+    def test_statistics_persist(self):
+        """Test that statistics survive a save and reload"""
+        stats_path = os.path.join(self.temp_dir, "stats.json")
+        stats = ExtractorStats(stats_path=stats_path, exploration_rate=0)
+        self.record_pages(stats)
+        stats.save()
+
+        reloaded = ExtractorStats(stats_path=stats_path, exploration_rate=0)
+        ordered, _ = reloaded.order_methods("https://example.com/blog/7/post", self.methods)
+        self.assertEqual(ordered[0], 'readability')
+
+if __name__ == '__main__':
+    unittest.main()
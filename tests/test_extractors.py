@@ -0,0 +1,97 @@
+import unittest
+import os
+import sys
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extractors import ExtractorRegistry, DEFAULT_EXTRACTORS
+from scraper import extract_content_multi_method, default_cache_for, default_extraction_cache
+from extraction_cache import ExtractionCache
+
+class TestExtractorRegistry(unittest.TestCase):
+    def setUp(self):
+        self.html = """
+        <html>
+        <head><title>Registry Page</title></head>
+        <body>
+            <article>
+                <h1>Registry Page</h1>
+                <p>This article has enough text for every extractor in the cascade to succeed.</p>
+            </article>
+        </body>
+        </html>
+        """
+
+    def test_disable_extractor(self):
+        """Test that disabled extractors are left out of the cascade"""
+        registry = ExtractorRegistry(disabled=['goose'])
+
+        self.assertNotIn('goose', registry.extractors)
+        self.assertNotIn('goose', registry.config()['extractors'])
+
+    def test_custom_order(self):
+        """Test that extractor selection keeps the requested order"""
+        registry = ExtractorRegistry(extractors=['beautifulsoup', 'raw'])
+        self.assertEqual(registry.extractors, ['beautifulsoup', 'raw'])
+
+    def test_unknown_extractor(self):
+        """Test that unknown extractor names are rejected"""
+        with self.assertRaises(ValueError):
+            ExtractorRegistry(extractors=['trafilatura', 'nonexistent'])
+
+    def test_goose_instance_per_thread(self):
+        """Test that Goose is built once per thread and reused"""
+        registry = ExtractorRegistry()
+        if 'goose' not in registry.extractors:
+            self.skipTest("Goose3 not installed")
+
+        self.assertIs(registry._get_goose(), registry._get_goose())
+
+        other = []
+        thread = threading.Thread(target=lambda: other.append(registry._get_goose()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(other[0], registry._get_goose())
+
+    def test_cascade_uses_registry(self):
+        """Test that extraction only runs the configured backends"""
+        registry = ExtractorRegistry(extractors=['raw'])
+        cache = ExtractionCache(config=registry.config())
+
+        content = extract_content_multi_method(self.html, "https://example.com/registry",
+                                               cache=cache, registry=registry)
+
+        self.assertIn("Registry Page", content)
+        self.assertEqual(cache.get(self.html)["method"], "raw")
+
+    def test_registry_without_cache_gets_its_own(self):
+        """Test that a custom registry without a cache never shares results with the default registry"""
+        registry = ExtractorRegistry(extractors=['raw'])
+
+        self.assertIs(default_cache_for(None), default_extraction_cache)
+        self.assertIsNot(default_cache_for(registry), default_extraction_cache)
+        self.assertIs(default_cache_for(ExtractorRegistry(extractors=['raw'])), default_cache_for(registry))
+
+        extract_content_multi_method(self.html, "https://example.com/own-cache", registry=registry)
+        self.assertEqual(default_cache_for(registry).get(self.html)["method"], "raw")
+
+    def test_trafilatura_settings(self):
+        """Test that Trafilatura accepts the configured options"""
+        registry = ExtractorRegistry(extractors=['trafilatura'])
+        if 'trafilatura' not in registry.extractors:
+            self.skipTest("Trafilatura not installed")
+
+        html = self.html.replace("<p>", "<p>" + "Solar panels convert sunlight into electricity. " * 5)
+        self.assertIn("Solar panels", registry.extract('trafilatura', html))
+
+    def test_fallback_extractors_produce_text(self):
+        """Test that the generic backends produce text for a simple article"""
+        registry = ExtractorRegistry(extractors=['readability', 'beautifulsoup', 'raw'])
+        for name in registry.extractors:
+            text = registry.extract(name, self.html)
+            self.assertIn("enough text for every extractor", text, f"{name} missed the article")
+
+        self.assertTrue(set(registry.extractors) <= set(DEFAULT_EXTRACTORS))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,10 +3,36 @@ import os
 import sys
 import tempfile
 import json
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import time
+import asyncio
+import urllib.request
+import urllib.error
+import threading
+import unittest.mock
+from contextlib import contextmanager
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+sys.path.append(os.path.join(ROOT_DIR, "Rufus"))
+sys.path.append(os.path.join(ROOT_DIR, "tests"))
 
-from client import RufusClient
+# The client and the service use package-relative imports, so they are imported through the package
+from Rufus.client import RufusClient
+from Rufus.mock_nim_server import MockNIMServer
+from Rufus.service import ScrapeService
 import responses
+from site_server import SiteHandler, start_site
+
+class SolarSite(SiteHandler):
+    """Serves a small page about solar power at every path, and no robots.txt."""
+    def page_for(self, path):
+        if path == "/robots.txt":
+            return None
+        return f"""
+        <html><head><title>Site {path}</title></head><body>
+        <h1>Solar site {path}</h1>
+        <p>This site explains how solar panels and inverters work for homes.</p>
+        </body></html>
+        """
 
 class TestIntegration(unittest.TestCase):
     def setUp(self):
@@ -27,6 +53,7 @@ class TestIntegration(unittest.TestCase):
             max_pages=5,
             requests_per_minute=60
         )
+        self.addCleanup(self.client.close)
     
     def tearDown(self):
         # Clean up temp directory after tests
@@ -133,9 +160,277 @@ class TestIntegration(unittest.TestCase):
             self.assertIn("key_points", result)
             self.assertEqual(result["title"], "Climate Change Overview")
             
-            # Check for output files
-            output_files = os.listdir(self.temp_dir)
-            self.assertGreaterEqual(len(output_files), 2)  # Should have at least 2 files (content and JSON)
+            # Both the extracted content and the document are recorded once the background writer is done
+            self.client.artifact_writer.flush()
+            self.assertIsNotNone(self.client.artifact_store.lookup(
+                ["https://example.com"], "Information about climate change", kind="content"))
+            self.assertEqual(self.client.artifact_store.stats()["records"], 2)
+            
+            # The document is found again through the artifact store's index
+            self.assertEqual(self.client.find_result("https://example.com", "Information about climate change"),
+                             result)
+
+    @responses.activate
+    def test_scrape_many(self):
+        """Test that a batch shares resources, streams results and isolates failing jobs"""
+        for site in ("a", "b", "c"):
+            responses.add(responses.GET, f"https://{site}.example.com/robots.txt", status=404)
+            responses.add(responses.GET, f"https://{site}.example.com", status=200, body=f"""
+            <html><head><title>Site {site}</title></head><body>
+            <h1>Solar site {site}</h1>
+            <p>Site {site} explains how solar panels and inverters work for homes.</p>
+            </body></html>
+            """)
+        
+        with MockNIMServer() as server:
+            client = RufusClient(
+                api_key=self.api_key,
+                nim_api_key=self.nim_api_key,
+                output_dir=self.temp_dir,
+                use_selenium=False,
+                max_depth=0,
+                requests_per_minute=60,
+                nim_base_url=server.base_url,
+                save_artifacts=False,
+                isolate_extraction=False
+            )
+            jobs = [
+                "https://a.example.com",
+                ("https://b.example.com", "Solar panels"),
+                {"url": "https://c.example.com", "instructions": "Inverters"},
+                {"url": "https://a.example.com", "max_depth": "deep"},
+            ]
+            results = sorted(client.scrape_many(jobs, concurrency=3), key=lambda result: result["job"])
+            client.close()
+        
+        self.assertEqual([result["job"] for result in results], [0, 1, 2, 3])
+        for result in results[:3]:
+            self.assertNotIn("error", result)
+            self.assertTrue(result["document"]["metadata"]["mock"])
+        self.assertEqual(results[1]["url"], "https://b.example.com")
+        self.assertIn("error", results[3])
+        self.assertEqual(server.stats()["requests"], 3)
+
+    @responses.activate
+    def test_scrape_pipelined(self):
+        """Test that a pipelined scrape synthesizes chunks as pages arrive and reports stage utilization"""
+        links = "".join(f'<a href="https://example.com/page{n}">Page {n}</a>' for n in range(6))
+        responses.add(responses.GET, "https://example.com/robots.txt", status=404)
+        responses.add(responses.GET, "https://example.com", status=200, body=f"""
+        <html><head><title>Solar</title></head><body>
+        <h1>Solar power</h1><p>Solar panels turn sunlight into electricity for homes and businesses.</p>
+        {links}</body></html>
+        """)
+        for n in range(6):
+            responses.add(responses.GET, f"https://example.com/page{n}", status=200, body=f"""
+            <html><head><title>Page {n}</title></head><body>
+            <h1>Solar page {n}</h1>
+            <p>{"Solar inverters and batteries store energy for later use. " * 20}</p>
+            </body></html>
+            """)
+        
+        with MockNIMServer() as server:
+            client = RufusClient(
+                api_key=self.api_key,
+                nim_api_key=self.nim_api_key,
+                output_dir=self.temp_dir,
+                use_selenium=False,
+                max_depth=1,
+                max_pages=10,
+                requests_per_minute=600,
+                nim_base_url=server.base_url,
+                save_artifacts=False,
+                isolate_extraction=False,
+                llm_cache=False,
+                synthesis_token_budget=600,
+                pipelined=True
+            )
+            document = client.scrape("https://example.com", "Solar energy")
+            client.close()
+        
+        self.assertNotIn("error", document)
+        stats = client.last_pipeline_stats
+        self.assertEqual(list(stats), ["fetch", "extract", "pack", "synthesize"])
+        self.assertEqual(stats["fetch"]["items"], 7)
+        self.assertEqual(stats["extract"]["items"], 7)
+        # Several map calls, then the reduce calls
+        self.assertGreater(stats["synthesize"]["items"], 1)
+        self.assertGreater(server.stats()["requests"], stats["synthesize"]["items"])
+
+    def test_ascrape_many(self):
+        """Test that async batches stream results, isolate failures and time out slow jobs"""
+        base = start_site(self, SolarSite)
+        
+        async def run(client):
+            jobs = [
+                f"{base}/a",
+                (f"{base}/b", "Solar panels"),
+                {"url": f"{base}/c", "max_depth": "deep"},
+            ]
+            results = [result async for result in client.ascrape_many(jobs, concurrency=2)]
+            document = await client.ascrape(f"{base}/d", "Inverters")
+            await client.aclose()
+            return results, document
+        
+        with MockNIMServer() as server:
+            client = RufusClient(
+                api_key=self.api_key,
+                nim_api_key=self.nim_api_key,
+                output_dir=self.temp_dir,
+                use_selenium=False,
+                max_depth=0,
+                requests_per_minute=60,
+                nim_base_url=server.base_url,
+                save_artifacts=False,
+                isolate_extraction=False
+            )
+            results, document = asyncio.run(run(client))
+        
+        results = sorted(results, key=lambda result: result["job"])
+        self.assertEqual([result["job"] for result in results], [0, 1, 2])
+        for result in results[:2]:
+            self.assertNotIn("error", result)
+            self.assertTrue(result["document"]["metadata"]["mock"])
+        self.assertIn("error", results[2])
+        self.assertTrue(document["metadata"]["mock"])
+        self.assertEqual(server.stats()["requests"], 3)
+    def test_ascrape_renders_javascript(self):
+        """Test that a single async scrape renders pages in a browser when use_selenium is set"""
+        base = start_site(self, SolarSite)
+        pools = []
+        
+        class FakeBrowserPool:
+            def __init__(self, size=2, **options):
+                self.closed = False
+                pools.append(self)
+            
+            @contextmanager
+            def driver(self):
+                yield "driver"
+            
+            def close(self):
+                self.closed = True
+        
+        rendered = "<html><body><h1>Rendered</h1><p>Solar panels rendered by the browser for homes.</p></body></html>"
+        with MockNIMServer() as server, \
+                unittest.mock.patch("Rufus.client.BrowserPool", FakeBrowserPool), \
+                unittest.mock.patch("Rufus.async_crawler.render_page", return_value=rendered) as render:
+            client = RufusClient(
+                api_key=self.api_key,
+                nim_api_key=self.nim_api_key,
+                output_dir=self.temp_dir,
+                use_selenium=True,
+                max_depth=0,
+                nim_base_url=server.base_url,
+                save_artifacts=False,
+                isolate_extraction=False
+            )
+            self.addCleanup(client.close)
+            document = asyncio.run(client.ascrape(f"{base}/js", "Solar"))
+        
+        self.assertNotIn("error", document)
+        render.assert_called_once_with("driver", f"{base}/js")
+        self.assertEqual(len(pools), 1)
+        self.assertTrue(pools[0].closed)
+
+    def test_scrape_service(self):
+        """Test submitting jobs over HTTP to warm workers and polling for their results"""
+        base = start_site(self, SolarSite)
+        
+        def call(url, body=None):
+            data = json.dumps(body).encode("utf-8") if body is not None else None
+            request = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+            try:
+                with urllib.request.urlopen(request, timeout=10) as response:
+                    return response.status, json.loads(response.read())
+            except urllib.error.HTTPError as e:
+                return e.code, json.loads(e.read())
+        
+        def wait_for_result(service, job_id, timeout=60):
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                status, body = call(f"{service.base_url}/jobs/{job_id}/result")
+                if status != 202:
+                    return status, body
+                time.sleep(0.05)
+            self.fail(f"Job {job_id} did not finish")
+        
+        with MockNIMServer() as server:
+            client_options = {
+                "api_key": self.api_key,
+                "nim_api_key": self.nim_api_key,
+                "output_dir": self.temp_dir,
+                "use_selenium": False,
+                "max_depth": 0,
+                "requests_per_minute": 600,
+                "nim_base_url": server.base_url,
+                "save_artifacts": False,
+                "isolate_extraction": False,
+            }
+            for processes in (False, True):
+                with self.subTest(processes=processes):
+                    service = ScrapeService(db_path=os.path.join(self.temp_dir, f"jobs-{processes}.db"), port=0,
+                                            workers=2, client_options=client_options, processes=processes,
+                                            poll_interval=0.1)
+                    with service:
+                        submitted = [call(f"{service.base_url}/jobs", {"url": f"{base}/{n}", "instructions": "Solar"})
+                                     for n in range(3)]
+                        self.assertEqual({status for status, _ in submitted}, {202})
+                        results = [wait_for_result(service, body["id"]) for _, body in submitted]
+                        
+                        status, job = call(f"{service.base_url}/jobs/{submitted[0][1]['id']}")
+                        self.assertEqual((status, job["status"]), (200, "done"))
+                        self.assertEqual(call(f"{service.base_url}/jobs/unknown")[0], 404)
+                        self.assertEqual(call(f"{service.base_url}/jobs", {"instructions": "no url"})[0], 400)
+                        status, health = call(f"{service.base_url}/health")
+                        self.assertEqual((status, health["status"]), (200, "ok"))
+                        self.assertEqual(health["workers"], 2)
+                        self.assertEqual(health["jobs"]["done"], 3)
+                    
+                    for status, document in results:
+                        self.assertEqual(status, 200)
+                        self.assertTrue(document["metadata"]["mock"])
+
+    def test_scrape_service_supervision(self):
+        """Test that dead workers are replaced, only their jobs are requeued, and health reports missing workers"""
+        service = ScrapeService(db_path=os.path.join(self.temp_dir, "jobs.db"), port=0, workers=1,
+                                client_options={"nim_api_key": self.nim_api_key, "use_selenium": False,
+                                                "save_artifacts": False, "isolate_extraction": False},
+                                processes=True, poll_interval=0.1, monitor_interval=60)
+        with service:
+            (dead_name, dead), = service._workers.items()
+            # The queue is empty, so these jobs are claimed by hand: one by the worker about to die,
+            # one by a worker that is still busy
+            orphan = service.jobs.submit("https://example.com/orphan")
+            busy = service.jobs.submit("https://example.com/busy")
+            service.jobs.claim(dead_name)
+            service.jobs.claim("worker-busy")
+            dead.kill()
+            dead.join()
+            
+            self.assertEqual(service.health()["status"], "degraded")
+            service._replace_dead_workers()
+            health = service.health()
+            self.assertEqual((health["status"], health["workers"]), ("ok", 1))
+            self.assertNotIn(dead_name, service._workers)
+            self.assertEqual(service.jobs.get(busy)["status"], "running")
+            self.assertNotEqual(service.jobs.get(orphan)["worker"], dead_name)
+
+    def test_thread_workers_keep_running_jobs_on_stop(self):
+        """Test that stopping does not requeue jobs of worker threads that are still running them"""
+        service = ScrapeService(db_path=os.path.join(self.temp_dir, "jobs.db"), port=0, workers=0,
+                                processes=False)
+        self.addCleanup(service.jobs.close)
+        release = threading.Event()
+        self.addCleanup(release.set)
+        straggler = threading.Thread(target=release.wait, daemon=True)
+        straggler.start()
+        service._workers["worker-slow"] = straggler
+        job_id = service.jobs.submit("https://example.com/slow")
+        service.jobs.claim("worker-slow")
+        
+        service._stop_workers(timeout=0.1)
+        self.assertEqual(service.jobs.get(job_id)["status"], "running")
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from job_queue import JobQueue, QUEUED, RUNNING, DONE, FAILED
+
+
+class TestJobQueue(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir, ignore_errors=True)
+        self.path = os.path.join(self.temp_dir, "jobs.db")
+        self.queue = JobQueue(self.path)
+        self.addCleanup(self.queue.close)
+
+    def test_job_lifecycle(self):
+        """Test that jobs are claimed oldest first and keep their results"""
+        first = self.queue.submit("https://example.com/a", "Solar", {"max_depth": 1})
+        second = self.queue.submit("https://example.com/b")
+
+        job = self.queue.claim("worker-1")
+        self.assertEqual(job["id"], first)
+        self.assertEqual(job["status"], RUNNING)
+        self.assertEqual(job["options"], {"max_depth": 1})
+        self.assertEqual(job["worker"], "worker-1")
+
+        self.queue.complete(first, {"title": "Solar"})
+        self.assertEqual(self.queue.get(first)["result"], {"title": "Solar"})
+        self.assertNotIn("result", self.queue.get(first, include_result=False))
+
+        self.assertEqual(self.queue.claim("worker-1")["id"], second)
+        self.queue.fail(second, "boom")
+        self.assertEqual(self.queue.get(second)["error"], "boom")
+
+        self.assertIsNone(self.queue.claim("worker-1"))
+        self.assertEqual(self.queue.counts(), {QUEUED: 0, RUNNING: 0, DONE: 1, FAILED: 1})
+        self.assertEqual([job["id"] for job in self.queue.list(status=DONE)], [first])
+
+    def test_jobs_survive_restart(self):
+        """Test that queued jobs persist and interrupted jobs are requeued"""
+        running = self.queue.submit("https://example.com/a")
+        queued = self.queue.submit("https://example.com/b")
+        self.queue.claim("worker-1")
+        self.queue.close()
+
+        reopened = JobQueue(self.path)
+        self.addCleanup(reopened.close)
+        self.assertEqual(reopened.requeue_running(), 1)
+        claimed = [reopened.claim("worker-2")["id"], reopened.claim("worker-2")["id"]]
+        self.assertEqual(sorted(claimed), sorted([running, queued]))
+        self.assertEqual(reopened.get(running)["attempts"], 2)
+
+    def test_requeue_one_worker(self):
+        """Test that only a dead worker's jobs are requeued, and jobs that keep killing workers fail"""
+        mine = self.queue.submit("https://example.com/a")
+        theirs = self.queue.submit("https://example.com/b")
+        self.queue.claim("worker-1")
+        self.queue.claim("worker-2")
+
+        self.assertEqual(self.queue.requeue_running(worker="worker-1", max_attempts=2), 1)
+        self.assertEqual(self.queue.get(mine)["status"], QUEUED)
+        self.assertEqual(self.queue.get(theirs)["status"], RUNNING)
+
+        # The second run of the job is its last
+        self.assertEqual(self.queue.claim("worker-3")["id"], mine)
+        self.assertEqual(self.queue.requeue_running(worker="worker-3", max_attempts=2), 0)
+        job = self.queue.get(mine)
+        self.assertEqual((job["status"], job["attempts"]), (FAILED, 2))
+        self.assertIn("2 times", job["error"])
+
+    def test_concurrent_claims(self):
+        """Test that each job is claimed exactly once by competing workers on separate connections"""
+        ids = {self.queue.submit(f"https://example.com/{n}") for n in range(40)}
+        claimed = []
+        lock = threading.Lock()
+
+        def worker(name):
+            queue = JobQueue(self.path)
+            try:
+                while True:
+                    job = queue.claim(name)
+                    if job is None:
+                        return
+                    with lock:
+                        claimed.append(job["id"])
+            finally:
+                queue.close()
+
+        threads = [threading.Thread(target=worker, args=(f"worker-{n}",)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(claimed), 40)
+        self.assertEqual(set(claimed), ids)
+
+
+if __name__ == "__main__":
+    unittest.main()
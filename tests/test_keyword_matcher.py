@@ -0,0 +1,54 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import keyword_matcher
+from keyword_matcher import KeywordMatcher, compile_instructions, instruction_keywords
+from scraper import scrape_content, ContentAnalyzer
+
+class TestKeywordMatcher(unittest.TestCase):
+    def test_instruction_keywords(self):
+        """Test keyword extraction from instructions"""
+        keywords = instruction_keywords("Find the HR policies, and the e-mail contacts.",
+                                        ContentAnalyzer.common_stop_words)
+        self.assertEqual(keywords, ["find", "hr", "policies", "e-mail", "contacts"])
+
+    def test_whole_word_hits(self):
+        """Test that keywords only match whole words and hits are counted"""
+        matcher = KeywordMatcher(["art", "climate"])
+        hits = matcher.count("Start the ART show. Climate, climate and more climate art!")
+
+        self.assertEqual(hits, {"art": 2, "climate": 3})
+        self.assertEqual(matcher.count("Starting a party"), {})
+
+    def test_regex_fallback(self):
+        """Test that the regex matcher behaves like the automaton"""
+        with patch.object(keyword_matcher, "ahocorasick", None):
+            matcher = KeywordMatcher(["art", "climate"])
+        hits = matcher.count("Start the ART show. Climate, climate and more climate art!")
+
+        self.assertEqual(hits, {"art": 2, "climate": 3})
+
+    def test_compiled_once_per_instructions(self):
+        """Test that the matcher is reused for the same instructions"""
+        first = compile_instructions("climate change", ContentAnalyzer.common_stop_words)
+        second = compile_instructions("climate change", ContentAnalyzer.common_stop_words)
+        self.assertIs(first, second)
+
+    def test_scrape_content_returns_hits(self):
+        """Test that scrape_content reports keyword hits per page"""
+        html = """
+        <html><body>
+            <p>Climate change is a pressing issue. Climate policy matters for everyone.</p>
+            <p>We start by looking at the data behind the science.</p>
+        </body></html>
+        """
+        pages, hits = scrape_content({"https://example.com": html}, "climate art", return_hits=True)
+
+        self.assertIn("https://example.com", pages)
+        self.assertEqual(hits["https://example.com"], {"climate": 2})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+import unittest
+import os
+import json
+import sys
+import shutil
+import time
+import tempfile
+from types import SimpleNamespace
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_cache import LLMResponseCache
+from synthesizer import _build_request, _synthesize
+from synthesis_backend import SynthesisBackend
+
+
+DOCUMENT = {"title": "Cached", "summary": "Summary.", "key_points": ["one"],
+            "content_sections": [{"heading": "Intro", "content": "Text"}]}
+
+
+class FakeClient:
+    """Chat client that counts calls and answers with a fixed JSON document"""
+    def __init__(self, content=json.dumps(DOCUMENT)):
+        self.calls = 0
+        self.content = content
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **request):
+        self.calls += 1
+        message = SimpleNamespace(content=self.content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+class TestLLMResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache = LLMResponseCache(self.cache_dir)
+        self.request = _build_request("test-model", "Summarize this")
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_key_covers_request_parameters(self):
+        """Test that every key field changes the key and field order does not"""
+        key = LLMResponseCache.make_key(self.request)
+        self.assertEqual(key, LLMResponseCache.make_key(dict(reversed(list(self.request.items())))))
+        for field, value in [("model", "other"), ("temperature", 0.9), ("top_p", 1.0),
+                             ("response_format", None), ("messages", [])]:
+            self.assertNotEqual(key, LLMResponseCache.make_key(dict(self.request, **{field: value})))
+
+    def test_put_get(self):
+        """Test that a stored response is returned, also by a new cache on the same directory"""
+        self.assertIsNone(self.cache.get(self.request))
+        self.cache.put(self.request, "response text")
+        self.assertEqual(self.cache.get(self.request), "response text")
+        self.assertEqual(LLMResponseCache(self.cache_dir).get(self.request), "response text")
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_ttl(self):
+        """Test that expired entries are not returned"""
+        self.cache.put(self.request, "response text")
+        expired = LLMResponseCache(self.cache_dir, ttl=0)
+        self.assertIsNone(expired.get(self.request))
+
+    def test_hits_do_not_extend_ttl(self):
+        """Test that eviction expires entries by creation time, like get(), however often they are hit"""
+        cache = LLMResponseCache(self.cache_dir, ttl=60)
+        cache.put(self.request, "response text")
+        path = cache._path(cache.make_key(self.request))
+        created = time.time() - 120
+        os.utime(path, (created, created))
+        with open(path, encoding="utf-8") as f:
+            entry = json.load(f)
+        entry["created"] = created
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.utime(path, (time.time(), created))
+
+        cache.evict()
+        self.assertFalse(os.path.exists(path))
+
+        # A hit refreshes only the access time
+        self.cache.put(self.request, "response text")
+        mtime = os.stat(path).st_mtime
+        os.utime(path, (1000, mtime))
+        self.assertEqual(self.cache.get(self.request), "response text")
+        self.assertEqual(os.stat(path).st_mtime, mtime)
+        self.assertGreater(os.stat(path).st_atime, 1000)
+
+    def test_bypass_and_refresh(self):
+        """Test the bypass and refresh switches"""
+        self.cache.put(self.request, "old")
+
+        bypass = LLMResponseCache(self.cache_dir, bypass=True)
+        self.assertIsNone(bypass.get(self.request))
+        bypass.put(self.request, "ignored")
+        self.assertEqual(self.cache.get(self.request), "old")
+
+        refresh = LLMResponseCache(self.cache_dir, refresh=True)
+        self.assertIsNone(refresh.get(self.request))
+        refresh.put(self.request, "new")
+        self.assertEqual(self.cache.get(self.request), "new")
+
+    def test_size_eviction(self):
+        """Test that old entries are evicted once the store is over its size limit"""
+        cache = LLMResponseCache(self.cache_dir, max_bytes=2000)
+        requests = [_build_request("test-model", f"prompt {i}") for i in range(10)]
+        for i, request in enumerate(requests):
+            cache.put(request, "x" * 300)
+            os.utime(cache._path(cache.make_key(request)), (1000 + i, 1000 + i))
+
+        cache.put(_build_request("test-model", "last"), "x" * 300)
+        self.assertLessEqual(cache._scan_size(), 2000)
+        self.assertIsNone(cache.get(requests[0]))
+        self.assertIsNotNone(cache.get(_build_request("test-model", "last")))
+
+    def test_synthesize_uses_cache(self):
+        """Test that an identical synthesis request does not call the API again"""
+        client = FakeClient()
+        first = _synthesize(SynthesisBackend(client=client), "test-model", "Summarize this", self.cache)
+        second = _synthesize(SynthesisBackend(client=client), "test-model", "Summarize this", self.cache)
+
+        self.assertEqual(first, DOCUMENT)
+        self.assertEqual(second, first)
+        self.assertEqual(client.calls, 1)
+
+    def test_unparseable_response_not_cached(self):
+        """Test that responses that fail to parse are retried next time"""
+        client = FakeClient(content="not json at all")
+        _synthesize(SynthesisBackend(client=client), "test-model", "Summarize this", self.cache)
+        _synthesize(SynthesisBackend(client=client), "test-model", "Summarize this", self.cache)
+        self.assertEqual(client.calls, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import unittest
+import os
+import sys
+import json
+import asyncio
+import time
+import tempfile
+import shutil
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_nim_server import MockNIMServer
+from synthesis_backend import SynthesisBackend, resolve_base_url
+from artifact_writer import ArtifactWriter
+from synthesizer import synthesize_document, stream_synthesize_document, asynthesize_document
+
+PAGES = {
+    "https://example.com/a": "Solar panels convert sunlight into electricity.",
+    "https://example.com/b": "Inverters convert direct current into alternating current.",
+}
+
+
+class TestMockNIMServer(unittest.TestCase):
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output_dir, ignore_errors=True)
+        self.writer = ArtifactWriter(enabled=False)
+
+    def start(self, **options):
+        server = MockNIMServer(**options).start()
+        self.addCleanup(server.stop)
+        backend = SynthesisBackend(api_key="test-key", base_url=server.base_url, requests_per_minute=None,
+                                   base_delay=0.05)
+        self.addCleanup(backend.close)
+        return server, backend
+
+    def synthesize(self, backend):
+        return synthesize_document(PAGES, "Summarize", "test-key", output_dir=self.output_dir,
+                                   writer=self.writer, backend=backend)
+
+    def test_synthesize_document(self):
+        """Test a full synthesis against the local server"""
+        server, backend = self.start()
+        document = self.synthesize(backend)
+
+        self.assertNotIn("error", document)
+        self.assertTrue(document["metadata"]["mock"])
+        self.assertEqual(document["metadata"]["source_count"], 2)
+        self.assertEqual(server.stats()["requests"], 1)
+
+    def test_streaming_with_token_rate(self):
+        """Test that streamed fields arrive before the document at the configured token rate"""
+        server, backend = self.start(mode="canned", response=json.dumps({
+            "title": "T", "summary": "S", "key_points": ["k"],
+            "content_sections": [{"heading": "h", "content": "c"}],
+        }), tokens_per_second=400)
+
+        start = time.monotonic()
+        events = list(stream_synthesize_document(PAGES, "Summarize", "test-key", output_dir=self.output_dir,
+                                                 writer=self.writer, backend=backend))
+        elapsed = time.monotonic() - start
+
+        self.assertEqual([e["key"] for e in events if e["event"] == "field"],
+                         ["title", "summary", "key_points", "content_sections"])
+        self.assertEqual(events[-1]["document"]["title"], "T")
+        # 99 characters at 4 characters per token and 400 tokens per second
+        self.assertGreaterEqual(elapsed, 0.06)
+
+    def test_rate_limited_requests_are_retried(self):
+        """Test that injected 429s are retried after Retry-After until the call succeeds"""
+        server, backend = self.start(rate_limit_rate=0.5, retry_after=0.05, seed=1)
+        documents = [self.synthesize(backend) for _ in range(4)]
+
+        self.assertTrue(all("error" not in document for document in documents))
+        stats = server.stats()
+        self.assertGreater(stats["rate_limited"], 0)
+        self.assertEqual(stats["requests"], 4 + stats["rate_limited"])
+        self.assertEqual(backend.retries, stats["rate_limited"])
+
+    def test_echo_and_base_url(self):
+        """Test echo responses and that the base URL can come from the environment"""
+        server, backend = self.start(mode="echo")
+        self.assertEqual(backend.complete({"model": "m", "messages": [{"role": "user", "content": "hi"}]}), "hi")
+
+        os.environ["NVIDIA_NIM_BASE_URL"] = server.base_url
+        self.addCleanup(os.environ.pop, "NVIDIA_NIM_BASE_URL")
+        self.assertEqual(resolve_base_url(), server.base_url)
+        self.assertEqual(resolve_base_url("http://other/v1"), "http://other/v1")
+
+    def test_asynthesize_document(self):
+        """Test async synthesis, concurrent map-reduce calls and cancellation on one event loop"""
+        server, backend = self.start(latency=0.2)
+        pages = {f"https://example.com/{n}": f"Page {n} about grid storage. " * 40 for n in range(4)}
+
+        async def run():
+            document = await asynthesize_document(PAGES, "Summarize", "test-key", output_dir=self.output_dir,
+                                                  writer=self.writer, backend=backend)
+            start = time.monotonic()
+            reduced = await asynthesize_document(pages, "Summarize", "test-key", output_dir=self.output_dir,
+                                                 max_prompt_tokens=300, writer=self.writer, backend=backend)
+            elapsed = time.monotonic() - start
+
+            task = asyncio.ensure_future(asynthesize_document(PAGES, "Summarize", "test-key",
+                                                              output_dir=self.output_dir, writer=self.writer,
+                                                              backend=backend))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            await backend.aclose()
+            return document, reduced, elapsed
+
+        document, reduced, elapsed = asyncio.run(run())
+        self.assertNotIn("error", document)
+        self.assertEqual(document["metadata"]["source_count"], 2)
+        self.assertNotIn("error", reduced)
+        # Four map calls and one reduce call at 0.2s each would take a second one at a time
+        self.assertGreater(server.stats()["peak_concurrency"], 1)
+        self.assertLess(elapsed, 0.9)
+
+
+if __name__ == "__main__":
+    unittest.main()
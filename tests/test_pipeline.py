@@ -0,0 +1,103 @@
+import unittest
+import os
+import sys
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pipeline import Pipeline, Stage
+
+
+def slow(seconds, fn=lambda item: item):
+    def run(item):
+        time.sleep(seconds)
+        return [fn(item)]
+    return run
+
+
+def slow_source(count, seconds, produced=None):
+    for item in range(count):
+        time.sleep(seconds)
+        if produced is not None:
+            produced.append(item)
+        yield item
+
+
+class TestPipeline(unittest.TestCase):
+    def test_stages_overlap(self):
+        """Test that end-to-end time approaches the slowest stage instead of the sum of all stages"""
+        pipeline = Pipeline(slow_source(10, 0.03), [
+            Stage("extract", slow(0.03, lambda item: item * 2)),
+            Stage("synthesize", slow(0.06), workers=2),
+        ])
+
+        start = time.monotonic()
+        results = list(pipeline.run())
+        elapsed = time.monotonic() - start
+
+        self.assertEqual(sorted(results), [item * 2 for item in range(10)])
+        # One after another: 10 * (0.03 + 0.03 + 0.06) = 1.2s
+        self.assertLess(elapsed, 0.8)
+
+        stats = pipeline.stats()
+        self.assertEqual(list(stats), ["source", "extract", "synthesize"])
+        self.assertEqual(stats["extract"]["items"], 10)
+        self.assertEqual(stats["synthesize"]["workers"], 2)
+        for stage in stats.values():
+            self.assertGreater(stage["utilization"], 0.2)
+            self.assertLessEqual(stage["utilization"], 1.0)
+
+    def test_backpressure(self):
+        """Test that a fast source waits for a slow stage once the queues are full"""
+        produced = []
+        pipeline = Pipeline(slow_source(50, 0, produced), [Stage("slow", slow(0.05))], queue_size=2)
+
+        results = pipeline.run()
+        self.assertEqual(next(results), 0)
+        time.sleep(0.2)
+        # Two queues of two items each, plus one item in each thread
+        self.assertLessEqual(len(produced), 8)
+        results.close()
+
+        self.assertLess(len(produced), 50)
+        self.assertGreater(pipeline.stats()["source"]["blocked_seconds"], 0.1)
+
+    def test_flush_and_filtering(self):
+        """Test that stages can drop items and emit held-back items after the last input"""
+        batch = []
+
+        def collect(item):
+            batch.append(item)
+            if len(batch) == 3:
+                full = list(batch)
+                batch.clear()
+                return [full]
+            return []
+
+        pipeline = Pipeline(range(10), [
+            Stage("filter", lambda item: [item] if item % 2 == 0 else [], workers=3),
+            Stage("batch", collect, flush=lambda: [list(batch)] if batch else []),
+        ])
+        batches = list(pipeline.run())
+
+        self.assertEqual(sorted(item for chunk in batches for item in chunk), [0, 2, 4, 6, 8])
+        self.assertEqual([len(chunk) for chunk in batches], [3, 2])
+
+    def test_stage_error_stops_pipeline(self):
+        """Test that an exception in a stage stops every stage and is raised to the caller"""
+        def fail(item):
+            if item == 3:
+                raise ValueError("bad item")
+            return [item]
+
+        produced = []
+        pipeline = Pipeline(slow_source(100, 0.005, produced), [Stage("fail", fail, workers=2)], queue_size=2)
+        with self.assertRaises(ValueError):
+            list(pipeline.run())
+
+        self.assertLess(len(produced), 100)
+        self.assertFalse([t for t in threading.enumerate() if t.name.startswith("rufus-pipeline-")])
+
+
+if __name__ == "__main__":
+    unittest.main()
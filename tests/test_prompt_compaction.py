@@ -0,0 +1,92 @@
+import unittest
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prompt_compaction import PromptCompactor, compact_pages
+
+BANNER = "We use cookies to improve your experience. Accept all cookies?"
+FOOTER = "Copyright 2024 Solar Co. All rights reserved."
+
+
+def make_pages(count):
+    return {
+        f"https://example.com/page{i}": f"Home\nProducts\n{BANNER}\n"
+                                        f"Page {i} explains inverter model {i}. It is rated {i} kW.\n{FOOTER}"
+        for i in range(count)
+    }
+
+
+class TestPromptCompaction(unittest.TestCase):
+    def test_drops_repeated_boilerplate(self):
+        """Test that later copies of sentences on most pages are dropped and page content is kept"""
+        pages = make_pages(5)
+        compacted, report = compact_pages(pages)
+
+        # The first page keeps its copy of the boilerplate
+        self.assertEqual(compacted["https://example.com/page0"], pages["https://example.com/page0"])
+        for i in range(1, 5):
+            self.assertEqual(compacted[f"https://example.com/page{i}"],
+                             f"Page {i} explains inverter model {i}. It is rated {i} kW.")
+        self.assertEqual(report["pages"], 5)
+        self.assertEqual(report["dropped_segments"], 4 * 6)
+        self.assertGreater(report["tokens_saved"], report["tokens_after"])
+        self.assertEqual(report["tokens_before"] - report["tokens_after"], report["tokens_saved"])
+
+    def test_threshold(self):
+        """Test that sentences on at most the threshold fraction of pages are kept"""
+        pages = make_pages(4)
+        pages["https://example.com/page0"] += "\nShared note. Only here."
+        pages["https://example.com/page1"] += "\nShared note."
+
+        compacted, _ = PromptCompactor(threshold=0.5).compact(pages)
+        self.assertIn("Shared note. Only here.", compacted["https://example.com/page0"])
+
+        compacted, _ = PromptCompactor(threshold=0.25).compact(pages)
+        self.assertIn("Shared note. Only here.", compacted["https://example.com/page0"])
+        self.assertTrue(compacted["https://example.com/page1"].endswith("It is rated 1 kW."))
+
+    def test_repeated_fact_is_kept_once(self):
+        """Test that a fact repeated on some pages still reaches the prompt"""
+        address = "Our office is at 12 Main St, Boston."
+        pages = {
+            "https://example.com/a": f"Solar panels for homes. {address}",
+            "https://example.com/b": f"Inverters for homes. {address}",
+            "https://example.com/c": "Batteries for homes.",
+        }
+        # Two of three pages is not boilerplate at the default threshold
+        self.assertEqual(compact_pages(pages)[0], pages)
+
+        compacted, _ = compact_pages(pages, threshold=0.5)
+        self.assertEqual(sum(text.count(address) for text in compacted.values()), 1)
+
+    def test_long_sentences_are_content(self):
+        """Test that long repeated sentences are never dropped"""
+        long_sentence = "This detailed warranty paragraph " + "covers panels and inverters " * 10 + "for ten years."
+        pages = {f"https://example.com/{i}": f"Page {i}. {long_sentence}" for i in range(4)}
+        compacted, report = compact_pages(pages)
+        self.assertEqual(compacted, pages)
+        self.assertEqual(report["dropped_segments"], 0)
+
+    def test_small_crawls_untouched(self):
+        """Test that too few pages or a disabled compactor leave the content as is"""
+        pages = make_pages(2)
+        self.assertIs(compact_pages(pages)[0], pages)
+        pages = make_pages(5)
+        self.assertIs(PromptCompactor(enabled=False).compact(pages)[0], pages)
+
+        # Identical pages collapse to the first one
+        identical = {f"https://example.com/{i}": BANNER for i in range(4)}
+        compacted, _ = compact_pages(identical)
+        self.assertEqual(compacted, {"https://example.com/0": BANNER})
+
+    def test_tracks_total_savings(self):
+        """Test that the compactor accumulates tokens saved across calls"""
+        compactor = PromptCompactor()
+        _, first = compactor.compact(make_pages(5))
+        _, second = compactor.compact(make_pages(6))
+        self.assertEqual(compactor.tokens_saved, first["tokens_saved"] + second["tokens_saved"])
+
+
+if __name__ == "__main__":
+    unittest.main()
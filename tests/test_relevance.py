@@ -0,0 +1,73 @@
+import unittest
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from relevance import BM25Index, select_relevant, tfidf_keywords
+
+class TestRelevance(unittest.TestCase):
+    def setUp(self):
+        self.pages = {
+            "https://example.com/climate": "Climate change affects the planet. Climate policy is needed. Emissions keep rising.",
+            "https://example.com/weather": "The weather today is sunny with a light breeze.",
+            "https://example.com/policy": "Our policy covers remote work and vacation days.",
+        }
+
+    def test_bm25_ranking(self):
+        """Test that documents with more query terms rank higher"""
+        index = BM25Index()
+        for url, text in self.pages.items():
+            index.add(url, text)
+
+        ranked = index.top("climate policy")
+        self.assertEqual(ranked[0][0], "https://example.com/climate")
+        self.assertNotIn("https://example.com/weather", [doc_id for doc_id, _ in ranked])
+
+    def test_index_grows_incrementally(self):
+        """Test that documents added after a query are scored"""
+        index = BM25Index()
+        index.add("a", "nothing relevant here")
+        self.assertEqual(index.top("solar"), [("a", 0.0)])
+
+        index.add("b", "solar panels and solar power")
+        self.assertEqual(index.top("solar")[0][0], "b")
+
+    def test_select_top_k_pages(self):
+        """Test top-k page selection"""
+        selected = select_relevant(self.pages, "climate policy", top_k=1)
+        self.assertEqual(list(selected), ["https://example.com/climate"])
+
+    def test_select_passages_by_token_budget(self):
+        """Test passage selection under a token budget"""
+        selected = select_relevant(self.pages, "emissions", token_budget=10,
+                                   passages=True, passage_tokens=8)
+
+        self.assertEqual(list(selected), ["https://example.com/climate"])
+        self.assertIn("Emissions keep rising.", selected["https://example.com/climate"])
+        self.assertNotIn("sunny", " ".join(selected.values()))
+
+    def test_no_selection_without_limits(self):
+        """Test that scraped data passes through when no limit is set"""
+        self.assertIs(select_relevant(self.pages, "climate"), self.pages)
+
+    def test_tfidf_keywords(self):
+        """Test that site-wide boilerplate terms do not dominate page keywords"""
+        pages = {
+            "https://example.com/solar": "Menu Contact. Solar panels convert sunlight. Solar energy in 2024.",
+            "https://example.com/wind": "Menu Contact. Wind turbines spin. Wind farms are large.",
+            "https://example.com/storage": "Menu Contact. Battery storage keeps energy.",
+        }
+        keywords = tfidf_keywords(pages, top_n=2, stop_words={"are", "in"})
+
+        self.assertEqual(keywords["pages"]["https://example.com/solar"][0], "solar")
+        self.assertEqual(keywords["pages"]["https://example.com/wind"][0], "wind")
+        self.assertNotIn("menu", keywords["pages"]["https://example.com/storage"])
+        self.assertNotIn("2024", keywords["pages"]["https://example.com/solar"])
+        self.assertEqual(len(keywords["site"]), 2)
+
+    def test_tfidf_keywords_empty(self):
+        """Test corpus keywords for texts without usable words"""
+        self.assertEqual(tfidf_keywords(["", "a"]), {"pages": {0: [], 1: []}, "site": []})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -118,6 +118,28 @@ class TestScraper(unittest.TestCase):
         self.assertNotIn("a", keywords)
         self.assertNotIn("the", keywords)
     
+    def test_entity_deduplication(self):
+        """Test that repeated entities are reported once with the full match"""
+        text = "Prices: $5.99, $5.99 and $12. Email sales@example.com or sales@example.com."
+        entities = self.analyzer.extract_entities(text)
+        texts = [entity['text'] for entity in entities]
+        
+        self.assertEqual(texts.count('sales@example.com'), 1)
+        self.assertEqual(texts.count('$5.99'), 1)
+        self.assertIn('$12', texts)
+    
+    def test_analyze_batch(self):
+        """Test that batch analysis matches per-text analysis"""
+        texts = [
+            "Climate change is a major global challenge. " * 5,
+            "Our office is open from 9:00 am. Call 555-123-4567 for details. " * 3,
+            "short",
+        ]
+        
+        expected = [self.analyzer.analyze_content(text) for text in texts]
+        self.assertEqual(self.analyzer.analyze_batch(texts, max_workers=2), expected)
+        self.assertEqual(self.analyzer.analyze_batch(texts, max_workers=1), expected)
+    
     def test_text_cleaning(self):
         """Test text cleaning functionality"""
         dirty_text = "  This has\n\nextra   spaces \t and tabs.   "
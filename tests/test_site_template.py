@@ -0,0 +1,120 @@
+import unittest
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from site_template import SiteTemplateLearner, element_selector
+from extraction_cache import ExtractionCache
+from extractor_stats import ExtractorStats
+from scraper import extract_content_multi_method
+
+SHARE_TEXT = "Share this article with your friends on social media"
+
+
+def make_page(n, with_template=True):
+    body = " ".join(f"Paragraph {n} sentence {i} about renewable energy policy." for i in range(6))
+    content = (
+        f'<div id="content"><article class="post post-{n}"><h1>Post {n}</h1><p>{body}</p>'
+        f'<div class="share">{SHARE_TEXT}</div></article></div>'
+        if with_template else f'<section class="other"><p>{body}</p></section>'
+    )
+    return (
+        "<html><head><title>Site</title></head><body>"
+        "<nav><a href='/'>Home</a><a href='/blog'>Blog</a></nav>"
+        f"{content}"
+        "<aside>Popular posts and tag cloud</aside>"
+        "<footer>Copyright Example Inc. All rights reserved.</footer>"
+        "</body></html>"
+    )
+
+
+def article_text(n):
+    body = " ".join(f"Paragraph {n} sentence {i} about renewable energy policy." for i in range(6))
+    return f"Post {n} {body}"
+
+
+class TestSiteTemplate(unittest.TestCase):
+    def setUp(self):
+        self.learner = SiteTemplateLearner(min_pages=3, max_misses=2)
+
+    def learn(self, pages=3):
+        for n in range(pages):
+            self.learner.observe(f"https://example.com/blog/post-{n}", make_page(n), article_text(n))
+
+    def test_learns_stable_selector(self):
+        """Test that the template is only used once enough pages agree"""
+        self.learn(pages=2)
+        self.assertIsNone(self.learner.template_for("https://example.com/blog/post-9"))
+
+        self.learn(pages=3)
+        template = self.learner.template_for("https://example.com/blog/post-9")
+        self.assertIsNotNone(template)
+        self.assertIn("article", template.selector)
+        self.assertNotIn("post-", template.selector)
+        self.assertIn(SHARE_TEXT, template.boilerplate)
+
+        # Other sections of the site learn their own template
+        self.assertIsNone(self.learner.template_for("https://example.com/docs/intro"))
+
+    def test_extract_with_template(self):
+        """Test that template extraction keeps the content and drops repeated blocks"""
+        self.learn()
+        text = self.learner.extract("https://example.com/blog/post-42", make_page(42))
+
+        self.assertIn("Paragraph 42 sentence 5", text)
+        self.assertNotIn(SHARE_TEXT, text)
+        self.assertNotIn("Copyright", text)
+        self.assertNotIn("Popular posts", text)
+
+    def test_miss_and_relearn(self):
+        """Test that pages without the template fall back and repeated misses drop it"""
+        self.learn()
+        url = "https://example.com/blog/odd-page"
+
+        self.assertIsNone(self.learner.extract(url, make_page(7, with_template=False)))
+        self.assertIsNotNone(self.learner.template_for(url))
+        self.assertIsNone(self.learner.extract(url, make_page(8, with_template=False)))
+        self.assertIsNone(self.learner.template_for(url))
+        self.assertTrue(self.learner.is_learning(url))
+
+    def test_disabled(self):
+        """Test that a disabled learner neither learns nor extracts"""
+        learner = SiteTemplateLearner(enabled=False)
+        learner.observe("https://example.com/blog/a", make_page(1), article_text(1))
+        self.assertFalse(learner.is_learning("https://example.com/blog/a"))
+        self.assertIsNone(learner.extract("https://example.com/blog/a", make_page(1)))
+
+    def test_element_selector_prefers_ids(self):
+        """Test that selectors anchor on stable ids"""
+        import lxml.html
+        root = lxml.html.fromstring(make_page(3))
+        article = root.xpath("//article")[0]
+        self.assertTrue(element_selector(article).startswith("//div[@id='content']/article"))
+
+    def test_multi_method_uses_template(self):
+        """Test that extract_content_multi_method switches to the template after learning"""
+        cache = ExtractionCache()
+        stats = ExtractorStats(exploration_rate=0)
+        learner = SiteTemplateLearner(min_pages=2)
+
+        for n in range(2):
+            extract_content_multi_method(make_page(n), f"https://example.org/blog/p{n}",
+                                         cache=cache, stats=stats, templates=learner)
+        self.assertIsNotNone(learner.template_for("https://example.org/blog/p5"))
+
+        text = extract_content_multi_method(make_page(5), "https://example.org/blog/p5",
+                                            cache=cache, stats=stats, templates=learner)
+        self.assertIn("Paragraph 5 sentence 3", text)
+        # Template output depends on the learned template, so it never reaches the cache
+        self.assertIsNone(cache.get(make_page(5)))
+        self.assertEqual(learner.summary()["example.org/blog/*"]["hits"], 1)
+
+        # Without templates the page goes through the extractor cascade again
+        text = extract_content_multi_method(make_page(5), "https://example.org/blog/p5", cache=cache, stats=stats,
+                                            templates=SiteTemplateLearner(enabled=False))
+        self.assertIn("Paragraph 5 sentence 3", text)
+        self.assertNotEqual(cache.get(make_page(5))["method"], "template")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+import unittest
+import os
+import sys
+import json
+import subprocess
+import tempfile
+import shutil
+from unittest import mock
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import crawler
+from crawler import WebCrawler, chromedriver_path, start_chrome
+
+RUFUS_DIR = os.path.dirname(os.path.abspath(crawler.__file__))
+ROOT_DIR = os.path.dirname(RUFUS_DIR)
+
+# Libraries that must only be imported when a feature first needs them
+HEAVY_MODULES = ["selenium", "webdriver_manager", "trafilatura", "goose3", "readability", "bs4", "openai", "httpx"]
+
+# Entry points that must import without any of them
+LIGHT_MODULES = ["Rufus", "Rufus.client"]
+
+# Wall-clock seconds allowed in a fresh interpreter. Both take milliseconds when the heavy libraries
+# stay unloaded and seconds when they are imported eagerly, so the budgets leave room for slow machines.
+IMPORT_BUDGET = 0.5
+HELP_BUDGET = 1.0
+
+PROBE = """
+import importlib, json, sys, time
+start = time.perf_counter()
+{action}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def probe(action):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([ROOT_DIR, RUFUS_DIR]))
+    result = subprocess.run([sys.executable, "-c", PROBE.format(action=action, heavy=HEAVY_MODULES)],
+                            capture_output=True, text=True, env=env, cwd=ROOT_DIR, timeout=60)
+    if result.returncode != 0:
+        raise AssertionError(result.stderr)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class TestStartup(unittest.TestCase):
+    def test_light_imports(self):
+        """Test that importing the package and the client loads no heavy dependency"""
+        for module in LIGHT_MODULES:
+            with self.subTest(module=module):
+                report = probe(f"importlib.import_module({module!r})")
+                self.assertEqual(report["loaded"], [])
+
+    def test_import_budget(self):
+        """Test that importing the package stays within its wall-clock budget"""
+        report = probe("import Rufus")
+        self.assertEqual(report["loaded"], [])
+        self.assertLess(report["elapsed"], IMPORT_BUDGET)
+
+    def test_lazy_package_attributes(self):
+        """Test that the public names are still importable from the package"""
+        report = probe("from Rufus import RufusClient, crawl_website, scrape_content, synthesize_document")
+        self.assertEqual(report["loaded"], [])
+
+    def test_cli_help(self):
+        """Test that the command line help answers without loading the scraping stack"""
+        if not os.path.exists(os.path.join(ROOT_DIR, "example_api_flow.py")):
+            self.skipTest("example_api_flow.py not found")
+        report = probe(
+            "sys.argv = ['rufus-scraper', '--help']\n"
+            "import example_api_flow\n"
+            "try:\n"
+            "    example_api_flow.main()\n"
+            "except SystemExit:\n"
+            "    pass"
+        )
+        self.assertEqual(report["loaded"], [])
+        self.assertLess(report["elapsed"], HELP_BUDGET)
+
+    def test_crawler_defers_browser(self):
+        """Test that creating a Selenium crawler does not start a browser"""
+        web_crawler = WebCrawler(use_selenium=True)
+        self.assertIsNone(web_crawler.driver)
+        self.assertTrue(web_crawler.use_selenium)
+
+    def test_chromedriver_path_is_cached(self):
+        """Test that the resolved driver path is reused instead of asking webdriver_manager again"""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir, ignore_errors=True)
+        driver = os.path.join(temp_dir, "chromedriver")
+        open(driver, "w").close()
+        cache_file = os.path.join(temp_dir, "chromedriver_path")
+        with open(cache_file, "w") as f:
+            f.write(driver)
+
+        saved = (crawler.DRIVER_PATH_CACHE, crawler._driver_path, crawler._driver_path_from_cache,
+                 os.environ.pop("CHROMEDRIVER_PATH", None))
+        self.addCleanup(self.restore, *saved)
+        crawler.DRIVER_PATH_CACHE = cache_file
+        crawler._driver_path = None
+
+        self.assertEqual(chromedriver_path(), driver)
+        os.remove(cache_file)
+        self.assertEqual(chromedriver_path(), driver)
+
+    def test_stale_cached_driver_is_resolved_again(self):
+        """Test that a cached driver that fails to start is dropped and resolved again once"""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir, ignore_errors=True)
+        old_driver, new_driver = os.path.join(temp_dir, "old"), os.path.join(temp_dir, "new")
+        open(old_driver, "w").close()
+        cache_file = os.path.join(temp_dir, "chromedriver_path")
+        with open(cache_file, "w") as f:
+            f.write(old_driver)
+
+        saved = (crawler.DRIVER_PATH_CACHE, crawler._driver_path, crawler._driver_path_from_cache,
+                 os.environ.pop("CHROMEDRIVER_PATH", None))
+        self.addCleanup(self.restore, *saved)
+        crawler.DRIVER_PATH_CACHE = cache_file
+        crawler._driver_path = None
+
+        def chrome(service, options):
+            if service.path == old_driver:
+                raise RuntimeError("session not created: this version of ChromeDriver is too old")
+            return "driver"
+
+        with mock.patch("selenium.webdriver.Chrome", side_effect=chrome) as chrome_mock, \
+                mock.patch("webdriver_manager.chrome.ChromeDriverManager") as manager:
+            manager.return_value.install.return_value = new_driver
+            self.assertEqual(start_chrome(None), "driver")
+            self.assertEqual(chrome_mock.call_count, 2)
+            manager.return_value.install.assert_called_once()
+            with open(cache_file) as f:
+                self.assertEqual(f.read(), new_driver)
+
+            # A freshly resolved driver that fails is not resolved again
+            chrome_mock.side_effect = RuntimeError("Chrome is not installed")
+            with self.assertRaises(RuntimeError):
+                start_chrome(None)
+            manager.return_value.install.assert_called_once()
+
+    @staticmethod
+    def restore(cache_file, driver_path, driver_path_from_cache, environ_path):
+        crawler.DRIVER_PATH_CACHE = cache_file
+        crawler._driver_path = driver_path
+        crawler._driver_path_from_cache = driver_path_from_cache
+        if environ_path is not None:
+            os.environ["CHROMEDRIVER_PATH"] = environ_path
+
+
+if __name__ == "__main__":
+    unittest.main()
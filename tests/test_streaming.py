@@ -0,0 +1,109 @@
+import unittest
+import os
+import sys
+import json
+import shutil
+import tempfile
+from types import SimpleNamespace
+from unittest.mock import patch
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from streaming import ThinkStripper, IncrementalJSONParser
+from llm_cache import LLMResponseCache
+from synthesizer import _build_request, _stream_synthesize
+from synthesis_backend import SynthesisBackend
+
+DOCUMENT = {
+    "title": "Solar \"Guide\"",
+    "summary": "Panels, {inverters} and [wiring].",
+    "key_points": ["one", "two, three"],
+    "content_sections": [{"heading": "Intro", "content": "Text"}],
+    "metadata": {"source_count": 2, "ok": True, "none": None},
+}
+RESPONSE = "<think>Let me think about {this} \"carefully\"...</think>```json\n" + json.dumps(DOCUMENT, indent=2) + "\n```"
+
+
+def in_chunks(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class StreamingClient:
+    """Chat client that streams a fixed response in small chunks"""
+    def __init__(self, response, size=3):
+        self.calls = 0
+        self.response = response
+        self.size = size
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, stream=False, **request):
+        self.calls += 1
+        return [
+            SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=chunk))])
+            for chunk in in_chunks(self.response, self.size)
+        ]
+
+
+class TestStreaming(unittest.TestCase):
+    def test_think_stripper(self):
+        """Test that reasoning is removed even when tags are split across chunks"""
+        for size in (1, 2, 5, 100):
+            stripper = ThinkStripper()
+            visible = "".join(stripper.feed(chunk) for chunk in in_chunks(RESPONSE, size)) + stripper.finish()
+            self.assertNotIn("think", visible)
+            self.assertTrue(visible.startswith("```json"))
+
+        stripper = ThinkStripper()
+        self.assertEqual(stripper.feed("a <thi"), "a ")
+        self.assertEqual(stripper.feed("s is not a tag"), "<this is not a tag")
+
+    def test_incremental_parser(self):
+        """Test that top-level fields are reported as soon as they complete"""
+        text = "```json\n" + json.dumps(DOCUMENT, indent=2) + "\n```"
+        parser = IncrementalJSONParser()
+        seen = []
+        for position, char in enumerate(text):
+            for key, value in parser.feed(char):
+                seen.append((key, value, position))
+
+        self.assertEqual([key for key, _, _ in seen], list(DOCUMENT))
+        self.assertEqual(parser.document, DOCUMENT)
+        self.assertTrue(parser.done)
+        # The title is available long before the end of the stream
+        self.assertLess(seen[0][2], len(text) // 3)
+
+    def test_stream_synthesize(self):
+        """Test streamed synthesis events, and replay from the cache"""
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        cache = LLMResponseCache(cache_dir)
+        client = StreamingClient(RESPONSE)
+        backend = SynthesisBackend(client=client)
+        request = _build_request("test-model", "prompt")
+
+        events = list(_stream_synthesize(backend, request, cache))
+        fields = [event["key"] for event in events if event["event"] == "field"]
+        self.assertEqual(fields, list(DOCUMENT))
+        self.assertEqual(events[-1], {"event": "document", "document": DOCUMENT})
+
+        replayed = list(_stream_synthesize(backend, request, cache))
+        self.assertEqual(replayed, events)
+        self.assertEqual(client.calls, 1)
+
+    def test_unparseable_stream_is_not_cached(self):
+        """Test that a response that only parsed partially while streaming is retried on the next run"""
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        cache = LLMResponseCache(cache_dir)
+        backend = SynthesisBackend(client=StreamingClient('{"title": "Solar Guide", "summary": @@@}'))
+        request = _build_request("test-model", "prompt")
+
+        with patch("synthesizer.repair_json", side_effect=ValueError("unrepairable")), \
+                patch("synthesizer._complete_document", side_effect=lambda b, r, c, document, cache: (document, [])):
+            events = list(_stream_synthesize(backend, request, cache))
+
+        self.assertEqual(events[-1]["document"], {"title": "Solar Guide"})
+        self.assertIsNone(cache.get(request))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rate_limiter import TokenRateLimiter
+from synthesis_backend import SynthesisBackend, retry_after
+
+
+class RateLimited(Exception):
+    """Error shaped like the OpenAI client's 429 error"""
+    status_code = 429
+
+    def __init__(self, headers):
+        super().__init__("rate limited")
+        self.response = SimpleNamespace(headers=headers)
+
+
+class FlakyClient:
+    """Chat client that is rate limited a given number of times before answering"""
+    def __init__(self, failures=0, headers=None, delay=0.0):
+        self.failures = failures
+        self.headers = headers or {}
+        self.delay = delay
+        self.call_times = []
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **request):
+        with self.lock:
+            self.call_times.append(time.monotonic())
+            if self.failures > 0:
+                self.failures -= 1
+                raise RateLimited(self.headers)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        message = SimpleNamespace(content='{"title": "Done"}')
+        usage = SimpleNamespace(total_tokens=10)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+
+REQUEST = {"model": "test-model", "messages": [{"role": "user", "content": "x" * 400}]}
+
+
+class TestSynthesisBackend(unittest.TestCase):
+    def test_limiter_spaces_requests(self):
+        """Test that requests beyond the per-minute burst wait for the bucket to refill"""
+        limiter = TokenRateLimiter(requests_per_minute=600)
+        limiter._requests = 0
+        start = time.monotonic()
+        for _ in range(3):
+            limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.25)
+
+    def test_limiter_limits_tokens(self):
+        """Test that the token quota blocks until enough tokens are refilled"""
+        limiter = TokenRateLimiter(requests_per_minute=None, tokens_per_minute=6000)
+        limiter.acquire(6000)
+        start = time.monotonic()
+        limiter.acquire(20)
+        self.assertGreaterEqual(time.monotonic() - start, 0.15)
+
+    def test_retry_after(self):
+        """Test reading Retry-After in seconds, milliseconds and as a missing header"""
+        self.assertEqual(retry_after(RateLimited({"retry-after": "3"})), 3.0)
+        self.assertEqual(retry_after(RateLimited({"retry-after-ms": "250"})), 0.25)
+        self.assertIsNone(retry_after(RateLimited({})))
+        self.assertIsNone(retry_after(ValueError("no response")))
+
+    def test_retry_honors_retry_after(self):
+        """Test that a 429 is retried after the delay the server asked for"""
+        client = FlakyClient(failures=2, headers={"retry-after": "0.2"})
+        backend = SynthesisBackend(client=client, requests_per_minute=None)
+
+        self.assertEqual(backend.complete(REQUEST), '{"title": "Done"}')
+        self.assertEqual(len(client.call_times), 3)
+        self.assertEqual(backend.retries, 2)
+        for earlier, later in zip(client.call_times, client.call_times[1:]):
+            self.assertGreaterEqual(later - earlier, 0.19)
+
+    def test_gives_up_after_max_retries(self):
+        """Test that the error is raised once the retries are used up"""
+        client = FlakyClient(failures=5, headers={"retry-after": "0"})
+        backend = SynthesisBackend(client=client, requests_per_minute=None, max_retries=2)
+        with self.assertRaises(RateLimited):
+            backend.complete(REQUEST)
+        self.assertEqual(len(client.call_times), 3)
+
+    def test_concurrency_cap(self):
+        """Test that concurrent callers never exceed the concurrency cap"""
+        client = FlakyClient(delay=0.05)
+        backend = SynthesisBackend(client=client, requests_per_minute=None, max_concurrency=2)
+        threads = [threading.Thread(target=backend.complete, args=(REQUEST,)) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(client.call_times), 6)
+        self.assertEqual(client.peak, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+import unittest
+import asyncio
+import os
+import sys
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthesis_planner import SynthesisPlanner, ChunkPacker, pack_chunks, merge_documents, format_content
+from utils import estimate_tokens
+
+
+def make_pages(count, words=200):
+    return {f"https://example.com/page{i}": " ".join(f"word{i}" for _ in range(words)) + "."
+            for i in range(count)}
+
+
+class TestSynthesisPlanner(unittest.TestCase):
+    def test_pack_chunks_respects_budget(self):
+        """Test that every chunk fits the budget and no content is lost"""
+        pages = make_pages(10)
+        pages["https://example.com/huge"] = "A long sentence here. " * 400
+
+        chunks = pack_chunks(pages, token_budget=1000)
+
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            self.assertLessEqual(estimate_tokens(format_content(chunk)), 1000)
+        packed_urls = {url for chunk in chunks for url, _ in chunk}
+        self.assertEqual(packed_urls, set(pages))
+
+    def test_chunk_packer_matches_pack_chunks(self):
+        """Test that packing pages as they arrive gives the chunks pack_chunks would"""
+        pages = make_pages(10)
+        pages["https://example.com/huge"] = "A long sentence here. " * 400
+        pages.update(make_pages(3, words=50))
+
+        packer = ChunkPacker(token_budget=1000)
+        streamed = []
+        for url, text in pages.items():
+            streamed.extend(packer.add(url, text))
+        early = len(streamed)
+        streamed.extend(packer.flush())
+
+        self.assertGreater(early, 0)
+        self.assertEqual(streamed, pack_chunks(pages, token_budget=1000))
+        self.assertEqual(packer.flush(), [])
+
+        unlimited = ChunkPacker()
+        self.assertEqual([chunk for url, text in pages.items() for chunk in unlimited.add(url, text)], [])
+        self.assertEqual(unlimited.flush(), [list(pages.items())])
+
+    def test_small_content_single_chunk(self):
+        """Test that content under the budget stays in one chunk"""
+        pages = make_pages(3, words=10)
+        planner = SynthesisPlanner(token_budget=1000)
+        self.assertFalse(planner.needs_map_reduce(format_content(pages.items())))
+        self.assertEqual(len(planner.plan(pages)), 1)
+
+    def test_map_calls_run_concurrently(self):
+        """Test that map calls overlap up to the concurrency cap, followed by one reduce"""
+        planner = SynthesisPlanner(token_budget=400, max_concurrency=4)
+        chunks = planner.plan(make_pages(8))
+        self.assertEqual(len(chunks), 8)
+
+        lock = threading.Lock()
+        state = {"active": 0, "peak": 0, "reduces": 0}
+
+        def map_fn(content):
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(0.1)
+            with lock:
+                state["active"] -= 1
+            return {"title": "Part", "key_points": [content[:20]]}
+
+        def reduce_fn(partials):
+            state["reduces"] += 1
+            return {"title": "All", "key_points": [p["key_points"][0] for p in partials]}
+
+        start = time.monotonic()
+        document = planner.run(chunks, map_fn, reduce_fn)
+
+        self.assertLess(time.monotonic() - start, 0.6)
+        self.assertEqual(state["peak"], 4)
+        self.assertEqual(state["reduces"], 1)
+        self.assertEqual(document["title"], "All")
+        self.assertEqual(len(document["key_points"]), 8)
+
+    def test_reduce_falls_back_to_merge(self):
+        """Test that failed map calls are skipped and a failed reduce is merged locally"""
+        planner = SynthesisPlanner(token_budget=400, max_concurrency=2)
+        chunks = planner.plan(make_pages(3))
+
+        def map_fn(content):
+            if "word1" in content:
+                raise RuntimeError("boom")
+            return {"title": content[5:30], "summary": "Part.", "key_points": ["shared", content[:15]]}
+
+        document = planner.run(chunks, map_fn, lambda partials: {"content": "oops", "parse_error": "bad"})
+
+        self.assertEqual(document["key_points"].count("shared"), 1)
+        self.assertEqual(document["summary"], "Part. Part.")
+        self.assertEqual(document["metadata"]["partial_documents"], 2)
+
+    def test_reduce_and_areduce_agree(self):
+        """Test that the thread and coroutine paths reduce in the same rounds and produce the same document"""
+        planner = SynthesisPlanner(token_budget=120, max_concurrency=2)
+        partials = [{"title": f"Part {n}", "summary": "Part.", "key_points": [f"point {n} " * 10]}
+                    for n in range(6)]
+        calls = []
+
+        def reduce_fn(group):
+            calls.append(len(group))
+            if len(group) > 2:
+                raise RuntimeError("too large")
+            return {"title": "Reduced", "summary": "Both.", "key_points": [kp for doc in group
+                                                                          for kp in doc["key_points"]]}
+
+        async def areduce_fn(group):
+            return reduce_fn(group)
+
+        document = planner.reduce(partials, reduce_fn)
+        sync_calls, calls[:] = list(calls), []
+        self.assertEqual(asyncio.run(planner.areduce(partials, areduce_fn)), document)
+        self.assertEqual(sorted(calls), sorted(sync_calls))
+        self.assertGreater(len(sync_calls), 1)
+
+    def test_merge_documents(self):
+        """Test the local merge of partial documents"""
+        merged = merge_documents([
+            {"title": "A", "faq": [{"q": "1"}], "metadata": {"x": 1}},
+            {"title": "B", "faq": [{"q": "1"}, {"q": "2"}], "metadata": {"y": 2}},
+        ])
+        self.assertEqual(merged["title"], "A")
+        self.assertEqual(merged["faq"], [{"q": "1"}, {"q": "2"}])
+        self.assertEqual(merged["metadata"], {"x": 1, "y": 2, "partial_documents": 2})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from text_normalizer import TextNormalizer, normalize_text
+
+
+class TestTextNormalizer(unittest.TestCase):
+    """Tests for the single-pass text normalizer"""
+
+    def test_whitespace_and_tags(self):
+        """Test that whitespace runs and leftover tags collapse to single spaces"""
+        text = "  This  is   <b>bold</b>\n\ntext.\tNext line  "
+        self.assertEqual(normalize_text(text), "This is bold text. Next line")
+
+    def test_entities(self):
+        """Test that entities are decoded and whitespace entities merge with spaces"""
+        self.assertEqual(normalize_text("Fish &amp; chips"), "Fish & chips")
+        self.assertEqual(normalize_text("It&#39;s here"), "It's here")
+        self.assertEqual(normalize_text("one &nbsp; two&nbsp;three"), "one two three")
+
+    def test_sentence_spacing(self):
+        """Test that a space is added after a period followed by a capital letter"""
+        self.assertEqual(normalize_text("First.Second. third"), "First. Second. third")
+        self.assertEqual(normalize_text("Version 1.5 is out"), "Version 1.5 is out")
+
+    def test_unicode_normalization(self):
+        """Test that NFC is the default and NFKC folding is opt-in"""
+        self.assertEqual(normalize_text("cafe\u0301"), "caf\u00e9")
+        self.assertEqual(normalize_text("x\u00b2 and \ufb01le"), "x\u00b2 and \ufb01le")
+        self.assertEqual(TextNormalizer(unicode_form="NFKC")("\ufb01le name"), "file name")
+
+    def test_code_and_math_survive(self):
+        """Test that angle brackets that are not HTML tags are kept"""
+        for text in ("if x<y and y>z then", "Use List<String> or Map<K,V> here", "a < b > c",
+                     "std::vector<int> v;"):
+            self.assertEqual(normalize_text(text), text)
+        self.assertEqual(normalize_text('see <a href="/x" class=link>this</a><br/> page'), "see this page")
+
+    def test_clean_text_unchanged(self):
+        """Test that already clean text passes through untouched"""
+        text = "Already clean text. Nothing to do here."
+        self.assertEqual(normalize_text(text), text)
+        self.assertEqual(normalize_text(""), "")
+
+    def test_options(self):
+        """Test that disabled steps leave their input alone"""
+        normalizer = TextNormalizer(unicode_form=None, decode_entities=False,
+                                    strip_tags=False, fix_sentence_spacing=False)
+        self.assertEqual(normalizer("a  <b>&amp;</b>.B"), "a <b>&amp;</b>.B")
+        self.assertNotEqual(normalizer.config(), TextNormalizer().config())
+
+
+if __name__ == "__main__":
+    unittest.main()
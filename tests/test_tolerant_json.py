@@ -0,0 +1,57 @@
+import unittest
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tolerant_json import repair_json
+from synthesizer import _parse_document
+
+
+class TestJSONRepair(unittest.TestCase):
+    def test_valid_json_unchanged(self):
+        """Test that valid JSON parses exactly as json.loads would"""
+        self.assertEqual(repair_json('{"a": [1, 2.5, true, null], "b": "x\\"y"}'),
+                         {"a": [1, 2.5, True, None], "b": 'x"y'})
+
+    def test_quoting_errors(self):
+        """Test unquoted keys, single quotes and unescaped quotes, keeping apostrophes in content"""
+        text = """{title: 'Solar basics', "summary": "It's the "best" choice", 'key_points': ['Don't panic']}"""
+        self.assertEqual(repair_json(text), {
+            "title": "Solar basics",
+            "summary": 'It\'s the "best" choice',
+            "key_points": ["Don't panic"],
+        })
+
+    def test_commas_comments_and_literals(self):
+        """Test trailing and missing commas, comments and Python literals"""
+        text = """Here is the JSON: {
+            "title": "A" // the title
+            "key_points": ["one", "two",],
+            "metadata": {"ok": True, "none": None,},
+        } Hope this helps!"""
+        self.assertEqual(repair_json(text), {
+            "title": "A",
+            "key_points": ["one", "two"],
+            "metadata": {"ok": True, "none": None},
+        })
+
+    def test_truncated_output(self):
+        """Test that output cut off mid-document is closed"""
+        self.assertEqual(repair_json('{"title": "A", "key_points": ["one", "tw'),
+                         {"title": "A", "key_points": ["one", "tw"]})
+        self.assertEqual(repair_json('[{"a": 1}, {"b":'), [{"a": 1}, {}])
+
+    def test_no_json(self):
+        """Test that text without an object or array is rejected"""
+        with self.assertRaises(ValueError):
+            repair_json("I cannot help with that.")
+
+    def test_parse_document_repairs(self):
+        """Test that synthesis output is repaired instead of corrupted"""
+        content = "<think>hmm</think>```json\n{title: 'It's here', \"summary\": \"Time: 10:30\",}\n```"
+        self.assertEqual(_parse_document(content), {"title": "It's here", "summary": "Time: 10:30"})
+        self.assertIn("parse_error", _parse_document("no json here"))
+
+
+if __name__ == "__main__":
+    unittest.main()